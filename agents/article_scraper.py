@@ -3,7 +3,7 @@ from utils.base_agent import create_agent
 import json
 from textwrap import dedent
 from typing import Dict, Iterator, Optional
-from agno.models.google import Gemini
+from utils.model_factory import create_model
 
 from agno.agent import Agent
 from agno.tools.duckduckgo import DuckDuckGoTools
@@ -14,7 +14,12 @@ from models import ScrapedArticle
 def article_scraper() -> Agent:
 
     agent: Agent = Agent(
-        model=Gemini(id=app_settings.gemini_2_5_flash),
+        # extraction only: a slow or failing flash call may be answered by flash-lite
+        model=create_model(
+            app_settings.gemini_2_5_flash,
+            temperature=app_settings.default_temperature,
+            fallback_models=[app_settings.gemini_2_5_flash_lite],
+        ),
         name="Article Scraper",
         agent_id="article_scraper",
         tools=[],
@@ -1,11 +1,10 @@
+import threading
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from agents.sage import get_sage
-from agents.scholar import get_scholar
-from agents.article_scraper import article_scraper
-from agents.writer import writer
-from agents.searcher import search_agent
+from agents.settings import agent_settings
+from utils.agent_pool import AgentPool, warm_pools
+from utils.base_agent import AgentBlueprint, get_blueprint
 
 
 class AgentType(Enum):
@@ -15,15 +14,30 @@ class AgentType(Enum):
     WRITER = "writer"
     SEARCHER = "searcher"
 
+
+def _from_prototype(agent_type: AgentType, builder, reuse=None):
+    # Agents without per-request inputs are built once and cloned for each request
+    return get_blueprint(agent_type, lambda: AgentBlueprint(prototype=builder())).build(reuse=reuse)
+
+
 # Use Factory Pattern to improve agent instantiation
 class AgentFactory:
     @staticmethod
     def create(agent_id, **kwargs):
+        # agent modules (and the SDKs they pull in) load on first use, not at import
+        from agents.article_scraper import article_scraper
+        from agents.sage import get_sage
+        from agents.scholar import get_scholar
+        from agents.searcher import search_agent
+        from agents.writer import writer
+
         factories = {
             AgentType.SAGE: lambda: get_sage(**kwargs),
-            AgentType.ARTICLE_SCRAPER: lambda: article_scraper(),
-            AgentType.WRITER: lambda: writer(),
-            AgentType.SEARCHER: lambda: search_agent(),
+            AgentType.ARTICLE_SCRAPER: lambda: _from_prototype(
+                AgentType.ARTICLE_SCRAPER, article_scraper, kwargs.get("reuse")
+            ),
+            AgentType.WRITER: lambda: _from_prototype(AgentType.WRITER, writer, kwargs.get("reuse")),
+            AgentType.SEARCHER: lambda: _from_prototype(AgentType.SEARCHER, search_agent, kwargs.get("reuse")),
             AgentType.SCHOLAR: lambda: get_scholar(**kwargs),
         }
         factory = factories.get(agent_id)
@@ -43,7 +57,38 @@ def get_agent(
     user_id: Optional[str] = None,
     session_id: Optional[str] = None,
     debug_mode: bool = True,
+    reuse=None,
 ):
-    kwargs = dict(model_id=model_id, user_id=user_id, session_id=session_id, debug_mode=debug_mode)
+    kwargs = dict(model_id=model_id, user_id=user_id, session_id=session_id, debug_mode=debug_mode, reuse=reuse)
     return AgentFactory.create(agent_id, **kwargs)
-    
\ No newline at end of file
+
+
+_pools: Dict[Tuple[AgentType, str], AgentPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_agent_pool(agent_id: AgentType, model_id: str) -> AgentPool:
+    """The pool of ready agents for (agent_id, model_id), sized by AGENT_POOL_SIZE."""
+    key = (agent_id, model_id)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = AgentPool(
+                    lambda **request: get_agent(model_id=model_id, agent_id=agent_id, **request),
+                    size=agent_settings.agent_pool_size,
+                    name=f"{agent_id.value}/{model_id}",
+                )
+                _pools[key] = pool
+    return pool
+
+
+def warm_agent_pools(model_id: Optional[str] = None) -> None:
+    """Build the pooled agents of every agent type for `model_id` ahead of the first request."""
+    model_id = model_id or agent_settings.gemini_2_5_pro
+    warm_pools({agent_type: get_agent_pool(agent_type, model_id) for agent_type in AgentType})
+
+
+def agent_pool_metrics() -> List[dict]:
+    return [pool.metrics() for pool in list(_pools.values())]
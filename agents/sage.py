@@ -6,39 +6,44 @@ from agno.tools.duckduckgo import DuckDuckGoTools
 
 from agents.settings import agent_settings
 from db.session import db_url
-from utils.base_agent import create_agent
+from db.storage import get_engine
+from utils.base_agent import AgentBlueprint, build_agent_blueprint, get_blueprint
 from agno.vectordb.pgvector import PgVector, SearchType
 from agno.agent import AgentKnowledge
 
 
-def get_sage(
-    model_id: Optional[str] = None,
-    user_id: Optional[str] = None,
-    session_id: Optional[str] = None,
-    debug_mode: bool = True,
-) -> Agent:
-    
+def _sage_blueprint(model_id: Optional[str]) -> AgentBlueprint:
     knowledge = AgentKnowledge(
         vector_db=PgVector(
             table_name="sage_knowledge",
-            db_url=db_url,
+            db_engine=get_engine(),
             search_type=SearchType.hybrid,
             embedder=agent_settings.default_embedder,
         )
     )
 
-    agent: Agent = create_agent(
+    return build_agent_blueprint(
         name="Sage Agent",
         prompt_path="prompts/agents/sage.yaml",
         model_id=model_id,
-        user_id=user_id,
-        session_id=session_id,
         db_url=db_url,
         storage_table="sage_sessions",
         tools=[DuckDuckGoTools()],
         knowledge=knowledge,
     )
 
+
+def get_sage(
+    model_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    debug_mode: bool = True,
+    reuse: Optional[Agent] = None,
+) -> Agent:
+
+    blueprint = get_blueprint(("sage", model_id), lambda: _sage_blueprint(model_id))
+    agent: Agent = blueprint.build(user_id=user_id, session_id=session_id, reuse=reuse)
+
     # Adicione configurações adicionais que não são definidas em base_agent. 
     # Exemplo: adicionar contexto dinâmico ao agente.
     # Nesse exemplo, cada função no contexto será resolvida durante a execução do agente,
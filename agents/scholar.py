@@ -2,13 +2,12 @@ from textwrap import dedent
 from typing import Optional
 
 from agno.agent import Agent
-from agno.models.google import Gemini
 from agno.storage.agent.postgres import PostgresAgentStorage
 from agno.tools.duckduckgo import DuckDuckGoTools
 
 from agents.settings import agent_settings
 from db.session import db_url
-from utils.base_agent import create_agent
+from utils.base_agent import build_agent_blueprint, get_blueprint
 
 
 def get_scholar(
@@ -17,6 +16,7 @@ def get_scholar(
     session_id: Optional[str] = None,
     user_query: Optional[str] = None,
     debug_mode: bool = True,
+    reuse: Optional[Agent] = None,
 ) -> Agent:
     
     additional_context = ""
@@ -28,18 +28,19 @@ def get_scholar(
         </context>
         """
 
-    agent: Agent = create_agent(
-        name="Scholar Agent",
-        prompt_path="prompts/agents/scholar.yaml",
-        model_id=model_id,
-        user_id=user_id,
-        session_id=session_id,
-        db_url=db_url,
-        tools=[DuckDuckGoTools()],
-        storage_table="scholar_sessions",
-        knowledge=None,
-        user_query=user_query,
+    blueprint = get_blueprint(
+        ("scholar", model_id),
+        lambda: build_agent_blueprint(
+            name="Scholar Agent",
+            prompt_path="prompts/agents/scholar.yaml",
+            model_id=model_id,
+            db_url=db_url,
+            tools=[DuckDuckGoTools()],
+            storage_table="scholar_sessions",
+            knowledge=None,
+        ),
     )
+    agent: Agent = blueprint.build(user_id=user_id, session_id=session_id, reuse=reuse, user_query=user_query)
 
     agent.context = additional_context
 
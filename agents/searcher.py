@@ -1,7 +1,7 @@
 
 from utils.base_agent import create_agent
 from textwrap import dedent
-from agno.models.google import Gemini
+from utils.model_factory import create_model
 
 from agno.agent import Agent
 from agno.tools.duckduckgo import DuckDuckGoTools
@@ -12,7 +12,7 @@ from models import SearchResults
 def search_agent() -> Agent:
 
     agent: Agent = Agent(
-        model=Gemini(id=app_settings.gemini_2_5_flash_lite),
+        model=create_model(app_settings.gemini_2_5_flash_lite, temperature=app_settings.default_temperature),
         tools=[DuckDuckGoTools(cache_results=True)],
         # tool_call_limit=3,
         name="Searcher Agent",
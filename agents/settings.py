@@ -1,7 +1,10 @@
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List, Optional
+
 from pydantic_settings import BaseSettings
-from agno.embedder.google import GeminiEmbedder
-from agno.models.google import Gemini
 
+if TYPE_CHECKING:
+    from agno.embedder.base import Embedder
 
 
 class AgentSettings(BaseSettings):
@@ -15,11 +18,83 @@ class AgentSettings(BaseSettings):
     gemma_3n_e2b_it: str = "gemma-3n-e2b-it"
 
     gemini_embedding_001: str = "gemini-embedding-001"
-    default_embedder: any = GeminiEmbedder(id=gemini_embedding_001)
 
     default_max_completion_tokens: int = 16000
     default_temperature: float = 0
 
+    # Exact-match cache for temperature-0 model calls (see utils/model_cache.py).
+    # Set response_cache_table to an empty value to keep the cache in-process only.
+    response_cache_enabled: bool = True
+    response_cache_size: int = 1024
+    response_cache_ttl_seconds: int = 86400
+    response_cache_table: Optional[str] = "model_response_cache"
+
+    # Per-model concurrency limiter (see utils/model_limiter.py). The window adapts
+    # between 1 and the configured maximum; tokens-per-minute budgets are optional.
+    model_limiter_enabled: bool = True
+    default_model_concurrency: int = 8
+    model_max_concurrency: Dict[str, int] = {}
+    model_tokens_per_minute: Dict[str, int] = {}
+    model_throttle_retries: int = 2
+    model_throttle_backoff_seconds: float = 1.0
+
+    # Model tier routing (see utils/model_router.py): when the primary errors, or has
+    # not streamed its first chunk by the hedge_percentile of its recent
+    # time-to-first-token, the request also goes to the next tier. Routing is opt-in:
+    # agents pass `fallback_models` to create_model, and model_fallbacks can add tiers
+    # per model id. model_routing_enabled=false turns it off everywhere. Set
+    # hedge_percentile to null to keep failover without hedging.
+    model_routing_enabled: bool = True
+    model_fallbacks: Dict[str, List[str]] = {}
+    hedge_percentile: Optional[float] = 0.95
+    hedge_min_samples: int = 20
+    hedge_initial_delay_seconds: float = 10.0
+
+    # Offline runs (see utils/fake_provider.py): MODEL_PROVIDER_OVERRIDE=fake routes every
+    # create_model call to the fake provider, keeping the requested model ids.
+    model_provider_override: Optional[str] = None
+    fake_model_ttft_seconds: float = 0.0
+    fake_model_inter_chunk_seconds: float = 0.0
+    fake_model_transcript: Optional[str] = None
+
+    # Ready-built agents kept per (agent type, model) for the /v1/agents run endpoint
+    # (see utils/agent_pool.py). Roughly the expected concurrent runs per agent.
+    agent_pool_size: int = 4
+
+    # Workflows run their blocking steps on a dedicated thread pool (see utils/async_bridge.py);
+    # a streaming run may get workflow_stream_buffer chunks ahead of its client.
+    workflow_threads: int = 32
+    workflow_stream_buffer: int = 64
+
+    # Workflow jobs (see workflows/jobs.py and workflows/worker.py). A running job whose worker
+    # has not heartbeated for job_stale_seconds is handed to another worker, at most
+    # job_max_attempts times in total. Each worker process runs worker_concurrency jobs.
+    job_poll_interval_seconds: float = 1.0
+    job_stale_seconds: float = 300.0
+    job_max_attempts: int = 3
+    job_event_flush_seconds: float = 0.5
+    worker_processes: int = 2
+    worker_concurrency: int = 4
+
+    # Batch inference (see utils/model_batch.py): model calls of batched workflow runs
+    # are grouped per model and submitted together, once every run is waiting on a
+    # model call, batch_max_size calls are queued or the oldest waited batch_max_wait_seconds.
+    batch_max_size: int = 100
+    batch_max_wait_seconds: float = 30.0
+    batch_poll_interval_seconds: float = 30.0
+    batch_local_dir: Optional[str] = None
+
+    @cached_property
+    def default_embedder(self) -> "Embedder":
+        if (self.model_provider_override or "").lower() == "fake":
+            from utils.fake_provider import FakeEmbedder
+
+            return FakeEmbedder()
+        # built on first use: importing the Gemini SDK dominates the import time of this module
+        from agno.embedder.google import GeminiEmbedder
+
+        return GeminiEmbedder(id=self.gemini_embedding_001)
+
 
 # Create an TeamSettings object
 agent_settings = AgentSettings()
@@ -1,7 +1,7 @@
 
 from utils.base_agent import create_agent
 from textwrap import dedent
-from agno.models.google import Gemini
+from utils.model_factory import create_model
 
 from agno.agent import Agent
 from agno.utils.log import logger
@@ -10,7 +10,7 @@ from app_settings.settings import app_settings
 def writer() -> Agent:
 
     agent: Agent = Agent(
-        model=Gemini(id=app_settings.gemini_2_5_flash),
+        model=create_model(app_settings.gemini_2_5_flash, temperature=app_settings.default_temperature),
         name="Writer Agent",
         agent_id="writer_agent",
         description=dedent("""\
@@ -1,8 +1,12 @@
+import asyncio
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from api.routes.v1_router import v1_router
 from api.settings import api_settings
+from utils.admission import AdmissionMiddleware, get_admission_controller
+from utils.singleflight import run_flights
 
 
 def create_app() -> FastAPI:
@@ -19,8 +23,30 @@ def create_app() -> FastAPI:
 
     # Add v1 router
     app.include_router(v1_router)
+    run_flights.enabled = api_settings.coalesce_runs
+
+    if api_settings.warm_agent_pools:
+
+        @app.on_event("startup")
+        async def warm_agent_pools() -> None:
+            from agents.operator import warm_agent_pools
+            from agents.settings import agent_settings
+
+            # in the background: until a pool is warm, checkouts build their own agents
+            asyncio.get_running_loop().run_in_executor(None, warm_agent_pools, agent_settings.gemini_2_5_pro)
+
+    if api_settings.warm_playground:
+
+        @app.on_event("startup")
+        async def warm_playground() -> None:
+            from api.routes.playground import warm_playground
+
+            # in the background: the api is ready before the playground entries are built
+            asyncio.get_running_loop().run_in_executor(None, warm_playground)
 
     # Add Middlewares
+    if api_settings.admission_enabled:
+        app.add_middleware(AdmissionMiddleware, controller=get_admission_controller())
     app.add_middleware(
         CORSMiddleware,
         allow_origins=list(api_settings.cors_origin_list) if api_settings.cors_origin_list else ["*"],
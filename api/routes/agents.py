@@ -3,11 +3,13 @@ from typing import AsyncGenerator, List, Optional
 
 from agno.agent import Agent
 from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from agents.operator import AgentType, get_agent, get_available_agents
+from agents.operator import AgentType, get_agent_pool, get_available_agents
 from utils.log import logger
+from utils.singleflight import flight_key, run_flights
+from utils.sse import sse_response
 
 ######################################################
 ## Router for the Agent Interface
@@ -34,23 +36,21 @@ async def list_agents():
     return get_available_agents()
 
 
-async def chat_response_streamer(agent: Agent, message: str) -> AsyncGenerator:
+async def chat_response_streamer(agent: Agent, message: str, events: bool = False) -> AsyncGenerator:
     """
     Stream agent responses chunk by chunk.
 
     Args:
         agent: The agent instance to interact with
         message: User message to process
+        events: Also yield tool call and run completed events
 
     Yields:
-        Text chunks from the agent response
+        RunResponse chunks, framed as server-sent events by utils.sse
     """
-    run_response = await agent.arun(message, stream=True)
+    run_response = await agent.arun(message, stream=True, stream_intermediate_steps=events)
     async for chunk in run_response:
-        # chunk.content only contains the text response from the Agent.
-        # For advanced use cases, we should yield the entire chunk
-        # that contains the tool calls and intermediate steps.
-        yield chunk.content
+        yield chunk
 
 
 class RunRequest(BaseModel):
@@ -61,6 +61,8 @@ class RunRequest(BaseModel):
     model: Model = Model.gemini_2_5_pro
     user_id: Optional[str] = None
     session_id: Optional[str] = None
+    # also stream tool calls and run metrics as `tool_call` / `metrics` events
+    events: bool = False
 
 
 @agents_router.post("/{agent_id}/runs", status_code=status.HTTP_200_OK)
@@ -77,23 +79,58 @@ async def run_agent(agent_id: AgentType, body: RunRequest):
     """
     logger.debug(f"RunRequest: {body}")
 
+    pool = get_agent_pool(agent_id, body.model.value)
+    request = {"user_id": body.user_id, "session_id": body.session_id}
     try:
-        agent: Agent = get_agent(
-            model_id=body.model.value,
-            agent_id=agent_id,
-            user_id=body.user_id,
-            session_id=body.session_id,
-        )
+        # a cold pool builds the agent here, off the event loop and before the response starts
+        held = [await run_in_threadpool(pool.checkout, **request)]
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Agent not found: {str(e)}")
 
+    # The run that actually executes takes the agent checked out above (coalesced duplicates
+    # never run one) and returns it to the pool when it ends, is cancelled or fails. A run
+    # starting after this request has already let go of its agent checks out another one.
+    async def take() -> Agent:
+        return held.pop() if held else await run_in_threadpool(pool.checkout, **request)
+
+    def release() -> None:
+        if held:
+            pool.checkin(held.pop())
+
+    async def stream_run() -> AsyncGenerator:
+        agent = await take()
+        try:
+            async for chunk in chat_response_streamer(agent, body.message, body.events):
+                yield chunk
+        finally:
+            pool.checkin(agent)
+
+    async def run():
+        agent = await take()
+        try:
+            return await agent.arun(body.message, stream=False)
+        finally:
+            pool.checkin(agent)
+
+    # Runs depend on the user (prompt) and session (history), so only those duplicates coalesce
+    key = flight_key(
+        "agent", agent_id.value, body.message, body.model.value, body.user_id, body.session_id, body.stream, body.events
+    )
     if body.stream:
-        return StreamingResponse(
-            chat_response_streamer(agent, body.message),
-            media_type="text/event-stream",
-        )
+
+        async def chunks() -> AsyncGenerator:
+            try:
+                async for chunk in run_flights.stream(key, stream_run):
+                    yield chunk
+            finally:
+                release()
+
+        return sse_response(chunks(), structured=body.events)
     else:
-        response = await agent.arun(body.message, stream=False)
+        try:
+            response = await run_flights.do(key, run)
+        finally:
+            release()
         # response.content only contains the text response from the Agent.
         # For advanced use cases, we should yield the entire response
         # that contains the tool calls and intermediate steps.
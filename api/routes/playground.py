@@ -1,47 +1,169 @@
+import threading
 from os import getenv
+from typing import Any, Callable, Iterator, List, Optional
+from uuid import uuid4
 
+from agno.agent import Agent
 from agno.playground import Playground
+from agno.app.playground.app import generate_id
+from agno.app.playground.async_router import get_async_playground_router
+from agno.team import Team
 
-from agents.sage import get_sage
-from agents.scholar import get_scholar
-from agents.searcher import search_agent
-from agents.writer import writer
-from agents.article_scraper import article_scraper
-from teams.finance_researcher import get_finance_researcher_team
-from teams.multi_language import get_multi_language_team
-from workflows.blog_post_generator import get_blog_post_generator
-from workflows.investment_report_generator import get_investment_report_generator
-from workspace.dev_resources import dev_fastapi
+from utils.log import logger
 
 ######################################################
 ## Router for the Playground Interface
 ######################################################
 
+# Agents, teams and workflows are registered as factories and built on first use: the
+# playground routes look entries up by iterating their list, so a lookup builds entries
+# in order until it finds the one requested, and a listing builds them all.
+# `warm_playground()` builds everything ahead of time (see the startup hook in api/main.py).
+
+app_id = str(uuid4())
+
+
+def _prepare(entry: Any) -> Any:
+    # what agno's Playground does for each entry on construction
+    if isinstance(entry, Team):
+        entry.app_id = entry.app_id or app_id
+        entry.initialize_team()
+        for member in entry.members:
+            if isinstance(member, Agent):
+                member.app_id = member.app_id or app_id
+                member.team_id = None
+                member.initialize_agent()
+            elif isinstance(member, Team):
+                member.initialize_team()
+    elif isinstance(entry, Agent):
+        entry.app_id = entry.app_id or app_id
+        entry.initialize_agent()
+    else:
+        entry.app_id = entry.app_id or app_id
+        entry.workflow_id = entry.workflow_id or generate_id(entry.name)
+    return entry
+
+
+class LazyEntries(list):
+    """A list of playground entries, each built by its factory the first time it is reached."""
+
+    def __init__(self, factories: List[Callable[[], Any]]):
+        super().__init__()
+        self._factories = factories
+        self._built: List[Optional[Any]] = [None] * len(factories)
+        self._locks = [threading.Lock() for _ in factories]
+
+    def _entry(self, index: int) -> Any:
+        entry = self._built[index]
+        if entry is None:
+            with self._locks[index]:
+                entry = self._built[index]
+                if entry is None:
+                    entry = _prepare(self._factories[index]())
+                    self._built[index] = entry
+        return entry
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._entry(i) for i in range(len(self._factories)))
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __bool__(self) -> bool:
+        return bool(self._factories)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._entry(i) for i in range(len(self._factories))[index]]
+        return self._entry(range(len(self._factories))[index])
+
+    @property
+    def built(self) -> int:
+        return sum(entry is not None for entry in self._built)
+
+
+def _sage():
+    from agents.sage import get_sage
+
+    return get_sage(debug_mode=True)
+
+
+def _scholar():
+    from agents.scholar import get_scholar
+
+    return get_scholar(debug_mode=True)
+
+
+def _searcher():
+    from agents.searcher import search_agent
+
+    return search_agent()
+
+
+def _writer():
+    from agents.writer import writer
+
+    return writer()
+
+
+def _article_scraper():
+    from agents.article_scraper import article_scraper
+
+    return article_scraper()
+
+
+def _finance_researcher_team():
+    from teams.finance_researcher import get_finance_researcher_team
+
+    return get_finance_researcher_team(debug_mode=True)
+
+
+def _multi_language_team():
+    from teams.multi_language import get_multi_language_team
+
+    return get_multi_language_team(debug_mode=True)
+
+
+def _blog_post_workflow():
+    from workflows.blog_post_generator import get_blog_post_generator
+
+    return get_blog_post_generator(debug_mode=True)
+
+
+def _investment_report_workflow():
+    from workflows.investment_report_generator import get_investment_report_generator
+
+    return get_investment_report_generator(debug_mode=True)
+
+
 # Agents
-sage_agent = get_sage(debug_mode=True)
-scholar_agent = get_scholar(debug_mode=True)
-searcher_agent = search_agent()
-writer_agent = writer()
-article_scraper_agent = article_scraper()
+agents = LazyEntries([_sage, _scholar, _searcher, _writer, _article_scraper])
 
 # Teams
-finance_researcher_team = get_finance_researcher_team(debug_mode=True)
-multi_language_team = get_multi_language_team(debug_mode=True)
+teams = LazyEntries([_finance_researcher_team, _multi_language_team])
 
 # Workflows
-blog_post_workflow = get_blog_post_generator(debug_mode=True)
-investment_report_workflow = get_investment_report_generator(debug_mode=True)
+workflows = LazyEntries([_blog_post_workflow, _investment_report_workflow])
+
+
+def warm_playground() -> None:
+    """Build every playground entry, logging (not raising) failures."""
+    for entries in (agents, teams, workflows):
+        for i in range(len(entries)):
+            try:
+                entries[i]
+            except Exception as e:
+                logger.warning(f"Could not build playground entry: {e}")
 
-# Create a playground instance
-playground = Playground(
-    agents=[sage_agent, scholar_agent, searcher_agent, writer_agent, article_scraper_agent],
-    teams=[finance_researcher_team, multi_language_team],
-    workflows=[blog_post_workflow, investment_report_workflow]
-)
-app = playground.get_app()
 
 # Register the endpoint where playground routes are served with agno.com
 if getenv("RUNTIME_ENV") == "dev":
+    from workspace.dev_resources import dev_fastapi
+
+    # registration needs every entry, so the dev playground is built eagerly
+    playground = Playground(agents=agents, teams=teams, workflows=workflows, app_id=app_id)
+    app = playground.get_app()
+
     # Try the modern API first, fallback to alternative helpers for older/newer agno versions
     try:
         playground.serve("playground:app", f"http://localhost:{dev_fastapi.host_port}")
@@ -59,4 +181,4 @@ if getenv("RUNTIME_ENV") == "dev":
                 # give up silently (playground will still work locally without registration)
                 pass
 
-playground_router = playground.get_async_router()
+playground_router = get_async_playground_router(agents, workflows, teams, app_id)
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
 
+from utils.admission import admission_metrics
 from utils.dttm import current_utc_str
+from utils.model_limiter import limiter_metrics
+from utils.model_router import routing_metrics
 
 ######################################################
 ## Router for API status
@@ -19,3 +22,30 @@ def get_health():
         "path": "/health",
         "utc": current_utc_str(),
     }
+
+
+@status_router.get("/health/models")
+def get_model_limits():
+    """Limiter state of every model, plus hedging/failover counts and time-to-first-token"""
+
+    return {
+        "status": "success",
+        "router": "status",
+        "path": "/health/models",
+        "utc": current_utc_str(),
+        "models": limiter_metrics(),
+        "routing": routing_metrics(),
+    }
+
+
+@status_router.get("/health/admission")
+def get_admission():
+    """Active, queued and rejected runs of every runnable and model lane"""
+
+    return {
+        "status": "success",
+        "router": "status",
+        "path": "/health/admission",
+        "utc": current_utc_str(),
+        "lanes": admission_metrics(),
+    }
@@ -3,11 +3,12 @@ from typing import AsyncGenerator, List, Optional
 
 from agno.team import Team
 from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from teams.operator import TeamType, get_available_teams, get_team
 
 from utils.log import logger
+from utils.singleflight import flight_key, run_flights
+from utils.sse import sse_response
 
 ######################################################
 ## Router for the Agent Interface
@@ -33,21 +34,19 @@ async def list_teams():
     return get_available_teams()
 
 
-async def chat_response_streamer(team: Team, message: str) -> AsyncGenerator:
+async def chat_response_streamer(team: Team, message: str, events: bool = False) -> AsyncGenerator:
     """
     Stream team responses chunk by chunk.
     Args:
         team: The team instance to interact with
         message: User message to process
+        events: Also yield tool call and run completed events
     Yields:
-        Text chunks from the team response
+        TeamRunResponse chunks, framed as server-sent events by utils.sse
     """
-    run_response = await team.arun(message, stream=True)
+    run_response = await team.arun(message, stream=True, stream_intermediate_steps=events)
     async for chunk in run_response:
-        # chunk.content only contains the text response from the Agent.
-        # For advanced use cases, we should yield the entire chunk
-        # that contains the tool calls and intermediate steps.
-        yield chunk.content
+        yield chunk
 
 
 class RunRequest(BaseModel):
@@ -58,6 +57,8 @@ class RunRequest(BaseModel):
     model: Model = Model.gemini_2_5_pro
     user_id: Optional[str] = None
     session_id: Optional[str] = None
+    # also stream tool calls and run metrics as `tool_call` / `metrics` events
+    events: bool = False
 
 
 @teams_router.post("/{team_id}/runs", status_code=status.HTTP_200_OK)
@@ -82,13 +83,17 @@ async def run_team(team_id: TeamType, body: RunRequest):
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Team not found: {str(e)}")
 
+    # Runs depend on the user (prompt) and session (history), so only those duplicates coalesce
+    key = flight_key(
+        "team", team_id.value, body.message, body.model.value, body.user_id, body.session_id, body.stream, body.events
+    )
     if body.stream:
-        return StreamingResponse(
-            chat_response_streamer(team, body.message),
-            media_type="text/event-stream",
+        return sse_response(
+            run_flights.stream(key, lambda: chat_response_streamer(team, body.message, body.events)),
+            structured=body.events,
         )
     else:
-        response = await team.arun(body.message, stream=False)
+        response = await run_flights.do(key, lambda: team.arun(body.message, stream=False))
         # response.content only contains the text response from the Agent.
         # For advanced use cases, we should yield the entire response
         # that contains the tool calls and intermediate steps.
@@ -1,13 +1,19 @@
+import asyncio
+import time
+from datetime import datetime
 from enum import Enum
 from typing import AsyncGenerator, List, Optional
 
 from agno.workflow import Workflow
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, HTTPException, status
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from workflows.operator import WorkflowType, get_available_workflows, get_workflow
 from utils.log import logger
+from utils.singleflight import flight_key, run_flights
+from utils.sse import HEARTBEAT, event_stream_response, sse_response
+from workflows.jobs import FINISHED, job_queue
+from workflows.operator import WorkflowType, astream_workflow, get_available_workflows, get_workflow, isolate_agents
 
 ######################################################
 ## Router for the Workflow Interface
@@ -30,13 +36,9 @@ async def list_workflows():
 
 
 async def workflow_response_streamer(workflow: Workflow, payload: str) -> AsyncGenerator:
-    run_response = workflow.run(payload)
-    for chunk in run_response:
-        # If chunk is a RunResponse or similar, yield its content
-        try:
-            yield getattr(chunk, "content", str(chunk))
-        except Exception:
-            yield str(chunk)
+    # blocking workflows run on a worker thread, so other streams keep flowing meanwhile
+    async for chunk in astream_workflow(workflow, payload):
+        yield chunk
 
 
 class RunRequest(BaseModel):
@@ -47,6 +49,8 @@ class RunRequest(BaseModel):
     model: Model = Model.gemini_2_5_pro
     user_id: Optional[str] = None
     session_id: Optional[str] = None
+    # also stream tool calls and run metrics as `tool_call` / `metrics` events
+    events: bool = False
 
 
 @workflows_router.post("/{workflow_id}/runs", status_code=status.HTTP_200_OK)
@@ -55,13 +59,121 @@ async def run_workflow(workflow_id: WorkflowType, body: RunRequest):
 
     try:
         wf: Workflow = get_workflow(workflow_id=workflow_id.value, wf_type=workflow_id, debug_mode=True)
+        # runs proceed concurrently, so each gets its own agents
+        isolate_agents(wf)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Workflow not found: {str(e)}")
 
+    key = flight_key("workflow", workflow_id.value, body.input, body.model.value, body.stream, body.events)
     if body.stream:
-        return StreamingResponse(workflow_response_streamer(wf, body.input), media_type="text/event-stream")
+        return sse_response(
+            run_flights.stream(key, lambda: workflow_response_streamer(wf, body.input)), structured=body.events
+        )
     else:
-        # run synchronously and return last content or aggregated content
-        resp_iter = wf.run(body.input)
-        content_list = [getattr(r, "content", str(r)) for r in resp_iter]
-        return "\n".join(content_list)
+        # run to completion and return the aggregated content
+        async def _run() -> str:
+            content_list = [getattr(r, "content", str(r)) async for r in astream_workflow(wf, body.input)]
+            return "\n".join(content_list)
+
+        return await run_flights.do(key, _run)
+
+
+######################################################
+## Jobs: runs executed by workflow workers (workflows/worker.py)
+######################################################
+
+
+class JobRequest(BaseModel):
+    """Request model for submitting a workflow job"""
+
+    input: str
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    workflow_id: str
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResult(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _job_response(job: dict) -> JobResponse:
+    return JobResponse(job_id=job["id"], **{k: job[k] for k in JobResponse.model_fields if k in job})
+
+
+async def _get_job(workflow_id: WorkflowType, job_id: str) -> dict:
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None or job["workflow_id"] != workflow_id.value:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+    return job
+
+
+@workflows_router.post("/{workflow_id}/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse)
+async def create_job(workflow_id: WorkflowType, body: JobRequest):
+    """Queue a workflow run for the workers and return at once. Poll the job or follow its events."""
+    job = await run_in_threadpool(job_queue.enqueue, workflow_id.value, body.input, body.user_id, body.session_id)
+    return _job_response(job)
+
+
+@workflows_router.get("/{workflow_id}/jobs/{job_id}", response_model=JobResponse)
+async def get_job(workflow_id: WorkflowType, job_id: str):
+    return _job_response(await _get_job(workflow_id, job_id))
+
+
+@workflows_router.get("/{workflow_id}/jobs/{job_id}/result", response_model=JobResult)
+async def get_job_result(workflow_id: WorkflowType, job_id: str):
+    """The output (or error) of a finished job; 409 while it is queued or running."""
+    job = await _get_job(workflow_id, job_id)
+    if job["status"] not in FINISHED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job['status']}")
+    return JobResult(job_id=job["id"], status=job["status"], result=job["result"], error=job["error"])
+
+
+@workflows_router.get("/{workflow_id}/jobs/{job_id}/events")
+async def get_job_events(
+    workflow_id: WorkflowType, job_id: str, after: int = 0, last_event_id: Optional[int] = Header(None)
+):
+    """
+    The job's server-sent events, from the start or after `Last-Event-ID` (or `?after=`),
+    until it finishes. Reconnecting EventSource clients resume where they left off; a
+    `reset` event means the job was restarted and what came before it should be discarded.
+    """
+    from agents.settings import agent_settings
+    from api.settings import api_settings
+
+    await _get_job(workflow_id, job_id)
+    position = last_event_id if last_event_id is not None else after
+
+    async def frames() -> AsyncGenerator:
+        nonlocal position
+        last_sent = time.monotonic()
+        while True:
+            # read the status first: events written before it finished are then all visible
+            job = await run_in_threadpool(job_queue.get, job_id)
+            events = await run_in_threadpool(job_queue.read_events, job_id, position)
+            for seq, frame in events:
+                position = seq
+                yield frame
+            if events:
+                last_sent = time.monotonic()
+                continue
+            if job is None or job["status"] in FINISHED:
+                return
+            if time.monotonic() - last_sent >= api_settings.sse_heartbeat_seconds:
+                yield HEARTBEAT
+                last_sent = time.monotonic()
+            await asyncio.sleep(agent_settings.job_poll_interval_seconds)
+
+    return event_stream_response(frames())
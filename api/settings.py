@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import FieldValidationInfo
@@ -22,6 +22,38 @@ class ApiSettings(BaseSettings):
     # Set to False to disable docs at /docs and /redoc
     docs_enabled: bool = True
 
+    # Attach identical concurrent runs to the one already in flight
+    # instead of starting a new chain of model and tool calls.
+    coalesce_runs: bool = True
+
+    # Build the pooled agents of the run endpoint at startup rather than on first use
+    # (pool size: AGENT_POOL_SIZE).
+    warm_agent_pools: bool = True
+
+    # Build the playground's agents, teams and workflows in the background after startup.
+    # When False they are built on first use.
+    warm_playground: bool = True
+
+    # Server-sent events (see utils/sse.py): text fragments are written once sse_flush_bytes
+    # are pending or the oldest waited sse_flush_interval_seconds (0 writes every fragment);
+    # idle streams get a heartbeat comment every sse_heartbeat_seconds.
+    sse_flush_interval_seconds: float = 0.05
+    sse_flush_bytes: int = 1024
+    sse_heartbeat_seconds: float = 15.0
+
+    # Admission control of the run endpoints (see utils/admission.py): concurrent runs per
+    # runnable ("agents/sage", "workflows/generate-blog-post-on", ...) and per model lane
+    # (lite, flash, pro); requests over the limits wait in a bounded queue, else get a 429.
+    admission_enabled: bool = True
+    admission_runnable_limit: int = 16
+    admission_limits: Dict[str, int] = {
+        "workflows/generate-blog-post-on": 4,
+        "workflows/generate-investment-report": 4,
+    }
+    admission_lane_limits: Dict[str, int] = {"lite": 64, "flash": 32, "pro": 16}
+    admission_queue_size: int = 32
+    admission_queue_timeout_seconds: float = 10.0
+
     # Cors origin list to allow requests from.
     # This list is set using the set_cors_origin_list validator
     # which uses the runtime_env variable to set the
@@ -1,9 +1,10 @@
+from functools import cached_property
 from os import getenv
 from pydantic_settings import BaseSettings
-from pydantic import SkipValidation, Field
-from typing import Any, ClassVar, Type
-from agno.embedder.google import GeminiEmbedder
-from agno.models.google import Gemini
+from typing import TYPE_CHECKING, ClassVar
+
+if TYPE_CHECKING:
+    from agno.embedder.google import GeminiEmbedder
 
 
 class AppSettings(BaseSettings):
@@ -22,18 +23,25 @@ class AppSettings(BaseSettings):
 
     # Configurações de embeddings
     gemini_embedding_001: str = "gemini-embedding-001"
-    default_embedder: SkipValidation[GeminiEmbedder] = Field(
-        default_factory=lambda: GeminiEmbedder(id="gemini-embedding-001")
-    )
 
     # Configurações de geração
     default_max_completion_tokens: int = 16000
     default_temperature: float = 0
 
+    # Orçamento de tokens para saídas de ferramentas e etapas intermediárias de workflows
+    tool_output_token_budget: int = 4000
+
     # Configuração para uso em logging e metadados
     app_name: ClassVar[str] = "agent-app"
     app_version: ClassVar[str] = "0.1.0"
 
+    @cached_property
+    def default_embedder(self) -> "GeminiEmbedder":
+        """Criado no primeiro uso: importar o SDK do Gemini domina o tempo de importação deste módulo."""
+        from agno.embedder.google import GeminiEmbedder
+
+        return GeminiEmbedder(id=self.gemini_embedding_001)
+
     class Config:
         """Configuração da classe Pydantic Settings."""
 
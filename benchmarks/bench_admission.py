@@ -0,0 +1,130 @@
+"""Load test: admission control under an overload of pro-model workflow runs.
+
+Fires `pro` concurrent investment report runs (gemini-2.5-pro) while `lite` sage runs
+(gemini-2.5-flash-lite) arrive every 100 ms. Every model is the fake provider sleeping
+`ttft` seconds per call, behind one shared semaphore of `capacity` calls standing in for
+the upstream provider's concurrency quota. Modes:
+
+- off: no admission control; pro runs flood the quota and lite runs queue behind them;
+- on: AdmissionMiddleware with the ApiSettings defaults (4 investment reports at a time,
+  per-lane limits) and a 2 s queue timeout; the excess pro runs get 429 at once.
+
+Reports p50/p99 latency of admitted pro runs, the 429 count, and lite run latency.
+Needs the database.
+
+Usage: python benchmarks/bench_admission.py [pro] [ttft] [capacity]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PRO_PATH = "/v1/workflows/generate-investment-report/runs"
+LITE_PATH = "/v1/agents/sage/runs"
+
+
+def limit_provider(capacity: int) -> None:
+    from utils.fake_provider import FakeModel
+
+    quota = asyncio.Semaphore(capacity)
+    ainvoke, ainvoke_stream = FakeModel.ainvoke, FakeModel.ainvoke_stream
+
+    async def limited_ainvoke(self, messages, **kwargs):
+        async with quota:
+            return await ainvoke(self, messages, **kwargs)
+
+    async def limited_ainvoke_stream(self, messages, **kwargs):
+        async with quota:
+            async for chunk in ainvoke_stream(self, messages, **kwargs):
+                yield chunk
+
+    setattr(FakeModel, "ainvoke", limited_ainvoke)
+    setattr(FakeModel, "ainvoke_stream", limited_ainvoke_stream)
+
+
+async def timed(client, path: str, body: dict) -> Tuple[int, float]:
+    start = time.perf_counter()
+    response = await client.post(path, json=body)
+    return response.status_code, time.perf_counter() - start
+
+
+async def load(client, pro: int):
+    pro_body = {"input": "NVDA, AMD", "stream": False, "model": "gemini-2.5-pro"}
+    pro_runs = [
+        asyncio.create_task(timed(client, PRO_PATH, {**pro_body, "session_id": str(uuid.uuid4())})) for _ in range(pro)
+    ]
+    lite_runs = []
+    while not all(run.done() for run in pro_runs):
+        body = {"message": f"hello {uuid.uuid4()}", "stream": False, "model": "gemini-2.5-flash-lite"}
+        lite_runs.append(asyncio.create_task(timed(client, LITE_PATH, body)))
+        await asyncio.sleep(0.1)
+    return await asyncio.gather(*pro_runs), await asyncio.gather(*lite_runs)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(pro: int) -> None:
+    import httpx
+    from starlette.types import ASGIApp
+
+    from api.main import app
+    from api.settings import api_settings
+    from utils.admission import AdmissionController, AdmissionMiddleware
+
+    controller = AdmissionController(
+        runnable_limit=api_settings.admission_runnable_limit,
+        limits=api_settings.admission_limits,
+        lane_limits=api_settings.admission_lane_limits,
+        queue_size=api_settings.admission_queue_size,
+        queue_timeout=2.0,
+    )
+    modes: Dict[str, ASGIApp] = {"off": app, "on": AdmissionMiddleware(app, controller)}
+    rows = []
+    for name, asgi in modes.items():
+        transport = httpx.ASGITransport(app=asgi)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            await load(client, 1)  # warm-up
+            rows.append((name, *await load(client, pro)))
+
+    print(f"\n{pro} concurrent pro workflow runs")
+    for name, pro_runs, lite_runs in rows:
+        admitted = [seconds for code, seconds in pro_runs if code == 200]
+        rejected = sum(1 for code, _ in pro_runs if code == 429)
+        lite = [seconds for code, seconds in lite_runs if code == 200]
+        print(
+            f"{name:>3}: pro p50 {percentile(admitted, 0.5) * 1e3:7.0f} ms"
+            f"  p99 {percentile(admitted, 0.99) * 1e3:7.0f} ms"
+            f"  429s {rejected:3d}/{pro}"
+            f"  lite p50 {statistics.median(lite) * 1e3:6.0f} ms  p99 {percentile(lite, 0.99) * 1e3:6.0f} ms"
+            f" ({len(lite)} runs)"
+        )
+
+
+def main(pro: int = 48, ttft: float = 0.2, capacity: int = 16) -> None:
+    os.environ["MODEL_PROVIDER_OVERRIDE"] = "fake"
+    os.environ["FAKE_MODEL_TTFT_SECONDS"] = str(ttft)
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["COALESCE_RUNS"] = "false"
+    os.environ["ADMISSION_ENABLED"] = "false"
+    limit_provider(capacity)
+    asyncio.run(run(pro))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 48,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.2,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 16,
+    )
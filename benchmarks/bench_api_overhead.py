@@ -0,0 +1,89 @@
+"""Benchmark: framework overhead of the run endpoints, with no model in the loop.
+
+Every model is replaced by the offline fake provider (MODEL_PROVIDER_OVERRIDE=fake)
+with zero injected latency, so the measured time is routing, agent construction,
+storage round-trips, tool dispatch and SSE framing. Pass `ttft` / `inter_chunk` to
+add provider-like latency and load-test the service itself. Needs the database.
+
+Usage: python benchmarks/bench_api_overhead.py [requests] [concurrency] [ttft] [inter_chunk]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ENDPOINTS = [
+    ("agent", "/v1/agents/sage/runs", {"message": "What is an index fund?"}),
+    ("team", "/v1/teams/multi-language/runs", {"message": "Say hello"}),
+    ("workflow", "/v1/workflows/generate-investment-report/runs", {"input": "NVDA, AMD"}),
+]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+async def measure(client, path: str, body: dict, requests: int, concurrency: int, stream: bool) -> List[float]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        payload = {**body, "stream": stream, "session_id": str(uuid.uuid4())}
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+async def run(requests: int, concurrency: int) -> None:
+    import httpx
+
+    from api.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for name, path, body in ENDPOINTS:
+            for stream in (False, True):
+                await measure(client, path, body, min(requests, 5), 1, stream)  # warm-up
+                latencies = await measure(client, path, body, requests, concurrency, stream)
+                rows.append((name, stream, latencies))
+
+    # printed last: agents in debug mode log every run
+    print(f"\n{requests} requests per endpoint, {concurrency} concurrent")
+    for name, stream, latencies in rows:
+        print(
+            f"{name:>8} stream={str(stream):5}  p50 {statistics.median(latencies) * 1e3:7.1f} ms"
+            f"  p99 {percentile(latencies, 0.99) * 1e3:7.1f} ms"
+        )
+
+
+def main(requests: int = 50, concurrency: int = 8, ttft: float = 0.0, inter_chunk: float = 0.0) -> None:
+    os.environ["MODEL_PROVIDER_OVERRIDE"] = "fake"
+    os.environ["FAKE_MODEL_TTFT_SECONDS"] = str(ttft)
+    os.environ["FAKE_MODEL_INTER_CHUNK_SECONDS"] = str(inter_chunk)
+    # measure every run end to end: no cached responses, no coalesced duplicates
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["COALESCE_RUNS"] = "false"
+    asyncio.run(run(requests, concurrency))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.0,
+        float(sys.argv[4]) if len(sys.argv) > 4 else 0.0,
+    )
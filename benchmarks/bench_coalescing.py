@@ -0,0 +1,63 @@
+"""Benchmark: upstream runs saved by coalescing under bursty traffic.
+
+Simulates bursts of requests whose topics follow a Zipf-like popularity curve.
+Each upstream run streams for `run_seconds`; duplicates that arrive while a run
+is in flight attach to it. Prints how many upstream runs (i.e. model call chains)
+were started with and without coalescing.
+
+Usage: python benchmarks/bench_coalescing.py [requests] [topics] [run_seconds]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.singleflight import SingleFlight, flight_key  # noqa: E402
+
+
+async def simulate(enabled: bool, requests: int, topics: int, run_seconds: float) -> tuple:
+    flights = SingleFlight(enabled=enabled)
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(topics)]
+    upstream = 0
+
+    async def run(topic: str):
+        nonlocal upstream
+        upstream += 1
+        for _ in range(10):
+            await asyncio.sleep(run_seconds / 10)
+            yield topic
+
+    async def request(topic: str):
+        key = flight_key("workflow", "generate-blog-post-on", topic, "gemini-2.5-pro")
+        return [chunk async for chunk in flights.stream(key, lambda: run(topic))]
+
+    tasks: List[asyncio.Task] = []
+    start = time.perf_counter()
+    while len(tasks) < requests:
+        # a burst of 1-20 requests, then a short lull
+        for _ in range(rng.randint(1, 20)):
+            topic = f"topic-{rng.choices(range(topics), weights)[0]}"
+            tasks.append(asyncio.create_task(request(topic)))
+        await asyncio.sleep(rng.uniform(0, run_seconds))
+    await asyncio.gather(*tasks)
+    return upstream, len(tasks), time.perf_counter() - start
+
+
+def main(requests: int = 500, topics: int = 50, run_seconds: float = 0.2) -> None:
+    for name, enabled in (("off", False), ("on", True)):
+        upstream, total, elapsed = asyncio.run(simulate(enabled, requests, topics, run_seconds))
+        print(f"coalescing {name:>3}: {upstream:4d} upstream runs for {total} requests ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.2,
+    )
@@ -0,0 +1,65 @@
+"""Benchmark: `get_agent` latency and allocations per request.
+
+"before" clears the blueprint cache ahead of every call, which reproduces the old
+path of rebuilding prompts, model, storage and tools for each request. "after"
+reuses the cached blueprint and only clones the prototype. "pooled" checks agents
+out of a warm `AgentPool` and back in, as the run endpoint does.
+
+Requires the dev database (`ag ws up`) since storage handles connect on creation.
+
+Usage: python benchmarks/bench_get_agent.py [agent_id] [iterations]
+"""
+
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.operator import AgentType, get_agent, get_agent_pool  # noqa: E402
+from utils.base_agent import clear_blueprints  # noqa: E402
+
+
+def measure(agent_type: AgentType, iterations: int, mode: str):
+    latencies = []
+    allocated = []
+    pool = get_agent_pool(agent_type, "gemini-2.5-flash-lite")
+    pool.warm()
+    for i in range(iterations):
+        if mode == "before":
+            clear_blueprints()
+        tracemalloc.start()
+        start = time.perf_counter()
+        if mode == "pooled":
+            agent = pool.checkout(user_id=f"user-{i}", session_id=f"session-{i}")
+            latencies.append(time.perf_counter() - start)
+            pool.checkin(agent)
+        else:
+            get_agent(agent_id=agent_type, user_id=f"user-{i}", session_id=f"session-{i}")
+            latencies.append(time.perf_counter() - start)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated.append(peak)
+        tracemalloc.stop()
+    return latencies, allocated
+
+
+def main(agent_id: str = "scholar", iterations: int = 50) -> None:
+    agent_type = AgentType(agent_id)
+    get_agent(agent_id=agent_type)  # warm imports and the prompt registry
+
+    for name in ("before", "after", "pooled"):
+        latencies, allocated = measure(agent_type, iterations, name)
+        print(
+            f"{name:>6}: p50 {statistics.median(latencies) * 1e3:7.2f} ms"
+            f"  max {max(latencies) * 1e3:7.2f} ms"
+            f"  peak alloc {statistics.median(allocated) / 1024:8.1f} KiB/request"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "scholar",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
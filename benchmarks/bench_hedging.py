@@ -0,0 +1,105 @@
+"""Benchmark: time-to-first-token with and without hedging across model tiers.
+
+Two fake providers stream through `ainvoke_stream` with injected latency: the
+primary (standing in for gemini-2.5-pro) usually answers in ~100 ms but 3% of calls
+stall for 1.5 s; the secondary (gemini-2.5-flash) answers in ~150 ms. With routing
+enabled a call that has not produced its first chunk by the primary's p95 is hedged
+to the secondary and the slower stream is cancelled. Each mode is warmed up first so
+the hedge deadline is learned from samples rather than the initial delay.
+
+Usage: python benchmarks/bench_hedging.py [requests] [concurrency]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agno.models.base import Model  # noqa: E402
+from agno.models.message import Message  # noqa: E402
+
+from agents.settings import agent_settings  # noqa: E402
+from utils.model_router import enable_routing, routing_metrics  # noqa: E402
+
+MESSAGES = [Message(role="user", content="Summarise the latest earnings call.")]
+
+
+@dataclass
+class LatencyModel(Model):
+    id: str = "fake"
+    provider: str = "Fake"
+    base: float = 0.1
+    jitter: float = 0.02
+    stall_rate: float = 0.0
+    stall: float = 1.5
+
+    def sample(self) -> float:
+        if random.random() < self.stall_rate:
+            return self.stall
+        return max(0.0, random.gauss(self.base, self.jitter))
+
+    async def ainvoke_stream(self, **kwargs):
+        await asyncio.sleep(self.sample())
+        for _ in range(5):
+            yield "token"
+            await asyncio.sleep(0.005)
+
+    def invoke(self, **kwargs):
+        raise NotImplementedError
+
+    async def ainvoke(self, **kwargs):
+        raise NotImplementedError
+
+    def invoke_stream(self, **kwargs):
+        raise NotImplementedError
+
+    def parse_provider_response(self, response, **kwargs):
+        raise NotImplementedError
+
+    def parse_provider_response_delta(self, response):
+        raise NotImplementedError
+
+
+async def measure(model, requests: int, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    ttft = []
+
+    async def one():
+        async with gate:
+            start = time.perf_counter()
+            first: Optional[float] = None
+            async for _ in model.ainvoke_stream(messages=MESSAGES):
+                first = first or time.perf_counter()
+            assert first is not None, "the model streamed no chunks"
+            ttft.append(first - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return ttft
+
+
+def main(requests: int = 400, concurrency: int = 20) -> None:
+    random.seed(7)
+    agent_settings.hedge_min_samples = 20
+    primary = LatencyModel(id="fake-pro", base=0.1, stall_rate=0.03)
+    secondary = LatencyModel(id="fake-flash", base=0.15)
+
+    for name, model in (("primary only", primary), ("hedged", enable_routing(primary, [secondary]))):
+        asyncio.run(measure(model, 100, concurrency))  # warm-up
+        ttft = asyncio.run(measure(model, requests, concurrency))
+        q = statistics.quantiles(ttft, n=100)
+        print(f"{name:>12}: ttft p50 {q[49] * 1e3:7.1f} ms  p99 {q[98] * 1e3:7.1f} ms")
+    stats = routing_metrics()
+    print(f"hedged {stats['hedged']}/{stats['calls']} calls, secondary won {stats['hedge_wins']}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -0,0 +1,82 @@
+"""Import-time profile of the service entry points and Streamlit pages.
+
+Each target is imported in a fresh interpreter with `python -X importtime`, `runs`
+times; the report gives the median cold import time and the heaviest imports
+(cumulative) of the last run. A Streamlit page is profiled through its import
+statements only, so nothing is rendered and no agent runs.
+
+Usage: python benchmarks/bench_import_time.py [runs] [top]
+"""
+
+import ast
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = ["api.main", "agents.settings", "app_settings.settings", "utils.model_factory"]
+
+
+def page_imports(path: Path) -> str:
+    """The top-level import statements of a script, as source.
+
+    Each statement tolerates a missing module (e.g. streamlit outside the UI image);
+    the names of missing modules are printed so the report can list them.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            module = node.module if isinstance(node, ast.ImportFrom) else node.names[0].name
+            statements.append(
+                f"try:\n    {ast.unparse(node)}\n"
+                f"except ImportError as e:\n    print('missing:' + (e.name or {module!r}))"
+            )
+    return "\n".join(statements)
+
+
+def profile(source: str) -> Tuple[float, List[Tuple[int, str]], List[str]]:
+    """Import time (ms) of `source`, (cumulative us, module) of every import and missing modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    # top-level imports are the unindented rows; `site` is interpreter startup
+    total = sum(us for us, name in rows if not name.startswith("  ") and name.strip() != "site") / 1e3
+    missing = {line.split(":", 1)[1] for line in result.stdout.splitlines() if line.startswith("missing:")}
+    return total, rows, sorted(missing)
+
+
+def main(runs: int = 5, top: int = 8) -> None:
+    targets: Dict[str, str] = {module: f"import {module}" for module in MODULES}
+    for page in [ROOT / "ui" / "Home.py", *sorted((ROOT / "ui" / "pages").glob("*.py"))]:
+        if page.name != "__init__.py":
+            targets[str(page.relative_to(ROOT))] = page_imports(page)
+
+    for target, source in targets.items():
+        totals = []
+        for _ in range(runs):
+            total, rows, missing = profile(source)
+            totals.append(total)
+        print(f"\n{target}: {statistics.median(totals):.0f} ms (median of {runs} cold imports)")
+        if missing:
+            print(f"  not installed, skipped: {', '.join(missing)}")
+        for us, name in sorted(row for row in rows if row[1].strip() != "site")[::-1][:top]:
+            print(f"  {us / 1e3:8.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
@@ -0,0 +1,95 @@
+"""Benchmark: cold vs warm first-token latency through `create_model`.
+
+Runs a local stub of the Gemini `streamGenerateContent` endpoint (HTTP/1.1 keep-alive)
+and streams one short completion per request. New connections sleep for
+`handshake_ms` to stand in for the TCP + TLS setup a real endpoint costs.
+
+"cold" clears the client pool before every request, which reproduces the old path of
+one `google.genai` client (and connection pool) per model object. "warm" reuses the
+pooled client, so requests ride the already-open connection.
+
+Usage: python benchmarks/bench_model_client.py [iterations] [handshake_ms]
+"""
+
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agno.models.message import Message  # noqa: E402
+
+from utils.model_factory import clear_clients, create_model  # noqa: E402
+
+CHUNK = {"candidates": [{"content": {"role": "model", "parts": [{"text": "Hello"}]}}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshake_s = 0.0
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        type(self).connections += 1
+        time.sleep(self.handshake_s)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"".join(f"data: {json.dumps(CHUNK)}\r\n\r\n".encode() for _ in range(3))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def first_token_latency(base_url: str) -> float:
+    start = time.perf_counter()
+    model = create_model("gemini-2.5-flash", api_key="bench", http_options={"base_url": base_url})
+    first: Optional[float] = None
+    # drain the stream so the connection goes back to the pool
+    for _ in model.invoke_stream(messages=[Message(role="user", content="hi")]):
+        first = first or time.perf_counter()
+    assert first is not None, "the stub server sent no chunks"
+    return first - start
+
+
+def main(iterations: int = 50, handshake_ms: float = 20.0) -> None:
+    StubHandler.handshake_s = handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    first_token_latency(base_url)  # warm imports
+    for name, cold in (("cold", True), ("warm", False)):
+        clear_clients()
+        StubHandler.connections = 0
+        latencies = []
+        for _ in range(iterations):
+            if cold:
+                clear_clients()
+            latencies.append(first_token_latency(base_url))
+        print(
+            f"{name:>5}: p50 {statistics.median(latencies) * 1e3:7.2f} ms"
+            f"  p99 {statistics.quantiles(latencies, n=100)[98] * 1e3:7.2f} ms"
+            f"  connections {StubHandler.connections}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+    )
@@ -0,0 +1,44 @@
+"""Microbenchmark: prompt render cost per agent creation.
+
+"before" reproduces the per-call path: read + parse the YAML file and build a fresh
+`jinja2.Template` for every prompt key. "after" goes through `render_prompt`, which
+only evaluates the precompiled templates held by the prompt registry.
+
+Usage: python benchmarks/bench_prompt_render.py [iterations]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import yaml
+from jinja2 import Template
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.prompt_loader import render_prompt  # noqa: E402
+
+PROMPT_PATH = "prompts/agents/scholar.yaml"
+CTX = {"user_id": "bench-user", "user_query": "What is retrieval augmented generation?"}
+
+
+def render_before() -> dict:
+    data = yaml.safe_load(Path(PROMPT_PATH).read_text())
+    return {k: Template(v).render(**CTX) for k, v in data["prompt"].items()}
+
+
+def render_after() -> dict:
+    prompts, _ = render_prompt(PROMPT_PATH, **CTX)
+    return dict(prompts)
+
+
+def main(iterations: int = 2000) -> None:
+    assert render_before() == render_after()
+
+    for name, fn in (("before", render_before), ("after", render_after)):
+        best = min(timeit.repeat(fn, number=iterations, repeat=5))
+        print(f"{name:>6}: {best / iterations * 1e6:9.1f} us/agent")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
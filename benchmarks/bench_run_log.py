@@ -0,0 +1,122 @@
+"""Write amplification and per-turn latency of session storage as sessions grow.
+
+Grows one agent session to `runs` runs, saving it after every turn the way agno does
+(the whole session object, with every run in `memory["runs"]`), with:
+
+- session: agno's PostgresStorage, one row per session re-written each turn;
+- run_log: RunLogStorage, a small head row plus one appended row per turn;
+- window: RunLogStorage with `history_runs=20` (RUN_LOG_HISTORY_RUNS), which reads
+  back only the last 20 runs.
+
+Each run is ~`kb` KB (messages and metrics). At each checkpoint the report gives the
+mean save latency and the WAL bytes written per turn (pg_current_wal_lsn) over the
+last `window` turns, and the latency of reading the session back. Needs the database;
+writes to scratch tables that are dropped afterwards.
+
+Usage: python benchmarks/bench_run_log.py [runs] [kb]
+"""
+
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TABLE = "bench_run_log"
+CHECKPOINTS = (10, 50, 100, 200, 300, 500)
+
+
+def make_run(turn: int, kb: int) -> dict:
+    # random text: real conversations do not compress like repeated strings would under TOAST
+    message_chars = max(kb * 1024 // 4, 64)
+    text = " ".join(uuid.uuid4().hex for _ in range(message_chars * 2 // 33 + 1))
+    return {
+        "run_id": str(uuid.uuid4()),
+        "content": text[:message_chars],
+        "model": "gemini-2.5-flash",
+        "created_at": int(time.time()),
+        "metrics": {"input_tokens": [120], "output_tokens": [480], "time": [1.2]},
+        "messages": [
+            {"role": "system", "content": "You are a research assistant." * 4},
+            {"role": "user", "content": text[:message_chars]},
+            {"role": "assistant", "content": text[: message_chars * 2]},
+        ],
+    }
+
+
+def wal_lsn(conn) -> int:
+    from sqlalchemy import text
+
+    return conn.execute(text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")).scalar()
+
+
+def grow(storage, engine, runs: int, kb: int, window: int = 10) -> List[tuple]:
+    from agno.storage.session.agent import AgentSession
+
+    session_id = str(uuid.uuid4())
+    history: List[dict] = []
+    latencies: List[float] = []
+    rows = []
+    with engine.connect() as probe:
+        start_lsn = wal_lsn(probe)
+        for turn in range(1, runs + 1):
+            history.append(make_run(turn, kb))
+            session = AgentSession(
+                session_id=session_id,
+                agent_id="scholar",
+                user_id="bench",
+                memory={"runs": list(history), "memories": {}, "summaries": {}},
+                agent_data={"name": "Scholar"},
+                session_data={"session_metrics": {"total_tokens": 600 * turn}},
+            )
+            started = time.perf_counter()
+            storage.upsert(session)
+            latencies.append(time.perf_counter() - started)
+            if turn % window == 0:
+                end_lsn = wal_lsn(probe)
+                wal_per_turn, start_lsn = (end_lsn - start_lsn) / window, end_lsn
+            if turn in CHECKPOINTS:
+                started = time.perf_counter()
+                view = len(storage.read(session_id).memory["runs"])
+                assert view == min(turn, getattr(storage, "history_runs", None) or turn)
+                read = time.perf_counter() - started
+                rows.append((turn, statistics.mean(latencies[-window:]), wal_per_turn, read))
+    storage.delete_session(session_id)
+    return rows
+
+
+def main(runs: int = 300, kb: int = 4) -> None:
+    from agno.storage.postgres import PostgresStorage
+
+    from db.run_log import RunLogStorage
+    from db.storage import get_engine
+
+    engine = get_engine()
+    backends = {
+        "session": PostgresStorage(table_name=TABLE, db_engine=engine, mode="agent"),
+        "run_log": RunLogStorage(table_name=TABLE, mode="agent", db_engine=engine),
+        "window": RunLogStorage(table_name=TABLE, mode="agent", db_engine=engine, history_runs=20),
+    }
+    for name, storage in backends.items():
+        storage.create()
+        try:
+            grow(storage, engine, 10, kb)  # warm-up
+            rows = grow(storage, engine, runs, kb)
+        finally:
+            storage.drop()
+        print(f"\n{name}: one session growing to {runs} runs of ~{kb} KB")
+        for turn, latency, wal, read in rows:
+            print(
+                f"  run {turn:4d}: save {latency * 1e3:7.2f} ms  WAL/turn {wal / 1024:9.1f} KB"
+                f"  read {read * 1e3:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,190 @@
+"""Storage size and save/load latency of session tables, with and without compression.
+
+Builds a synthetic dataset of `sessions` blog post workflow sessions (session_state with
+five scraped articles and the finished post) and as many team sessions (20 runs, each
+with three member responses), from synthetic prose that compresses like English text.
+Each configuration saves every session, then loads every session back:
+
+- plain: agno's PostgresStorage, JSONB as is (Postgres still TOAST-compresses it, pglz);
+- zlib-1 / zlib-6: CompressedPostgresStorage at level 1 / 6, 16 KiB threshold.
+
+Reports the tables' total size (heap + TOAST + indexes), and mean/p99 save and load
+latency. Needs the database; writes to scratch tables that are dropped afterwards.
+
+Usage: python benchmarks/bench_session_compression.py [sessions]
+"""
+
+import itertools
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+LETTER_FREQUENCY = [
+    12.7,
+    9.1,
+    8.2,
+    7.5,
+    7.0,
+    6.7,
+    6.3,
+    6.1,
+    6.0,
+    4.3,
+    4.0,
+    2.8,
+    2.8,
+    2.4,
+    2.4,
+    2.2,
+    2.0,
+    2.0,
+    1.9,
+    1.5,
+    1.0,
+    0.8,
+    0.2,
+    0.2,
+    0.1,
+    0.1,
+]
+
+
+class Prose:
+    """Text from a 20k-word vocabulary with Zipf frequencies: zlib compresses it ~2.4x, like English."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.vocab = [
+            "".join(rng.choices(LETTERS, LETTER_FREQUENCY, k=max(1, int(rng.gauss(5, 2.5))))) for _ in range(20000)
+        ]
+        self.cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(self.vocab) + 1)))
+
+    def __call__(self, chars: int) -> str:
+        sentences, length = [], 0
+        while length < chars:
+            sentence = (
+                " ".join(
+                    self.rng.choices(self.vocab, cum_weights=self.cum_weights, k=self.rng.randint(8, 20))
+                ).capitalize()
+                + "."
+            )
+            sentences.append(sentence)
+            length += len(sentence) + 1
+        return " ".join(sentences)[:chars]
+
+
+def blog_session(prose: Prose, i: int):
+    from agno.storage.session.workflow import WorkflowSession
+
+    articles = {
+        f"https://example.com/{i}/{n}": {
+            "title": prose(60),
+            "url": f"https://example.com/{i}/{n}",
+            "content": prose(8000),
+        }
+        for n in range(5)
+    }
+    state = {"scraped_articles": {"topic": articles}, "blog_posts": {"topic": prose(6000)}}
+    return WorkflowSession(
+        session_id=f"blog-{i}",
+        workflow_id="generate-blog-post-on",
+        user_id="bench",
+        memory={"runs": [{"input": {"topic": "topic"}, "response": {"run_id": f"blog-{i}", "content": prose(6000)}}]},
+        session_data={"session_state": state},
+    )
+
+
+def team_session(prose: Prose, i: int):
+    from agno.storage.session.team import TeamSession
+
+    runs = [
+        {
+            "run_id": f"team-{i}-{n}",
+            "content": prose(1500),
+            "member_responses": [{"agent_id": f"member-{m}", "content": prose(2000)} for m in range(3)],
+        }
+        for n in range(20)
+    ]
+    return TeamSession(
+        session_id=f"team-{i}",
+        team_id="finance-researcher",
+        user_id="bench",
+        memory={"runs": runs},
+        team_data={"team_context": {"text": prose(3000)}},
+        session_data={},
+    )
+
+
+def table_size(engine, fullname: str) -> int:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": fullname}).scalar()
+
+
+def measure(storage, sessions) -> Dict[str, List[float]]:
+    saves, loads = [], []
+    for session in sessions:
+        start = time.perf_counter()
+        storage.upsert(session)
+        saves.append(time.perf_counter() - start)
+    for session in sessions:
+        start = time.perf_counter()
+        assert storage.read(session.session_id) is not None
+        loads.append(time.perf_counter() - start)
+    return {"save": saves, "load": loads}
+
+
+def p99(values: List[float]) -> float:
+    return sorted(values)[int(0.99 * (len(values) - 1))]
+
+
+def main(sessions: int = 200) -> None:
+    from agno.storage.postgres import PostgresStorage
+
+    from db.codec import CompressedPostgresStorage, SessionCodec
+    from db.storage import get_engine
+
+    engine = get_engine()
+    prose = Prose(random.Random(0))
+    dataset = {
+        "workflow": [blog_session(prose, i) for i in range(sessions)],
+        "team": [team_session(prose, i) for i in range(sessions)],
+    }
+
+    def plain(mode):
+        return PostgresStorage(table_name=f"bench_codec_{mode}", db_engine=engine, mode=mode)
+
+    def zlib(level):
+        return lambda mode: CompressedPostgresStorage(
+            table_name=f"bench_codec_{mode}", db_engine=engine, mode=mode, codec=SessionCodec(16384, level)
+        )
+
+    for name, make in {"plain": plain, "zlib-1": zlib(1), "zlib-6": zlib(6)}.items():
+        print(f"\n{name}")
+        for mode, items in dataset.items():
+            storage = make(mode)
+            storage.drop()
+            storage.create()
+            try:
+                timings = measure(storage, items)
+                size = table_size(engine, storage.table.fullname)
+            finally:
+                storage.drop()
+            print(
+                f"  {mode:>8}: {size / 2**20:6.1f} MiB"
+                f"  save mean {statistics.mean(timings['save']) * 1e3:6.2f} ms"
+                f"  p99 {p99(timings['save']) * 1e3:6.2f} ms"
+                f"  load mean {statistics.mean(timings['load']) * 1e3:6.2f} ms"
+                f"  p99 {p99(timings['load']) * 1e3:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
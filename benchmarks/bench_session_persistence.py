@@ -0,0 +1,141 @@
+"""Load test: persisting agent sessions from concurrent streams, sync vs async.
+
+Runs `streams` concurrent fake streams (`chunks` tokens, 5-15 ms apart) that each save an
+agent session of ~`kb` KB at the end of every run, as agno does after a run, while
+a probe measures event loop lag every 10 ms. Modes:
+
+- sync: PostgresStorage.upsert on the event loop (what agno's `arun` does today);
+- thread: the same upsert through asyncio.to_thread, on the sync pool (DB_POOL_SIZE);
+- async: the same INSERT ... ON CONFLICT through an AsyncSession (db.session.AsyncSessionLocal),
+  on the async pool (DB_ASYNC_POOL_SIZE).
+
+Needs the database; writes to a scratch table that is dropped afterwards.
+
+Usage: python benchmarks/bench_session_persistence.py [streams] [chunks] [kb]
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+TABLE = "bench_session_persistence"
+
+
+def make_session(kb: int):
+    from agno.storage.session.agent import AgentSession
+
+    message = {"role": "assistant", "content": "x" * 1024}
+    return AgentSession(
+        session_id=str(uuid.uuid4()),
+        agent_id="bench_agent",
+        user_id="bench",
+        memory={"runs": [], "messages": [message] * kb},
+        agent_data={"name": "bench"},
+        session_data={},
+    )
+
+
+def upsert_statement(table, session):
+    from sqlalchemy.dialects import postgresql
+
+    values = dict(
+        agent_id=session.agent_id,
+        team_session_id=session.team_session_id,
+        user_id=session.user_id,
+        memory=session.memory,
+        agent_data=session.agent_data,
+        session_data=session.session_data,
+        extra_data=session.extra_data,
+    )
+    stmt = postgresql.insert(table).values(session_id=session.session_id, **values)
+    return stmt.on_conflict_do_update(index_elements=["session_id"], set_={**values, "updated_at": int(time.time())})
+
+
+async def load(save: Callable[[object], Awaitable[None]], streams: int, chunks: int, kb: int):
+    durations: List[float] = []
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    async def stream() -> None:
+        session = make_session(kb)
+        start = time.perf_counter()
+        for _ in range(chunks):
+            await asyncio.sleep(random.uniform(0.005, 0.015))
+        await save(session)
+        durations.append(time.perf_counter() - start)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(stream() for _ in range(streams)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return elapsed, durations, lags
+
+
+async def run(streams: int, chunks: int, kb: int) -> None:
+    from agno.storage.postgres import PostgresStorage
+
+    from db.session import AsyncSessionLocal, async_db_engine
+    from db.storage import get_storage
+
+    # the async mode writes straight to the session table, whatever STORAGE_BACKEND says
+    storage = get_storage(TABLE, mode="agent", backend="session")
+    assert isinstance(storage, PostgresStorage)
+    storage.create()
+
+    async def sync_save(session) -> None:
+        storage.upsert(session)
+
+    async def thread_save(session) -> None:
+        await asyncio.to_thread(storage.upsert, session)
+
+    async def async_save(session) -> None:
+        async with AsyncSessionLocal() as db, db.begin():
+            await db.execute(upsert_statement(storage.table, session))
+
+    modes: Dict[str, Callable] = {"sync": sync_save, "thread": thread_save, "async": async_save}
+    rows = []
+    try:
+        for name, save in modes.items():
+            await load(save, 32, 1, kb)  # fill the pool
+            rows.append((name, *await load(save, streams, chunks, kb)))
+    finally:
+        await async_db_engine.dispose()
+        storage.drop()
+
+    print(f"\n{streams} concurrent streams, {chunks} chunks each, {kb} KB sessions")
+    for name, elapsed, durations, lags in rows:
+        durations.sort()
+        print(
+            f"{name:>6}: all done in {elapsed * 1e3:6.0f} ms"
+            f"  stream p50 {statistics.median(durations) * 1e3:6.0f} ms"
+            f"  p99 {durations[int(0.99 * (len(durations) - 1))] * 1e3:6.0f} ms"
+            f"  loop lag p99 {sorted(lags)[int(0.99 * (len(lags) - 1))] * 1e3:6.1f} ms  max {max(lags) * 1e3:6.1f} ms"
+        )
+
+
+def main(streams: int = 200, chunks: int = 20, kb: int = 16) -> None:
+    random.seed(0)
+    asyncio.run(run(streams, chunks, kb))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 16,
+    )
@@ -0,0 +1,79 @@
+"""Benchmark: socket writes and bytes per streamed response for long generations.
+
+An agent backed by the offline fake provider streams `chars` characters in
+`chunk_chars` fragments, `inter_chunk` seconds apart. Each response is driven through
+Starlette's StreamingResponse and the ASGI `http.response.body` messages are counted;
+uvicorn issues one socket write (one send syscall) per message. Modes:
+
+- raw: the old streamers, one unframed write per fragment;
+- sse: SSE framing with coalescing off (flush interval 0);
+- sse coalesced: SSE framing with the default 50 ms / 1 KiB flush policy.
+
+Usage: python benchmarks/bench_sse.py [chars] [chunk_chars] [inter_chunk]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agno.agent import Agent  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from utils.fake_provider import FakeModel  # noqa: E402
+from utils.sse import sse_stream  # noqa: E402
+
+
+async def drive(response: StreamingResponse):
+    writes = 0
+    size = 0
+
+    async def receive():
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        nonlocal writes, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            writes += 1
+            size += len(message["body"])
+
+    await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    return writes, size
+
+
+async def run(chars: int, chunk_chars: int, inter_chunk: float) -> None:
+    agent = Agent(model=FakeModel(response_chars=chars, chunk_chars=chunk_chars, inter_chunk=inter_chunk))
+
+    async def chunks():
+        async for chunk in await agent.arun("Write a long report", stream=True):
+            yield chunk
+
+    async def raw():
+        async for chunk in chunks():
+            yield chunk.content
+
+    modes = {
+        "raw": lambda: raw(),
+        "sse": lambda: sse_stream(chunks(), flush_interval=0),
+        "sse coalesced": lambda: sse_stream(chunks()),
+    }
+    print(f"\n{chars} chars in {chunk_chars}-char fragments, {inter_chunk * 1e3:.1f} ms apart")
+    for name, frames in modes.items():
+        start = time.perf_counter()
+        writes, size = await drive(StreamingResponse(frames(), media_type="text/event-stream"))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>14}: {writes:6d} writes  {size / 1024:8.1f} KiB  {elapsed * 1e3:7.0f} ms")
+
+
+def main(chars: int = 20000, chunk_chars: int = 4, inter_chunk: float = 0.0002) -> None:
+    asyncio.run(run(chars, chunk_chars, inter_chunk))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.0002,
+    )
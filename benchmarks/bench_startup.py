@@ -0,0 +1,87 @@
+"""Benchmark: time-to-ready of `uvicorn api.main:app`.
+
+Starts the server `runs` times per configuration and measures the time from process
+start until /v1/health answers. "lazy" is the default (agent pools and playground
+entries built in the background after startup); "no warm-up" turns both warm-ups
+off; "eager" builds the whole playground at import, as the app used to.
+
+Requires the dev database (`ag ws up`) for the agent pools and playground storages.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CONFIGS = {
+    "lazy": {},
+    "no warm-up": {"WARM_AGENT_POOLS": "false", "WARM_PLAYGROUND": "false"},
+    "eager": {"WARM_AGENT_POOLS": "false", "WARM_PLAYGROUND": "false", "BENCH_EAGER_PLAYGROUND": "true"},
+}
+
+EAGER_APP = """
+from api.main import app
+from api.routes.playground import warm_playground
+warm_playground()
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_ready(env: dict, timeout: float = 120.0) -> float:
+    port = free_port()
+    if env.get("BENCH_EAGER_PLAYGROUND"):
+        app_dir = Path("/tmp/bench_startup")
+        app_dir.mkdir(exist_ok=True)
+        (app_dir / "eager_app.py").write_text(EAGER_APP, encoding="utf-8")
+        target, extra = "eager_app:app", ["--app-dir", str(app_dir)]
+        env = {**env, "PYTHONPATH": str(ROOT)}
+    else:
+        target, extra = "api.main:app", []
+    command = [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning", *extra]
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=ROOT,
+        env={**os.environ, "MODEL_PROVIDER_OVERRIDE": "fake", **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/v1/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError("server did not become ready")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(runs: int = 3) -> None:
+    results = {name: [time_to_ready(env) for _ in range(runs)] for name, env in CONFIGS.items()}
+    print(f"\ntime to ready, median of {runs} starts")
+    for name, times in results.items():
+        print(f"{name:>10}: {statistics.median(times) * 1e3:8.0f} ms  (max {max(times) * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
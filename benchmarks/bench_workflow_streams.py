@@ -0,0 +1,113 @@
+"""Load test: concurrent workflow streams in one worker.
+
+Runs `streams` concurrent streaming requests to the investment report workflow, with
+every model replaced by the fake provider sleeping `ttft` seconds per call, while a
+probe hits /v1/health every 50 ms. Modes:
+
+- inline: the old streamer, iterating the blocking `run` generator on the event loop;
+- thread: `run` on the workflow thread pool through the bounded queue bridge;
+- native: the workflow's async `arun` (the default for workflows that have one).
+
+When the loop is blocked, streams run one model call at a time and the probe stalls.
+Needs the database.
+
+Usage: python benchmarks/bench_workflow_streams.py [streams] [ttft]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PATH = "/v1/workflows/generate-investment-report/runs"
+
+
+async def inline_stream(workflow, payload):
+    from workflows.operator import run_with_input
+
+    for chunk in run_with_input(workflow, payload):
+        yield chunk
+
+
+async def load(client, streams: int):
+    probes: List[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            (await client.get("/v1/health")).raise_for_status()
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    async def stream() -> None:
+        body = {"input": "NVDA, AMD", "stream": True, "session_id": str(uuid.uuid4())}
+        async with client.stream("POST", PATH, json=body) as response:
+            response.raise_for_status()
+            async for _ in response.aiter_bytes():
+                pass
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(stream() for _ in range(streams)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return elapsed, probes
+
+
+async def run(streams: int) -> None:
+    import httpx
+
+    import workflows.operator as operator
+    from api.main import app
+    from api.routes import workflows as route
+
+    native = operator.has_native_arun
+
+    def use_inline() -> None:
+        setattr(route, "astream_workflow", inline_stream)
+
+    def use_thread() -> None:
+        setattr(route, "astream_workflow", operator.astream_workflow)
+        setattr(operator, "has_native_arun", lambda workflow: False)
+
+    def use_native() -> None:
+        setattr(operator, "has_native_arun", native)
+
+    modes = {"inline": use_inline, "thread": use_thread, "native": use_native}
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        for name, select in modes.items():
+            select()
+            await load(client, 1)  # warm-up
+            rows.append((name, *await load(client, streams)))
+
+    print(f"\n{streams} concurrent streams")
+    for name, elapsed, probes in rows:
+        print(
+            f"{name:>6}: all streams done in {elapsed * 1e3:7.0f} ms"
+            f"  health p50 {statistics.median(probes) * 1e3:6.1f} ms  max {max(probes) * 1e3:7.1f} ms"
+        )
+
+
+def main(streams: int = 8, ttft: float = 0.2) -> None:
+    os.environ["MODEL_PROVIDER_OVERRIDE"] = "fake"
+    os.environ["FAKE_MODEL_TTFT_SECONDS"] = str(ttft)
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["COALESCE_RUNS"] = "false"
+    asyncio.run(run(streams))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.2,
+    )
@@ -0,0 +1,90 @@
+"""
+Create and upgrade every storage table once, before the app serves requests.
+
+Runs from scripts/entrypoint.sh when MIGRATE_DB is set, right after the alembic
+migrations. Usage:
+
+    python -m db.bootstrap
+"""
+
+import re
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from agno.storage.postgres import PostgresStorage
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db.run_log import RunLogStorage
+from db.storage import STORAGE_TABLES, get_engine
+from utils.log import logger
+
+# DDL and the catalog lookups agno/SQLAlchemy use to inspect tables and columns
+_SCHEMA_QUERY = re.compile(
+    r"^\s*(CREATE|ALTER|DROP)\b|information_schema\.|pg_indexes|pg_catalog\.pg_(class|attribute|namespace|index)\b",
+    re.IGNORECASE,
+)
+
+
+def bootstrap_storage(url: Optional[str] = None) -> List[str]:
+    """
+    Create missing storage tables and apply agno's schema upgrades.
+
+    Returns:
+        List[str]: The fully qualified names of the bootstrapped tables.
+    """
+    engine = get_engine(url)
+    tables: List[str] = []
+    for table_name, mode in STORAGE_TABLES.items():
+        storage = PostgresStorage(table_name=table_name, db_engine=engine, mode=mode, auto_upgrade_schema=True)
+        storage.create()
+        storage.upgrade_schema()
+        tables.append(storage.table.fullname)
+        logger.info(f"Storage table ready: {storage.table.fullname} ({mode})")
+        # the tables of the append-only backend too, so STORAGE_BACKEND can be switched at any time
+        run_log = RunLogStorage(table_name=table_name, mode=mode, db_engine=engine)
+        run_log.create()
+        tables.extend([run_log.head.fullname, run_log.runs.fullname])
+
+    from utils.model_cache import response_cache
+
+    if response_cache.postgres is not None:
+        response_cache.postgres.create(engine)
+        tables.append(response_cache.postgres.table.fullname)
+        logger.info(f"Response cache table ready: {response_cache.postgres.table.fullname}")
+
+    from workflows.jobs import job_queue
+
+    job_queue.create(engine)
+    tables.extend([job_queue.jobs.fullname, job_queue.events.fullname])
+    logger.info(f"Workflow job tables ready: {job_queue.jobs.fullname}, {job_queue.events.fullname}")
+    return tables
+
+
+@contextmanager
+def record_schema_queries(engine: Optional[Engine] = None) -> Iterator[List[str]]:
+    """
+    Collect every DDL or schema inspection statement executed on `engine`.
+
+    Use it around hot-path code to verify it never touches the schema:
+
+        with record_schema_queries() as queries:
+            agent.run("hi")
+        assert queries == []
+    """
+    engine = engine or get_engine()
+    queries: List[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _SCHEMA_QUERY.search(statement):
+            queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+if __name__ == "__main__":
+    bootstrap_storage()
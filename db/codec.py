@@ -0,0 +1,126 @@
+"""
+Compression of large session payloads.
+
+Session tables keep `memory`, `session_data`, `extra_data` and the agent/team/workflow
+data as JSONB. A few of them get large: workflow session_state with scraped article
+bodies and blog posts, team memory with every member response. `SessionCodec` stores a
+field whose JSON is at least `threshold` bytes as a small JSONB document with a codec
+header instead:
+
+    {"__codec__": "zlib", "size": 48213, "data": "eJzNW..."}
+
+(`data` is the base64 of the compressed JSON). Values without the header, i.e. small
+fields and every row written before compression was enabled, are returned as they are,
+so the two kinds mix freely in one table. Any other `__codec__` raises: a row written by
+a newer codec is never silently misread. Decoding does not depend on the settings: with
+compression turned off (`threshold=None`) new rows are written plain and compressed
+ones still load. Values are serialized the way the engine serializes plain JSONB, so a
+field reads back the same whichever side of the threshold it falls on.
+
+`CompressedPostgresStorage` is agno's PostgresStorage with the codec applied on save and
+load; RunLogStorage takes a codec too. Settings: SESSION_COMPRESSION,
+SESSION_COMPRESSION_THRESHOLD, SESSION_COMPRESSION_LEVEL.
+"""
+
+import base64
+import dataclasses
+import json
+import zlib
+from typing import Any, Callable, List, Optional
+
+from agno.storage.postgres import PostgresStorage
+from agno.storage.session import Session
+from sqlalchemy.engine import Engine
+
+CODEC_KEY = "__codec__"
+ZLIB = "zlib"
+
+# session fields that hold JSON payloads, the agent/team/workflow data included
+PAYLOAD_FIELDS = ("memory", "session_data", "extra_data", "agent_data", "team_data", "workflow_data")
+
+
+def is_encoded(value: Any) -> bool:
+    return isinstance(value, dict) and CODEC_KEY in value
+
+
+def json_serializer(engine: Optional[Engine]) -> Callable[[Any], str]:
+    """What SQLAlchemy serializes JSONB columns of `engine` with."""
+    return getattr(getattr(engine, "dialect", None), "_json_serializer", None) or json.dumps
+
+
+class SessionCodec:
+    def __init__(self, threshold: Optional[int] = 16384, level: int = 6, serializer: Callable[[Any], str] = json.dumps):
+        self.threshold = threshold
+        self.level = level
+        self.serializer = serializer
+
+    def encode(self, value: Any) -> Any:
+        """`value`, or its compressed form if its JSON is at least `threshold` bytes."""
+        if value is None or self.threshold is None or is_encoded(value):
+            return value
+        raw = self.serializer(value).encode()
+        if len(raw) < self.threshold:
+            return value
+        data = base64.b64encode(zlib.compress(raw, self.level)).decode("ascii")
+        return {CODEC_KEY: ZLIB, "size": len(raw), "data": data}
+
+    def decode(self, value: Any) -> Any:
+        if not is_encoded(value):
+            return value
+        if value[CODEC_KEY] != ZLIB:
+            raise ValueError(f"Unknown session payload codec: {value[CODEC_KEY]}")
+        return json.loads(zlib.decompress(base64.b64decode(value["data"])))
+
+    def encode_session(self, session: Session) -> Session:
+        """A copy of `session` with its large payload fields compressed."""
+        changes = {
+            field: self.encode(getattr(session, field))
+            for field in PAYLOAD_FIELDS
+            if getattr(session, field, None) is not None
+        }
+        return dataclasses.replace(session, **changes)
+
+    def decode_session(self, session: Optional[Session]) -> Optional[Session]:
+        if session is None:
+            return None
+        for field in PAYLOAD_FIELDS:
+            value = getattr(session, field, None)
+            if is_encoded(value):
+                setattr(session, field, self.decode(value))
+        return session
+
+
+class CompressedPostgresStorage(PostgresStorage):
+    """PostgresStorage storing large session payloads compressed (see SessionCodec)."""
+
+    def __init__(self, *args: Any, codec: Optional[SessionCodec] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.codec = codec or SessionCodec(serializer=json_serializer(self.db_engine))
+
+    def read(self, session_id: str, user_id: Optional[str] = None) -> Optional[Session]:
+        return self.codec.decode_session(super().read(session_id, user_id))
+
+    def get_all_sessions(self, user_id: Optional[str] = None, entity_id: Optional[str] = None) -> List[Session]:
+        return [self.codec.decode_session(s) for s in super().get_all_sessions(user_id, entity_id)]  # type: ignore[misc]
+
+    def get_recent_sessions(
+        self,
+        user_id: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        limit: Optional[int] = 2,
+    ) -> List[Session]:
+        sessions = super().get_recent_sessions(user_id=user_id, entity_id=entity_id, limit=limit)
+        return [self.codec.decode_session(s) for s in sessions]  # type: ignore[misc]
+
+    def upsert(self, session: Session, create_and_retry: bool = True) -> Optional[Session]:
+        return super().upsert(self.codec.encode_session(session), create_and_retry=create_and_retry)
+
+
+def get_session_codec(engine: Optional[Engine] = None) -> SessionCodec:
+    """The codec configured by DbSettings for `engine`; with compression disabled it only decodes."""
+    from db.settings import db_settings
+
+    threshold = db_settings.session_compression_threshold if db_settings.session_compression else None
+    return SessionCodec(
+        threshold=threshold, level=db_settings.session_compression_level, serializer=json_serializer(engine)
+    )
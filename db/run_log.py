@@ -0,0 +1,404 @@
+"""
+Append-only run log storage for agent, team and workflow sessions.
+
+agno's PostgresStorage keeps a session in one row and re-writes all of it, every run
+in `memory["runs"]` included, on each turn: a write is O(history). `RunLogStorage`
+implements the same Storage interface on two tables:
+
+- `{table_name}_head`: one row per session with everything but the runs (ids, data
+  columns, the rest of `memory`), plus `runs`, a snapshot of compacted runs;
+- `{table_name}_runs`: one row per run, numbered by `seq` from 0.
+
+`upsert` rewrites the small head row and appends only the runs the log does not have
+yet, so a turn costs the same at run 5 as at run 500. The session view is rebuilt on
+read: the snapshot followed by the log rows after it, or with `history_runs` only the
+last runs (writes align on run ids, so a windowed view appends correctly).
+
+Runs are never rewritten: a run is logged once, when it first appears in a session.
+
+`compact` folds the logged runs of idle sessions into their head snapshot, so the
+log table only holds the runs of recent conversations; run it periodically:
+
+    python -m db.run_log --interval 300
+
+Large payload fields and runs are stored compressed by the storage's SessionCodec
+(db/codec.py).
+
+Select the backend with `get_storage(..., backend="run_log")` or STORAGE_BACKEND.
+The tables are created by `python -m db.bootstrap`.
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from agno.storage.base import Storage
+from agno.storage.session import Session
+from agno.storage.session.agent import AgentSession
+from agno.storage.session.team import TeamSession
+from agno.storage.session.workflow import WorkflowSession
+from sqlalchemy import BigInteger, Column, Integer, MetaData, PrimaryKeyConstraint, String, Table, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Connection, Engine
+
+from db.codec import SessionCodec, json_serializer
+from utils.log import logger
+
+SESSION_TYPES = {"agent": AgentSession, "team": TeamSession, "workflow": WorkflowSession}
+
+
+def _run_id(run: Any) -> Optional[str]:
+    # agent and team runs are RunResponse dicts; workflow runs wrap one in `response`
+    if not isinstance(run, dict):
+        return None
+    return run.get("run_id") or (run.get("response") or {}).get("run_id")
+
+
+def _new_runs(runs: List[Any], logged: int, last_run_id: Optional[str]) -> List[Any]:
+    """The runs of `runs` that come after the last logged one."""
+    if last_run_id is not None:
+        for i in range(len(runs) - 1, -1, -1):
+            if _run_id(runs[i]) == last_run_id:
+                return runs[i + 1 :]
+    # nothing to align on: the view is the whole history
+    return runs[logged:]
+
+
+class RunLogStorage(Storage):
+    def __init__(
+        self,
+        table_name: str,
+        mode: Optional[Literal["agent", "team", "workflow"]] = "agent",
+        db_engine: Optional[Engine] = None,
+        schema: Optional[str] = "ai",
+        history_runs: Optional[int] = None,
+        codec: Optional[SessionCodec] = None,
+    ):
+        super().__init__(mode)
+        self.table_name = table_name
+        self.schema = schema
+        self.db_engine = db_engine
+        self.history_runs = history_runs
+        # large payloads and runs are stored compressed; without a codec they are only decoded
+        self.codec = codec or SessionCodec(threshold=None, serializer=json_serializer(self.db_engine))
+
+        metadata = MetaData(schema=schema)
+        entity = self.mode or "agent"
+        columns = [
+            Column("session_id", String, primary_key=True),
+            Column("user_id", String, index=True),
+            Column(f"{entity}_id", String, index=True),
+            Column("memory", postgresql.JSONB),
+            Column(f"{entity}_data", postgresql.JSONB),
+            Column("session_data", postgresql.JSONB),
+            Column("extra_data", postgresql.JSONB),
+            # compacted runs, followed by the log rows numbered from `compacted_runs`
+            Column("runs", postgresql.JSONB, nullable=False, server_default="[]"),
+            Column("compacted_runs", Integer, nullable=False, server_default="0"),
+            Column("compacted_run_id", String),
+            Column("created_at", BigInteger, default=lambda: int(time.time())),
+            Column("updated_at", BigInteger, onupdate=lambda: int(time.time())),
+        ]
+        if entity in ("agent", "team"):
+            columns.insert(3, Column("team_session_id", String, index=True))
+        self.head = Table(f"{table_name}_head", metadata, *columns)
+        self.runs = Table(
+            f"{table_name}_runs",
+            metadata,
+            Column("session_id", String, nullable=False),
+            Column("seq", Integer, nullable=False),
+            Column("run_id", String),
+            Column("run", postgresql.JSONB, nullable=False),
+            Column("created_at", BigInteger, default=lambda: int(time.time())),
+            PrimaryKeyConstraint("session_id", "seq"),
+        )
+
+    @property
+    def engine(self) -> Engine:
+        if self.db_engine is None:
+            from db.storage import get_engine
+
+            self.db_engine = get_engine()
+        return self.db_engine
+
+    def create(self) -> None:
+        from sqlalchemy import schema
+
+        with self.engine.begin() as conn:
+            if self.schema is not None:
+                conn.execute(schema.CreateSchema(self.schema, if_not_exists=True))
+            self.head.create(conn, checkfirst=True)
+            self.runs.create(conn, checkfirst=True)
+
+    def upgrade_schema(self) -> None:
+        pass
+
+    # -- reading -------------------------------------------------------------
+
+    def _session(self, row: Any, runs: Optional[List[Any]]) -> Session:
+        entity = self.mode or "agent"
+        decode = self.codec.decode
+        memory = decode(row["memory"])
+        if runs:
+            memory = {**(memory or {}), "runs": runs}
+        data: Dict[str, Any] = {
+            "session_id": row["session_id"],
+            "user_id": row["user_id"],
+            f"{entity}_id": row[f"{entity}_id"],
+            "memory": memory,
+            f"{entity}_data": decode(row[f"{entity}_data"]),
+            "session_data": decode(row["session_data"]),
+            "extra_data": decode(row["extra_data"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if "team_session_id" in row:
+            data["team_session_id"] = row["team_session_id"]
+        return SESSION_TYPES[entity](**data)
+
+    def _views(self, conn: Connection, heads: Sequence[Any]) -> List[Session]:
+        """The sessions of `heads`, with their runs from the snapshot and the log."""
+        if not heads:
+            return []
+        ids = [head["session_id"] for head in heads]
+        stmt = select(self.runs.c.session_id, self.runs.c.seq, self.runs.c.run).where(self.runs.c.session_id.in_(ids))
+        if self.history_runs is not None:
+            window = func.row_number().over(partition_by=self.runs.c.session_id, order_by=self.runs.c.seq.desc())
+            ranked = stmt.add_columns(window.label("rank")).subquery()
+            stmt = select(ranked.c.session_id, ranked.c.seq, ranked.c.run).where(ranked.c.rank <= self.history_runs)
+        logged: Dict[str, List[Any]] = {session_id: [] for session_id in ids}
+        for session_id, seq, run in sorted(conn.execute(stmt), key=lambda r: (r[0], r[1])):
+            logged[session_id].append(self.codec.decode(run))
+
+        sessions = []
+        for head in heads:
+            tail = logged[head["session_id"]]
+            if self.history_runs is not None and len(tail) >= self.history_runs:
+                runs = tail[-self.history_runs :] if self.history_runs else []
+            else:
+                snapshot = head["runs"] if "runs" in head else self._snapshot(conn, head["session_id"])
+                runs = [self.codec.decode(run) for run in snapshot or []] + tail
+                if self.history_runs is not None:
+                    runs = runs[-self.history_runs :] if self.history_runs else []
+            sessions.append(self._session(head, runs))
+        return sessions
+
+    def _snapshot(self, conn: Connection, session_id: str) -> List[Any]:
+        return conn.execute(select(self.head.c.runs).where(self.head.c.session_id == session_id)).scalar() or []
+
+    def _read_heads(
+        self, where: Sequence[Any] = (), order_by: Any = None, limit: Optional[int] = None
+    ) -> List[Session]:
+        # without a window the snapshot is always needed; with one it is read only if the log is too short
+        columns = [c for c in self.head.c if self.history_runs is None or c.name != "runs"]
+        stmt = select(*columns).where(*where)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        # the snapshot and the log rows must come from the same moment, compaction moves runs between them
+        with self.engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            with conn.begin():
+                heads = conn.execute(stmt).mappings().all()
+                return self._views(conn, heads)
+
+    def read(self, session_id: str, user_id: Optional[str] = None) -> Optional[Session]:
+        where = [self.head.c.session_id == session_id]
+        if user_id is not None:
+            where.append(self.head.c.user_id == user_id)
+        sessions = self._read_heads(where)
+        return sessions[0] if sessions else None
+
+    def _filters(self, user_id: Optional[str], entity_id: Optional[str]) -> List[Any]:
+        where = []
+        if user_id is not None:
+            where.append(self.head.c.user_id == user_id)
+        if entity_id is not None:
+            where.append(self.head.c[f"{self.mode or 'agent'}_id"] == entity_id)
+        return where
+
+    def get_all_session_ids(self, user_id: Optional[str] = None, entity_id: Optional[str] = None) -> List[str]:
+        stmt = select(self.head.c.session_id).where(*self._filters(user_id, entity_id))
+        with self.engine.connect() as conn:
+            return list(conn.execute(stmt.order_by(self.head.c.created_at.desc())).scalars())
+
+    def get_all_sessions(self, user_id: Optional[str] = None, entity_id: Optional[str] = None) -> List[Session]:
+        return self._read_heads(self._filters(user_id, entity_id), order_by=self.head.c.created_at.desc())
+
+    def get_recent_sessions(
+        self,
+        user_id: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        limit: Optional[int] = 2,
+    ) -> List[Session]:
+        return self._read_heads(self._filters(user_id, entity_id), order_by=self.head.c.created_at.desc(), limit=limit)
+
+    # -- writing -------------------------------------------------------------
+
+    def upsert(self, session: Session, create_and_retry: bool = True) -> Optional[Session]:
+        entity = self.mode or "agent"
+        memory = dict(session.memory) if isinstance(session.memory, dict) else session.memory
+        runs = memory.pop("runs") if memory is not None and isinstance(memory.get("runs"), list) else None
+
+        encode = self.codec.encode
+        values: Dict[str, Any] = {
+            "user_id": session.user_id,
+            f"{entity}_id": getattr(session, f"{entity}_id", None),
+            "memory": encode(memory),
+            f"{entity}_data": encode(getattr(session, f"{entity}_data", None)),
+            "session_data": encode(session.session_data),
+            "extra_data": encode(session.extra_data),
+        }
+        if "team_session_id" in self.head.c:
+            values["team_session_id"] = getattr(session, "team_session_id", None)
+        now = int(time.time())
+        head = (
+            postgresql.insert(self.head)
+            .values(session_id=session.session_id, created_at=now, updated_at=now, **values)
+            .on_conflict_do_update(index_elements=["session_id"], set_={**values, "updated_at": now})
+            # the upsert locks the head row: concurrent writers of this session append one after the other
+            .returning(self.head.c.compacted_runs, self.head.c.compacted_run_id)
+        )
+        try:
+            with self.engine.begin() as conn:
+                compacted, last_compacted_id = conn.execute(head).one()
+                if runs:
+                    self._append(conn, session.session_id, runs, compacted, last_compacted_id)
+        except Exception as e:
+            if create_and_retry and "does not exist" in str(e):
+                logger.warning(f"Run log tables of {self.table_name} are missing, creating them")
+                self.create()
+                return self.upsert(session, create_and_retry=False)
+            logger.error(f"Could not write session {session.session_id} to the run log: {e}")
+            return None
+        return session
+
+    def _append(
+        self, conn: Connection, session_id: str, runs: List[Any], compacted: int, last_compacted_id: Optional[str]
+    ) -> None:
+        last = conn.execute(
+            select(self.runs.c.seq, self.runs.c.run_id)
+            .where(self.runs.c.session_id == session_id)
+            .order_by(self.runs.c.seq.desc())
+            .limit(1)
+        ).first()
+        logged, last_run_id = (last.seq + 1, last.run_id) if last is not None else (compacted, last_compacted_id)
+        new = _new_runs(runs, logged, last_run_id)
+        if new:
+            now = int(time.time())
+            rows = [
+                {
+                    "session_id": session_id,
+                    "seq": logged + i,
+                    "run_id": _run_id(run),
+                    "run": self.codec.encode(run),
+                    "created_at": now,
+                }
+                for i, run in enumerate(new)
+            ]
+            conn.execute(postgresql.insert(self.runs), rows)
+
+    def delete_session(self, session_id: Optional[str] = None) -> None:
+        if session_id is None:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(self.runs.delete().where(self.runs.c.session_id == session_id))
+            conn.execute(self.head.delete().where(self.head.c.session_id == session_id))
+
+    def drop(self) -> None:
+        with self.engine.begin() as conn:
+            self.runs.drop(conn, checkfirst=True)
+            self.head.drop(conn, checkfirst=True)
+
+    # -- compaction ----------------------------------------------------------
+
+    def compact(self, min_runs: int = 20, idle_seconds: float = 3600, limit: int = 100) -> int:
+        """
+        Fold the log rows of sessions into their snapshot.
+
+        Only sessions with at least `min_runs` logged runs and no write for `idle_seconds`
+        are compacted: rewriting the snapshot is O(history), so it is done once a
+        conversation has gone quiet, never on every turn.
+
+        Returns:
+            int: The number of sessions compacted.
+        """
+        idle_since = int(time.time() - idle_seconds)
+        stmt = (
+            select(self.runs.c.session_id)
+            .join(self.head, self.head.c.session_id == self.runs.c.session_id)
+            .where(self.head.c.updated_at <= idle_since)
+            .group_by(self.runs.c.session_id)
+            .having(func.count() >= max(min_runs, 1))
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            session_ids = list(conn.execute(stmt).scalars())
+        for session_id in session_ids:
+            self._compact(session_id)
+        return len(session_ids)
+
+    def _compact(self, session_id: str) -> None:
+        with self.engine.begin() as conn:
+            # lock the head: writers of this session wait, so no run is appended meanwhile
+            head = conn.execute(
+                select(self.head.c.compacted_runs).where(self.head.c.session_id == session_id).with_for_update()
+            ).first()
+            if head is None:
+                return
+            upto = conn.execute(select(func.max(self.runs.c.seq)).where(self.runs.c.session_id == session_id)).scalar()
+            if upto is None:
+                return
+            logged = (
+                select(func.jsonb_agg(aggregate_order_by(self.runs.c.run, self.runs.c.seq)))
+                .where(self.runs.c.session_id == session_id, self.runs.c.seq <= upto)
+                .scalar_subquery()
+            )
+            last_run_id = (
+                select(self.runs.c.run_id)
+                .where(self.runs.c.session_id == session_id, self.runs.c.seq == upto)
+                .scalar_subquery()
+            )
+            conn.execute(
+                self.head.update()
+                .where(self.head.c.session_id == session_id)
+                .values(runs=self.head.c.runs.op("||")(logged), compacted_runs=upto + 1, compacted_run_id=last_run_id)
+            )
+            conn.execute(self.runs.delete().where(self.runs.c.session_id == session_id, self.runs.c.seq <= upto))
+
+
+def compact_all(min_runs: int, idle_seconds: float, url: Optional[str] = None) -> int:
+    """Compact the run logs of every storage table."""
+    from db.storage import STORAGE_TABLES, get_engine
+
+    compacted = 0
+    for table_name, mode in STORAGE_TABLES.items():
+        storage = RunLogStorage(table_name=table_name, mode=mode, db_engine=get_engine(url))
+        while True:
+            batch = storage.compact(min_runs=min_runs, idle_seconds=idle_seconds)
+            compacted += batch
+            if batch == 0:
+                break
+    return compacted
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from db.settings import db_settings
+
+    parser = argparse.ArgumentParser(description="Compact the session run logs.")
+    parser.add_argument("--min-runs", type=int, default=db_settings.run_log_compact_min_runs)
+    parser.add_argument("--idle-seconds", type=float, default=db_settings.run_log_compact_idle_seconds)
+    parser.add_argument("--interval", type=float, default=0, help="seconds between passes; 0 runs once")
+    args = parser.parse_args(argv)
+
+    while True:
+        compacted = compact_all(args.min_runs, args.idle_seconds)
+        logger.info(f"Compacted {compacted} session run logs")
+        if args.interval <= 0:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy.engine import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from db.settings import db_settings
 
 # Create SQLAlchemy Engine using a database URL
 db_url: str = db_settings.get_db_url()
-db_engine: Engine = create_engine(db_url, pool_pre_ping=True)
+db_engine: Engine = create_engine(db_url, **db_settings.get_pool_options())
 
 # Create a SessionLocal class
 SessionLocal: sessionmaker[Session] = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
 
+# Async engine for async handlers: `postgresql+psycopg` urls run on psycopg's async
+# connection, so queries await the socket instead of blocking the event loop.
+# Connections belong to the event loop that opened them; a process running several
+# loops one after the other (e.g. tests) should `await async_db_engine.dispose()` between them.
+async_db_engine: AsyncEngine = create_async_engine(db_url, **db_settings.get_pool_options(async_engine=True))
+
+# Create an AsyncSessionLocal class; objects stay usable after commit
+AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=async_db_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -25,3 +37,14 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session.
+
+    Yields:
+        AsyncSession: An SQLAlchemy async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,5 +1,5 @@
 from os import getenv
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +19,41 @@ class DbSettings(BaseSettings):
     db_driver: str = "postgresql+psycopg"
     # Create/Upgrade database on startup using alembic
     migrate_db: bool = False
+    # Connection pool shared by every engine created through db.storage
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Connection pool of the async engine (db.session.async_db_engine)
+    db_async_pool_size: int = 10
+    db_async_max_overflow: int = 10
+    # Shared by both pools: recycle connections before server/proxy idle timeouts
+    # close them, and test each one on checkout
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_timeout: float = 30.0
+    # Session storage backend (see db/storage.py): "session" keeps each session in one
+    # row (agno's PostgresStorage); "run_log" appends one row per run (db/run_log.py)
+    storage_backend: str = "session"
+    # With run_log: sessions read back with only their last N runs (None: all of them)
+    run_log_history_runs: Optional[int] = None
+    # With run_log: `python -m db.run_log` compacts sessions with at least this many
+    # logged runs and no write for this long
+    run_log_compact_min_runs: int = 20
+    run_log_compact_idle_seconds: float = 3600
+    # Session payload fields (memory, session_data, ...) whose JSON reaches the threshold
+    # are stored zlib-compressed (see db/codec.py); compressed rows load either way
+    session_compression: bool = True
+    session_compression_threshold: int = 16384
+    session_compression_level: int = 6
+
+    def get_pool_options(self, async_engine: bool = False) -> Dict[str, Any]:
+        """Keyword arguments for create_engine / create_async_engine."""
+        return {
+            "pool_size": self.db_async_pool_size if async_engine else self.db_pool_size,
+            "max_overflow": self.db_async_max_overflow if async_engine else self.db_max_overflow,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+            "pool_timeout": self.db_pool_timeout,
+        }
 
     def get_db_url(self) -> str:
         db_url = "{}://{}{}@{}:{}/{}".format(
@@ -0,0 +1,103 @@
+import threading
+from typing import Dict, Literal, Optional, Tuple, Union
+
+from agno.storage.postgres import PostgresStorage
+from sqlalchemy.engine import Engine, create_engine
+
+from db.codec import CompressedPostgresStorage, get_session_codec
+from db.run_log import RunLogStorage
+from db.session import db_engine, db_url
+from db.settings import db_settings
+
+StorageMode = Literal["agent", "team", "workflow"]
+StorageBackend = Literal["session", "run_log"]
+
+# Every storage table used by the app. db.bootstrap creates and upgrades these once,
+# so storages built on the request path never need to inspect the schema.
+STORAGE_TABLES: Dict[str, StorageMode] = {
+    "sage_sessions": "agent",
+    "scholar_sessions": "agent",
+    "finance_agent": "agent",
+    "web_agent": "agent",
+    "finance_researcher_team": "team",
+    "multi_language_team": "team",
+    "blog_post_generator_workflows": "workflow",
+    "investment_report_generator_workflows": "workflow",
+}
+
+# One pooled engine per database url, seeded with the application engine
+_engines: Dict[str, Engine] = {db_url: db_engine}
+# One storage per (database url, table name, mode, backend)
+_storages: Dict[Tuple[str, str, str, str], Union[PostgresStorage, RunLogStorage]] = {}
+_lock = threading.Lock()
+
+
+def get_engine(url: Optional[str] = None) -> Engine:
+    """
+    Return the shared engine for a database url, creating it on first use.
+
+    Args:
+        url: Database url. Defaults to the application database.
+
+    Returns:
+        Engine: A pooled SQLAlchemy engine sized from DbSettings.
+    """
+    url = url or db_url
+    engine = _engines.get(url)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(url)
+            if engine is None:
+                engine = create_engine(url, **db_settings.get_pool_options())
+                _engines[url] = engine
+    return engine
+
+
+def get_storage(
+    table_name: str,
+    mode: StorageMode = "agent",
+    url: Optional[str] = None,
+    auto_upgrade_schema: bool = False,
+    backend: Optional[StorageBackend] = None,
+) -> Union[PostgresStorage, RunLogStorage]:
+    """
+    Return the shared agent/team/workflow storage for a table.
+
+    Storages are created once per process and all share the engine of their
+    database url, so building an agent, team or workflow never opens a new pool.
+    Schema upgrades are left to db.bootstrap: with auto_upgrade_schema disabled,
+    agno skips its table/column introspection on every upsert.
+
+    `backend` (default STORAGE_BACKEND) picks agno's one-row-per-session
+    PostgresStorage ("session") or the append-only RunLogStorage ("run_log").
+    Both store large payload fields compressed (db/codec.py).
+    """
+    url = url or db_url
+    backend = backend or db_settings.storage_backend  # type: ignore[assignment]
+    if backend not in ("session", "run_log"):
+        raise ValueError(f"Unknown storage backend: {backend}")
+    key = (url, table_name, mode, backend)
+    storage = _storages.get(key)
+    if storage is None:
+        engine = get_engine(url)
+        with _lock:
+            storage = _storages.get(key)
+            if storage is None and backend == "run_log":
+                storage = RunLogStorage(
+                    table_name=table_name,
+                    mode=mode,
+                    db_engine=engine,
+                    history_runs=db_settings.run_log_history_runs,
+                    codec=get_session_codec(engine),
+                )
+                _storages[key] = storage
+            elif storage is None:
+                storage = CompressedPostgresStorage(
+                    table_name=table_name,
+                    db_engine=engine,
+                    mode=mode,
+                    auto_upgrade_schema=auto_upgrade_schema,
+                    codec=get_session_codec(engine),
+                )
+                _storages[key] = storage
+    return storage
@@ -42,6 +42,7 @@ if [[ "$MIGRATE_DB" = true || "$MIGRATE_DB" = True ]]; then
   echo "++++++++++++++++++++++++++++++++++++++++++++++++++++++++"
   echo "Migrating Database"
   alembic -c db/alembic.ini upgrade head
+  python -m db.bootstrap
   echo "++++++++++++++++++++++++++++++++++++++++++++++++++++++++"
 fi
 
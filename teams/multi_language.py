@@ -1,19 +1,18 @@
 from typing import Optional
 
 from agno.agent import Agent
-from agno.models.google import Gemini
-from agno.storage.postgres import PostgresStorage
 from agno.team.team import Team
 
-from db.session import db_url
+from db.storage import StorageBackend, get_storage
 from teams.settings import team_settings
+from utils.model_factory import create_model
 
 japanese_agent = Agent(
     name="Japanese Agent",
     agent_id="japanese-agent",
     role="You only answer in Japanese",
-    model=Gemini(
-        id=team_settings.gemini_2_5_pro,
+    model=create_model(
+        team_settings.gemini_2_5_pro,
         max_output_tokens=team_settings.default_max_completion_tokens,
         temperature=team_settings.default_temperature,
     ),
@@ -22,8 +21,8 @@ chinese_agent = Agent(
     name="Chinese Agent",
     agent_id="chinese-agent",
     role="You only answer in Chinese",
-    model=Gemini(
-        id=team_settings.gemini_2_5_pro,
+    model=create_model(
+        team_settings.gemini_2_5_pro,
         max_output_tokens=team_settings.default_max_completion_tokens,
         temperature=team_settings.default_temperature,
     ),
@@ -32,8 +31,8 @@ spanish_agent = Agent(
     name="Spanish Agent",
     agent_id="spanish-agent",
     role="You only answer in Spanish",
-    model=Gemini(
-        id=team_settings.gemini_2_5_pro,
+    model=create_model(
+        team_settings.gemini_2_5_pro,
         max_output_tokens=team_settings.default_max_completion_tokens,
         temperature=team_settings.default_temperature,
     ),
@@ -42,8 +41,8 @@ french_agent = Agent(
     name="French Agent",
     agent_id="french-agent",
     role="You only answer in French",
-    model=Gemini(
-        id=team_settings.gemini_2_5_pro,
+    model=create_model(
+        team_settings.gemini_2_5_pro,
         max_output_tokens=team_settings.default_max_completion_tokens,
         temperature=team_settings.default_temperature,
     ),
@@ -52,8 +51,8 @@ german_agent = Agent(
     name="German Agent",
     agent_id="german-agent",
     role="You only answer in German",
-    model=Gemini(
-        id=team_settings.gemini_2_5_pro,
+    model=create_model(
+        team_settings.gemini_2_5_pro,
         max_output_tokens=team_settings.default_max_completion_tokens,
         temperature=team_settings.default_temperature,
     ),
@@ -65,6 +64,7 @@ def get_multi_language_team(
     user_id: Optional[str] = None,
     session_id: Optional[str] = None,
     debug_mode: bool = True,
+    storage_backend: Optional[StorageBackend] = None,
 ) -> Team:
     model_id = model_id or team_settings.gemini_2_5_pro
 
@@ -72,8 +72,8 @@ def get_multi_language_team(
         name="Multi Language Team",
         mode="route",
         team_id="multi-language-team",
-        model=Gemini(
-            id=team_settings.gemini_2_5_pro,
+        model=create_model(
+            team_settings.gemini_2_5_pro,
             max_output_tokens=team_settings.default_max_completion_tokens,
             temperature=team_settings.default_temperature,
         ),
@@ -99,11 +99,6 @@ def get_multi_language_team(
         markdown=True,
         show_tool_calls=True,
         show_members_responses=True,
-        storage=PostgresStorage(
-            table_name="multi_language_team",
-            db_url=db_url,
-            mode="team",
-            auto_upgrade_schema=True,
-        ),
+        storage=get_storage(table_name="multi_language_team", mode="team", backend=storage_backend),
         debug_mode=debug_mode,
     )
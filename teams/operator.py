@@ -1,8 +1,8 @@
 from enum import Enum
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-from teams.finance_researcher import get_finance_researcher_team
-from teams.multi_language import get_multi_language_team
+if TYPE_CHECKING:
+    from db.storage import StorageBackend
 
 
 class TeamType(Enum):
@@ -21,10 +21,25 @@ def get_team(
     user_id: Optional[str] = None,
     session_id: Optional[str] = None,
     debug_mode: bool = True,
+    storage_backend: Optional["StorageBackend"] = None,
 ):
     if team_id == TeamType.FINANCE_RESEARCHER:
+        from teams.finance_researcher import get_finance_researcher_team
+
         return get_finance_researcher_team(
-            model_id=model_id, user_id=user_id, session_id=session_id, debug_mode=debug_mode
+            model_id=model_id,
+            user_id=user_id,
+            session_id=session_id,
+            debug_mode=debug_mode,
+            storage_backend=storage_backend,
         )
     else:
-        return get_multi_language_team(model_id=model_id, user_id=user_id, session_id=session_id, debug_mode=debug_mode)
+        from teams.multi_language import get_multi_language_team
+
+        return get_multi_language_team(
+            model_id=model_id,
+            user_id=user_id,
+            session_id=session_id,
+            debug_mode=debug_mode,
+            storage_backend=storage_backend,
+        )
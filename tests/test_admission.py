@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from utils.admission import AdmissionController, AdmissionMiddleware, Lane, Rejected
+
+
+def test_lane_queues_in_order_then_rejects():
+    async def main():
+        lane = Lane("pro", limit=1, queue_size=1)
+        await lane.acquire(1)
+        order = []
+
+        async def queued(name):
+            await lane.acquire(1)
+            order.append(name)
+
+        first = asyncio.create_task(queued("first"))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as full:
+            await lane.acquire(1)
+        assert full.value.reason == "queue full" and full.value.retry_after >= 1
+
+        lane.release(2.0)
+        await first
+        assert order == ["first"] and lane.active == 1
+
+        with pytest.raises(Rejected) as timeout:
+            await lane.acquire(0.01)
+        assert timeout.value.reason == "queue timeout" and lane.metrics()["queued"] == 0
+        lane.release()
+        assert lane.active == 0
+
+    asyncio.run(main())
+
+
+def test_overloaded_runnable_gets_429_while_other_lanes_run():
+    controller = AdmissionController(runnable_limit=1, lane_limits={"pro": 1, "lite": 1}, queue_size=0)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        body = (await receive())["body"]
+        if b"pro" in body:
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+
+    async def main():
+        transport = httpx.ASGITransport(app=AdmissionMiddleware(app, controller))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            pro = {"message": "hi", "model": "gemini-2.5-pro"}
+            running = asyncio.create_task(client.post("/v1/workflows/report/runs", json=pro))
+            await asyncio.sleep(0.05)
+
+            rejected = await client.post("/v1/agents/sage/runs", json=pro)
+            assert rejected.status_code == 429 and int(rejected.headers["retry-after"]) >= 1
+
+            lite = await client.post("/v1/agents/sage/runs", json={"message": "hi", "model": "gemini-2.5-flash-lite"})
+            assert lite.status_code == 200 and lite.json()["model"] == "gemini-2.5-flash-lite"
+
+            release.set()
+            assert (await running).status_code == 200
+        assert all(lane["active"] == 0 for lane in controller.metrics())
+
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+import pytest
+from agno.agent import Agent
+
+from utils.agent_pool import AgentPool
+from utils.base_agent import AgentBlueprint
+from utils.fake_provider import FakeModel
+from utils.prompt_loader import prompt_registry
+
+
+def test_pooled_agent_carries_no_state_between_requests():
+    prototype = Agent(name="Scholar Agent", model=FakeModel(responses=["hello"]), instructions="static")
+    blueprint = AgentBlueprint(prototype=prototype, prompt=prompt_registry.get("prompts/agents/scholar.yaml"))
+    pool = AgentPool(lambda reuse=None, **request: blueprint.build(reuse=reuse, **request), size=1)
+    pool.warm()
+
+    with pool.lease(user_id="alice", session_id="s1") as first:
+        assert first.run("hi").content == "hello"
+        first.session_state = {"seen": True}
+        first.context = {"secret": "alice"}
+        assert first.memory is not None and first.memory.runs
+
+    second = pool.checkout(user_id="bob", session_id="s2")
+    assert second is first and (pool.created, pool.reused) == (1, 2)
+    assert (second.user_id, second.session_id) == ("bob", "s2")
+    assert second.session_state is None and second.memory is None and second.run_response is None
+    assert second.context is None
+    assert isinstance(second.instructions, str)
+    assert "alice" not in second.instructions and "bob" in second.instructions
+    assert prototype.user_id is None and prototype.memory is None
+
+
+def test_pool_builds_extra_agents_under_load_and_keeps_only_its_size():
+    pool = AgentPool(lambda reuse=None, **request: reuse or Agent(**request), size=1)
+    first, second = pool.checkout(), pool.checkout()
+    assert first is not second and pool.created == 2
+
+    pool.checkin(first)
+    pool.checkin(second)
+    assert pool.metrics()["idle"] == 1 and pool.checkout() is first
+
+
+def test_failed_checkout_keeps_the_idle_agent():
+    def factory(reuse=None, fail=False, **request):
+        if fail:
+            raise ValueError("bad request")
+        return reuse or Agent(**request)
+
+    pool = AgentPool(factory, size=1)
+    pool.warm()
+    idle = pool._idle[0]
+
+    with pytest.raises(ValueError):
+        pool.checkout(fail=True)
+    fresh = AgentPool(factory, size=1)
+    with pytest.raises(ValueError):
+        fresh.checkout(fail=True)
+    assert fresh.created == 0
+    assert pool.checkout() is idle
+    assert (pool.created, pool.reused) == (1, 1)
+
+
+def test_agent_route_checks_out_before_responding_and_off_the_loop(monkeypatch):
+    import httpx
+    from fastapi import FastAPI
+
+    from api.routes import agents as route
+
+    threads = []
+    broken = {"failing": True}
+
+    def factory(reuse=None, **request):
+        threads.append(threading.get_ident())
+        if broken["failing"]:
+            raise ValueError("no such prompt")
+        return reuse or Agent(model=FakeModel(responses=["hello"]), **request)
+
+    pool = AgentPool(factory, size=1)
+    monkeypatch.setattr(route, "get_agent_pool", lambda agent_id, model_id: pool)
+    app = FastAPI()
+    app.include_router(route.agents_router)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            failed = await client.post("/agents/sage/runs", json={"message": "hi"})
+            assert failed.status_code == 404 and "no such prompt" in failed.text
+
+            broken["failing"] = False
+            for _ in range(2):
+                streamed = await client.post("/agents/sage/runs", json={"message": "hi", "session_id": "s1"})
+                assert streamed.status_code == 200 and "hello" in streamed.text
+            assert (await client.post("/agents/sage/runs", json={"message": "hi", "stream": False})).json() == "hello"
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert (pool.created, pool.reused) == (1, 2) and pool.metrics()["idle"] == 1
+    assert loop_thread not in threads
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.async_bridge import iterate_in_thread
+
+executor = ThreadPoolExecutor(max_workers=4)
+
+
+def test_blocking_iterator_does_not_block_the_loop():
+    def slow():
+        for i in range(3):
+            time.sleep(0.05)
+            yield i
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        items = [item async for item in iterate_in_thread(slow, executor=executor)]
+        ticker.cancel()
+        return items, ticks
+
+    items, ticks = asyncio.run(main())
+    assert items == [0, 1, 2] and ticks >= 5
+
+
+def test_backpressure_and_early_stop_close_the_iterator():
+    produced = []
+    closed = threading.Event()
+
+    def endless():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    async def main():
+        stream = iterate_in_thread(endless, maxsize=2, executor=executor)
+        assert await stream.__anext__() == 0
+        await asyncio.sleep(0.1)
+        # the worker waits on the full queue instead of running ahead
+        assert len(produced) <= 4
+        await stream.aclose()
+
+    asyncio.run(main())
+    assert closed.wait(1) and len(produced) < 10
+
+
+def test_errors_reach_the_consumer():
+    def failing():
+        yield 1
+        raise ValueError("boom")
+
+    async def main():
+        return [item async for item in iterate_in_thread(failing, executor=executor)]
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(main())
+
+
+def test_early_stop_cancels_the_running_step():
+    from utils.cancellation import RunCancelled, check_cancelled
+
+    outcome = []
+
+    def steps():
+        yield "started"
+        try:
+            # a long blocking step that checks the run's cancel token as it goes
+            for _ in range(200):
+                check_cancelled()
+                time.sleep(0.01)
+            outcome.append("finished")
+        except RunCancelled:
+            outcome.append("cancelled")
+            raise
+        yield "done"
+
+    async def main():
+        stream = iterate_in_thread(steps, executor=executor)
+        assert await stream.__anext__() == "started"
+        await stream.aclose()
+
+    start = time.monotonic()
+    asyncio.run(main())
+    while not outcome and time.monotonic() - start < 3:
+        time.sleep(0.01)
+    assert outcome == ["cancelled"] and time.monotonic() - start < 1
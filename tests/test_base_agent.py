@@ -0,0 +1,23 @@
+from agno.agent import Agent
+from agno.models.google import Gemini
+
+from utils.base_agent import AgentBlueprint
+from utils.prompt_loader import prompt_registry
+
+
+def test_blueprint_clones_do_not_share_request_state():
+    prototype = Agent(name="Scholar Agent", model=Gemini(id="gemini-2.5-flash"), instructions="static")
+    blueprint = AgentBlueprint(prototype=prototype, prompt=prompt_registry.get("prompts/agents/scholar.yaml"))
+
+    first = blueprint.build(user_id="alice", session_id="s1", user_query="first question")
+    first.session_state = {"seen": True}
+    first.run_id = "run-1"
+
+    second = blueprint.build(user_id="bob", session_id="s2")
+    assert (second.user_id, second.session_id) == ("bob", "s2")
+    assert second.session_state is None and second.run_id is None
+    assert first.model is not None and second.model is not None
+    assert second.model is not first.model and second.model.id == first.model.id
+    assert isinstance(first.instructions, str) and isinstance(second.instructions, str)
+    assert "alice" in first.instructions and "bob" in second.instructions
+    assert prototype.user_id is None and prototype.instructions == "static"
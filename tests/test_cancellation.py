@@ -0,0 +1,30 @@
+import contextvars
+
+import pytest
+
+from utils.cancellation import CancelToken, RunCancelled, check_cancelled, set_token
+from workflows.blog_post_generator import BlogPostGenerator
+
+
+def test_outside_a_run_nothing_is_cancelled():
+    check_cancelled()
+
+
+def test_cancelled_search_stops_retrying(monkeypatch):
+    token = CancelToken()
+    context = contextvars.copy_context()
+    context.run(set_token, token)
+    calls = []
+
+    class Searcher:
+        def run(self, topic):
+            calls.append(topic)
+            # the client disconnects while the first attempt is in flight
+            token.cancel()
+            raise RuntimeError("search failed")
+
+    workflow = BlogPostGenerator(workflow_id="test-blog-post", session_id="test")
+    monkeypatch.setattr(workflow, "searcher", Searcher())
+    with pytest.raises(RunCancelled):
+        context.run(workflow.get_search_results, "rust", use_search_cache=False)
+    assert calls == ["rust"]
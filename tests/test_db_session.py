@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from db.session import async_db_engine, async_get_db, db_engine
+from db.settings import db_settings
+
+
+def test_pools_are_configured_from_db_settings():
+    assert isinstance(async_db_engine.pool, QueuePool) and isinstance(db_engine.pool, QueuePool)
+    assert async_db_engine.pool.size() == db_settings.db_async_pool_size
+    assert db_engine.pool.size() == db_settings.db_pool_size
+    for engine in (async_db_engine.sync_engine, db_engine):
+        assert engine.pool._recycle == db_settings.db_pool_recycle
+        assert engine.pool._pre_ping == db_settings.db_pool_pre_ping
+
+
+def test_async_get_db_runs_queries_without_blocking_the_loop():
+    async def main():
+        try:
+            async for db in async_get_db():
+                ticks = 0
+
+                async def tick():
+                    nonlocal ticks
+                    while True:
+                        await asyncio.sleep(0.01)
+                        ticks += 1
+
+                ticker = asyncio.create_task(tick())
+                assert (await db.execute(text("SELECT 1 FROM pg_sleep(0.1)"))).scalar() == 1
+                ticker.cancel()
+                return ticks
+        finally:
+            # pooled connections belong to this event loop
+            await async_db_engine.dispose()
+
+    try:
+        ticks = asyncio.run(main())
+    except OperationalError:
+        pytest.skip("database not available")
+    assert ticks >= 5
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from agno.agent import Agent
+from agno.tools import tool
+
+from utils.fake_provider import FakeModel, transcript_from_messages, turn_key
+from utils.model_factory import create_model
+
+looked_up: List[str] = []
+
+
+@tool
+def lookup(city: str) -> str:
+    """Return the weather in a city."""
+    looked_up.append(city)
+    return f"sunny in {city}"
+
+
+SCRIPT = [{"tool_calls": [{"name": "lookup", "arguments": {"city": "Lisbon"}}]}, "It is sunny in Lisbon."]
+
+
+def test_scripted_tool_calls_drive_the_agent_loop():
+    looked_up.clear()
+    model = create_model("fake:gemini-2.5-pro", responses=SCRIPT, response_cache=False, fallback_models=[])
+    agent = Agent(model=model, tools=[lookup])
+
+    assert agent.run("What is the weather?").content == "It is sunny in Lisbon."
+    streamed = "".join(chunk.content or "" for chunk in agent.run("What is the weather?", stream=True))
+    assert streamed == "It is sunny in Lisbon."
+    assert looked_up == ["Lisbon", "Lisbon"]
+
+
+def test_stream_chunks_and_latency():
+    model = FakeModel(responses=["abcdefgh"], chunk_chars=3, ttft=0.01)
+    chunks = list(model.invoke_stream(messages=[]))
+    assert [c["content"] for c in chunks] == ["abc", "def", "gh"]
+
+    async def collect():
+        return [c async for c in model.ainvoke_stream(messages=[])]
+
+    assert len(asyncio.run(collect())) == 3
+
+
+def test_replays_recorded_transcript(tmp_path):
+    recorded: List[Dict[str, Any]] = [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "user", "content": "Weather in Lisbon?"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {"id": "c1", "type": "function", "function": {"name": "lookup", "arguments": '{"city": "Lisbon"}'}}
+            ],
+        },
+        {"role": "tool", "content": "sunny in Lisbon"},
+        {"role": "assistant", "content": "Sunny."},
+    ]
+    turns = transcript_from_messages(recorded)
+    assert [turn_key(t["messages"]) for t in turns] == [("Weather in Lisbon?", 0), ("Weather in Lisbon?", 1)]
+
+    path = tmp_path / "lisbon.jsonl"
+    path.write_text("".join(json.dumps(t) + "\n" for t in turns))
+    looked_up.clear()
+    agent = Agent(model=create_model(f"replay:{path}", response_cache=False, fallback_models=[]), tools=[lookup])
+    assert agent.run("Weather   in Lisbon?").content == "Sunny."
+    assert looked_up == ["Lisbon"]
+
+
+def test_provider_override_also_fakes_the_embedder(monkeypatch):
+    from agents.settings import AgentSettings
+    from utils.fake_provider import FakeEmbedder
+
+    monkeypatch.setenv("MODEL_PROVIDER_OVERRIDE", "fake")
+    embedder = AgentSettings().default_embedder
+    assert isinstance(embedder, FakeEmbedder)
+
+    query = embedder.get_embedding("stock prices of Nvidia")
+    assert len(query) == 1536
+    assert query == embedder.get_embedding("Stock prices of NVIDIA")
+    related = sum(a * b for a, b in zip(query, embedder.get_embedding("Nvidia stock")))
+    unrelated = sum(a * b for a, b in zip(query, embedder.get_embedding("weather in Lisbon")))
+    assert related > unrelated
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import select, update
+
+from db.storage import get_engine
+from utils.sse import format_event
+from workflows.jobs import FAILED, RUNNING, SUCCEEDED, JobQueue
+
+
+@pytest.fixture()
+def queue():
+    engine = get_engine()
+    try:
+        engine.connect().close()
+    except Exception:
+        pytest.skip("database not available")
+    queue = JobQueue(table_name="test_workflow_jobs")
+    queue.create(engine)
+    yield queue
+    queue.events.drop(engine)
+    queue.jobs.drop(engine)
+
+
+def test_locked_jobs_are_skipped_and_claims_are_exclusive(queue):
+    first = queue.enqueue("generate-blog-post-on", "one")
+    second = queue.enqueue("generate-blog-post-on", "two")
+
+    with queue.engine.begin() as conn:
+        # another worker is in the middle of claiming the oldest job
+        conn.execute(select(queue.jobs).where(queue.jobs.c.id == first["id"]).with_for_update())
+        claimed = queue.claim("worker-b")
+    assert claimed["id"] == second["id"] and claimed["status"] == RUNNING and claimed["attempts"] == 1
+
+    assert queue.claim("worker-a")["id"] == first["id"]
+    assert queue.claim("worker-a") is None
+
+
+def test_stale_job_is_reclaimed_and_the_old_worker_loses_it(queue):
+    queue.enqueue("generate-investment-report", "NVDA")
+    old = queue.claim("worker-a")
+    assert queue.append_event(old, 1, "event: message\nid: 1\ndata: partial\n\n")
+
+    with queue.engine.begin() as conn:
+        conn.execute(update(queue.jobs).values(heartbeat_at=old["started_at"].replace(year=2000)))
+    new = queue.claim("worker-b")
+    assert new["id"] == old["id"] and new["attempts"] == 2
+    assert [seq for seq, _ in queue.read_events(new["id"])] == [2]
+
+    assert not queue.append_event(old, 2, "stale")
+    queue.finish(old, error="too late")
+    assert queue.get(new["id"])["status"] == RUNNING
+
+    assert new["events_from"] == 3
+    assert queue.append_event(new, 3, "a") and queue.append_event(new, 4, "b")
+    queue.finish(new, result="report")
+    job = queue.get(new["id"])
+    assert (job["status"], job["result"]) == (SUCCEEDED, "report")
+    assert queue.read_events(new["id"], after=3) == [(4, "b")]
+
+
+def test_reader_resuming_across_a_reclaim_is_told_to_reset(queue):
+    queue.enqueue("generate-blog-post-on", "agents")
+    old = queue.claim("worker-a")
+    assert old["events_from"] == 1
+    for seq, text in enumerate(["old one", "old two", "old three"], start=1):
+        queue.append_event(old, seq, format_event(text, "message", seq))
+    # a client read the first two frames of the first attempt
+    position = queue.read_events(old["id"], limit=2)[-1][0]
+
+    with queue.engine.begin() as conn:
+        conn.execute(update(queue.jobs).values(heartbeat_at=old["started_at"].replace(year=2000)))
+    new = queue.claim("worker-b")
+    queue.append_event(new, new["events_from"], format_event("new one", "message", new["events_from"]))
+
+    frames = [frame for _, frame in queue.read_events(new["id"], after=position)]
+    assert frames[0].startswith("event: reset\nid: 4\n")
+    assert frames[1:] == [format_event("new one", "message", 5)]
+    assert [frame for _, frame in queue.read_events(new["id"])] == frames
+
+
+def test_jobs_over_the_attempt_limit_fail(queue, monkeypatch):
+    from agents.settings import agent_settings
+
+    monkeypatch.setattr(agent_settings, "job_max_attempts", 1)
+    job = queue.enqueue("generate-investment-report", "NVDA")
+    queue.claim("worker-a")
+    with queue.engine.begin() as conn:
+        conn.execute(update(queue.jobs).values(heartbeat_at=job["created_at"].replace(year=2000)))
+
+    assert queue.claim("worker-b") is None
+    assert queue.get(job["id"])["status"] == FAILED
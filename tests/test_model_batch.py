@@ -0,0 +1,58 @@
+import threading
+from typing import List
+
+from agno.agent import Agent
+from agno.models.google import Gemini
+from agno.models.message import Message
+from agno.tools import tool
+
+from utils.fake_provider import FakeModel, ScriptedResponse
+from utils.model_batch import BatchCollector, LocalBatchBackend, enable_batching, fake_responder
+
+looked_up: List[str] = []
+
+
+@tool
+def lookup(ticker: str) -> str:
+    """Return the latest price of a ticker."""
+    looked_up.append(ticker)
+    return f"{ticker}: 100"
+
+
+def test_agent_tool_loop_runs_through_local_batches(tmp_path):
+    script: List[ScriptedResponse] = [
+        {"tool_calls": [{"name": "lookup", "arguments": {"ticker": "NVDA"}}]},
+        "NVDA trades at 100.",
+    ]
+    backend = LocalBatchBackend(tmp_path, responder=fake_responder(FakeModel(responses=script)))
+    collector = BatchCollector(backend, max_wait_seconds=0, poll_interval_seconds=0.01)
+    model = enable_batching(Gemini(id="gemini-2.5-flash", api_key="test"), collector)
+
+    looked_up.clear()
+    assert Agent(model=model, tools=[lookup]).run("Price of NVDA?").content == "NVDA trades at 100."
+    assert looked_up == ["NVDA"]
+    assert collector.jobs_submitted == 2
+    assert len(list(tmp_path.glob("*.requests.jsonl"))) == 2
+
+
+def test_concurrent_runs_share_one_batch(tmp_path):
+    collector = BatchCollector(LocalBatchBackend(tmp_path, responder=fake_responder()), poll_interval_seconds=0.01)
+    model = enable_batching(Gemini(id="gemini-2.5-flash", api_key="test"), collector)
+    results = {}
+
+    def run(ticker: str) -> None:
+        try:
+            results[ticker] = model.response([Message(role="user", content=ticker)]).content
+        finally:
+            collector.finish_runs()
+
+    collector.start_runs(3)
+    threads = [threading.Thread(target=run, args=(t,)) for t in ("NVDA", "AMD", "TSLA")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    # max_wait_seconds is 30s: the batch went out because every run was waiting
+    assert collector.jobs_submitted == 1 and collector.requests_submitted == 3
+    assert all(results[t].startswith(f"Fake response to: {t}") for t in ("NVDA", "AMD", "TSLA"))
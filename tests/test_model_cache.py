@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+
+from agno.models.base import Model
+from agno.models.message import Message
+
+from utils.model_cache import MemoryTier, PostgresTier, ResponseCache, enable_response_cache
+
+
+@dataclass
+class CountingModel(Model):
+    id: str = "counting"
+    temperature: float = 0
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.calls = []
+
+    def invoke(self, **kwargs):
+        self.calls.append("invoke")
+        return f"answer to {kwargs['messages'][-1].content}"
+
+    async def ainvoke(self, **kwargs):
+        return CountingModel.invoke(self, **kwargs)
+
+    def invoke_stream(self, **kwargs):
+        self.calls.append("invoke_stream")
+        yield from ("a", "b", "c")
+
+    async def ainvoke_stream(self, **kwargs):
+        for chunk in CountingModel.invoke_stream(self, **kwargs):
+            yield chunk
+
+    def parse_provider_response(self, response, **kwargs):
+        raise NotImplementedError
+
+    def parse_provider_response_delta(self, response):
+        raise NotImplementedError
+
+
+def test_identical_requests_hit_the_cache():
+    cache = ResponseCache(MemoryTier())
+    model = enable_response_cache(CountingModel(), cache)
+    ask = [Message(role="user", content="hi")]
+
+    assert model.invoke(messages=ask) == "answer to hi"
+    assert model.invoke(messages=[Message(role="user", content="hi")]) == "answer to hi"
+    assert model.invoke(messages=[Message(role="user", content="bye")]) == "answer to bye"
+    assert model.calls == ["invoke", "invoke"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_stream_is_replayed_only_after_completion():
+    cache = ResponseCache(MemoryTier())
+    model = enable_response_cache(CountingModel(), cache)
+    ask = [Message(role="user", content="hi")]
+
+    next(model.invoke_stream(messages=ask))  # abandoned stream is not stored
+    assert list(model.invoke_stream(messages=ask)) == ["a", "b", "c"]
+    assert list(model.invoke_stream(messages=ask)) == ["a", "b", "c"]
+    assert model.calls == ["invoke_stream", "invoke_stream"]
+
+
+class RecordingTier(PostgresTier):
+    """An in-memory stand-in for the Postgres tier recording the thread of every call."""
+
+    def __init__(self):
+        super().__init__("response_cache_test")
+        self.values = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.values.get(key)
+
+    def set(self, key, value, model_id=None):
+        self.threads.append(threading.get_ident())
+        self.values[key] = value
+
+
+def test_async_calls_reach_the_shared_tier_off_the_event_loop():
+    shared = RecordingTier()
+    model = enable_response_cache(CountingModel(), ResponseCache(MemoryTier(), shared))
+    ask = [Message(role="user", content="hi")]
+
+    async def run():
+        first = await model.ainvoke(messages=ask)
+        streamed = [chunk async for chunk in model.ainvoke_stream(messages=ask)]
+        return first, streamed, threading.get_ident()
+
+    first, streamed, loop_thread = asyncio.run(run())
+    assert (first, streamed) == ("answer to hi", ["a", "b", "c"])
+    assert len(shared.threads) == 4
+    assert loop_thread not in shared.threads
+
+    # a fresh process-local tier is refilled from the shared one
+    cold = enable_response_cache(CountingModel(), ResponseCache(MemoryTier(), shared))
+    assert asyncio.run(cold.ainvoke(messages=ask)) == "answer to hi"
+    assert cold.calls == []
@@ -0,0 +1,37 @@
+from utils.model_factory import clear_clients, create_model, resolve_class
+
+
+def test_models_share_pooled_client():
+    clear_clients()
+    flash = create_model("gemini-2.5-flash", api_key="test-key")
+    pro = create_model("gemini:gemini-2.5-pro", api_key="test-key")
+    assert flash.client is not None
+    assert flash.client is pro.client
+
+    other_key = create_model("gemini-2.5-flash", api_key="other-key")
+    other_transport = create_model(
+        "gemini-2.5-flash", api_key="test-key", http_options={"base_url": "http://127.0.0.1:1"}
+    )
+    assert other_key.client is not flash.client
+    assert other_transport.client is not flash.client
+    clear_clients()
+
+
+def test_provider_class_resolution_is_memoized_including_failures():
+    misses = resolve_class.cache_info().misses
+    first = resolve_class("no_such_sdk.Model", "json.JSONDecoder")
+    assert resolve_class("no_such_sdk.Model", "json.JSONDecoder") is first
+    assert first[0] is not None and first[0].__name__ == "JSONDecoder"
+    assert first[1] == ("no_such_sdk.Model: ModuleNotFoundError",)
+    assert resolve_class("no_such_sdk.Model")[0] is None
+    assert resolve_class.cache_info().misses == misses + 2
+
+
+def test_model_routing_is_opt_in():
+    from utils.model_router import RoutedModelMixin
+
+    assert not isinstance(create_model("gemini-2.5-pro", api_key="test-key"), RoutedModelMixin)
+
+    routed = create_model("gemini-2.5-flash", api_key="test-key", fallback_models=["gemini-2.5-flash-lite"])
+    assert isinstance(routed, RoutedModelMixin)
+    assert [m.id for m in routed.fallback_models] == ["gemini-2.5-flash-lite"]
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+from agno.exceptions import ModelProviderError
+from agno.models.base import Model
+from agno.models.message import Message
+
+from agents.settings import agent_settings
+from utils.model_limiter import ModelLimiter, enable_limiter, get_limiter
+
+
+@dataclass
+class ThrottlingModel(Model):
+    """Fake provider that answers 429 whenever more than `capacity` calls overlap."""
+
+    id: str = "fake-throttling"
+    capacity: int = 2
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, **kwargs):
+        with self.lock:
+            self.active += 1
+            overloaded = self.active > self.capacity
+        try:
+            if overloaded:
+                raise ModelProviderError("RESOURCE_EXHAUSTED", status_code=429, model_id=self.id)
+            time.sleep(0.02)
+            return "ok"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    async def ainvoke(self, **kwargs):
+        return self.invoke(**kwargs)
+
+    def invoke_stream(self, **kwargs):
+        yield self.invoke(**kwargs)
+
+    async def ainvoke_stream(self, **kwargs):
+        yield self.invoke(**kwargs)
+
+    def parse_provider_response(self, response, **kwargs):
+        raise NotImplementedError
+
+    def parse_provider_response_delta(self, response):
+        raise NotImplementedError
+
+
+def test_window_backs_off_on_throttling(monkeypatch):
+    monkeypatch.setattr(agent_settings, "model_throttle_backoff_seconds", 0.01)
+    monkeypatch.setattr(agent_settings, "model_throttle_retries", 10)
+    model = enable_limiter(ThrottlingModel())
+    messages = [Message(role="user", content="hi")]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda _: model.invoke(messages=messages), range(32)))
+
+    metrics = get_limiter("fake-throttling").metrics()
+    assert results == ["ok"] * 32
+    assert metrics["throttled"] > 0
+    assert metrics["min_window"] < agent_settings.default_model_concurrency
+    assert metrics["max_queue_depth"] > 0
+    assert metrics["completed"] == 32
+
+
+def test_waiters_are_served_in_arrival_order():
+    limiter = ModelLimiter("fifo", max_concurrency=1)
+    limiter.acquire()
+    order = []
+
+    def worker(i):
+        limiter.acquire()
+        order.append(i)
+        limiter.release()
+
+    threads = []
+    for i in range(5):
+        threads.append(threading.Thread(target=worker, args=(i,)))
+        threads[-1].start()
+        while limiter.metrics()["queue_depth"] < i + 1:
+            time.sleep(0.001)
+    limiter.release()
+    for t in threads:
+        t.join()
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_token_budget_holds_requests_and_cancelled_waiters_leave_the_queue():
+    limiter = ModelLimiter("tpm", max_concurrency=4, tokens_per_minute=100)
+
+    async def main():
+        await limiter.aacquire(80)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.aacquire(50), 0.05)
+        await limiter.aacquire(20)
+        return limiter.metrics()
+
+    metrics = asyncio.run(main())
+    assert (metrics["in_flight"], metrics["queue_depth"], metrics["tokens_last_minute"]) == (2, 0, 100)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from agno.exceptions import ModelProviderError
+from agno.models.base import Model
+from agno.models.message import Message
+
+from agents.settings import agent_settings
+from utils.model_router import enable_routing, routing_metrics
+
+
+@dataclass
+class SlowModel(Model):
+    """Fake provider with a fixed delay before the first chunk, or a failure."""
+
+    id: str = "slow"
+    provider: str = "Fake"
+    delay: float = 0.0
+    error: Optional[int] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.closed = False
+
+    def invoke(self, **kwargs):
+        time.sleep(self.delay)
+        if self.error:
+            raise ModelProviderError("boom", status_code=self.error, model_id=self.id)
+        return self.id
+
+    async def ainvoke(self, **kwargs):
+        return self.invoke(**kwargs)
+
+    def invoke_stream(self, **kwargs):
+        yield self.invoke(**kwargs)
+
+    async def ainvoke_stream(self, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+            for part in ("1", "2"):
+                yield f"{self.id}-{part}"
+        finally:
+            self.closed = True
+
+    def parse_provider_response(self, response, **kwargs):
+        raise NotImplementedError
+
+    def parse_provider_response_delta(self, response):
+        raise NotImplementedError
+
+
+MESSAGES = [Message(role="user", content="hi")]
+
+
+def test_fails_over_to_the_next_tier():
+    before = routing_metrics()["failovers"]
+    model = enable_routing(SlowModel(id="primary", error=500), [SlowModel(id="secondary")])
+
+    assert model.invoke(messages=MESSAGES) == "secondary"
+    assert routing_metrics()["failovers"] == before + 1
+
+
+def test_slow_primary_is_hedged_and_cancelled(monkeypatch):
+    monkeypatch.setattr(agent_settings, "hedge_initial_delay_seconds", 0.05)
+    model = enable_routing(SlowModel(id="hedge-primary", delay=5), [SlowModel(id="hedge-secondary", delay=0.01)])
+
+    async def main():
+        start = time.perf_counter()
+        chunks = [chunk async for chunk in model.ainvoke_stream(messages=MESSAGES)]
+        return chunks, time.perf_counter() - start
+
+    chunks, elapsed = asyncio.run(main())
+    assert chunks == ["hedge-secondary-1", "hedge-secondary-2"]
+    assert elapsed < 1
+    assert model.closed  # the primary's stream was cancelled
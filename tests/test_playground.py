@@ -0,0 +1,32 @@
+from agno.agent import Agent
+from agno.app.playground.operator import get_agent_by_id
+
+from api.routes import playground
+from api.routes.playground import LazyEntries
+from utils.fake_provider import FakeModel
+
+
+def test_playground_builds_nothing_at_import():
+    assert (playground.agents.built, playground.teams.built, playground.workflows.built) == (0, 0, 0)
+    assert len(playground.agents) == 5
+
+
+def test_lookup_builds_entries_only_up_to_the_match():
+    calls = []
+
+    def factory(agent_id):
+        def build():
+            calls.append(agent_id)
+            return Agent(agent_id=agent_id, model=FakeModel())
+
+        return build
+
+    entries = LazyEntries([factory("a"), factory("b"), factory("c")])
+    found = get_agent_by_id("b", entries)
+    assert found is not None and found.agent_id == "b"
+    assert calls == ["a", "b"] and entries.built == 2
+
+    assert [agent.agent_id for agent in entries] == ["a", "b", "c"]
+    assert get_agent_by_id("a", entries) is entries[0] and calls == ["a", "b", "c"]
+    first = entries[0]
+    assert first is not None and first.app_id == playground.app_id
@@ -1,14 +1,67 @@
-from utils.prompt_loader import render_prompt
+from utils.prompt_loader import PromptKey, render_prompt
 
 
 def test_render_scholar_prompt():
-    msgs, meta = render_prompt("prompts/agents/scholar.yaml", model=None, user_id="test-user", user_query="What is AI?")
-    assert isinstance(msgs, list)
-    roles = {m["role"] for m in msgs}
-    assert "system" in roles
-    assert "user" in roles
-    assert meta.get("max_tokens") is None or isinstance(meta.get("max_tokens"), int) or True
+    prompts, meta = render_prompt(
+        "prompts/agents/scholar.yaml", model=None, user_id="test-user", user_query="What is AI?"
+    )
+    assert PromptKey.SYSTEM_MESSAGE in prompts
+    assert PromptKey.INSTRUCTIONS in prompts
+    assert meta.get("max_tokens") is None or isinstance(meta.get("max_tokens"), int)
     # ensure rendered includes user id and query
-    contents = "\n".join(m["content"] for m in msgs)
+    contents = "\n".join(prompts.values())
     assert "test-user" in contents
     assert "What is AI?" in contents
+    assert "{{" not in contents
+
+
+def test_prompt_registry_caches_until_mtime_changes(tmp_path):
+    import os
+
+    from utils.prompt_loader import PromptRegistry
+
+    prompt_file = tmp_path / "agent.yaml"
+    prompt_file.write_text("prompt:\n  description: first\nmetadata:\n  tags: [a, b]\n")
+
+    registry = PromptRegistry(root=tmp_path)
+    first = registry.get(prompt_file)
+    assert registry.get(prompt_file) is first
+    assert first.metadata["tags"] == ("a", "b")
+
+    prompt_file.write_text("prompt:\n  description: second\n")
+    stat = prompt_file.stat()
+    os.utime(prompt_file, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000))
+
+    second = registry.get(prompt_file)
+    assert second is not first
+    assert second.prompts["description"] == "second"
+
+
+def test_prompt_bundle_round_trip(tmp_path):
+    import pytest
+
+    from utils.prompt_bundle import build_bundle, load_bundle
+    from utils.prompt_loader import PROMPTS_DIR, PromptRegistry
+
+    bundle = build_bundle(PROMPTS_DIR, tmp_path / "prompts.bundle")
+    registry = PromptRegistry()
+    assert load_bundle(bundle, registry) == len(list(PROMPTS_DIR.rglob("*.yaml")))
+
+    bundled = registry.get("prompts/agents/scholar.yaml")
+    assert bundled.mtime_ns == 0
+    assert "bundle-user" in bundled.render(user_id="bundle-user")["instructions"]
+
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "bad.yaml").write_text("prompt:\n  instrucitons: typo\n")
+    with pytest.raises(ValueError, match="instrucitons"):
+        build_bundle(broken, tmp_path / "broken.bundle")
+
+
+def test_missing_prompt_bundle_falls_back_to_files(tmp_path, monkeypatch):
+    from utils.prompt_loader import PromptRegistry, load_configured_bundle
+
+    monkeypatch.setenv("PROMPT_BUNDLE", str(tmp_path / "prompts.bundle"))
+    registry = PromptRegistry()
+    assert load_configured_bundle(registry) == 0
+    assert registry.get("prompts/agents/scholar.yaml").mtime_ns > 0
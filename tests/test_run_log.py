@@ -0,0 +1,72 @@
+import pytest
+from agno.agent import Agent
+from agno.storage.session.workflow import WorkflowSession
+from sqlalchemy import func, select
+
+from db.run_log import RunLogStorage
+from db.storage import get_engine
+from utils.fake_provider import FakeModel
+
+
+@pytest.fixture()
+def engine():
+    engine = get_engine()
+    try:
+        engine.connect().close()
+    except Exception:
+        pytest.skip("database not available")
+    return engine
+
+
+@pytest.fixture()
+def storage(engine):
+    storage = RunLogStorage(table_name="test_run_log", mode="agent", db_engine=engine)
+    storage.create()
+    yield storage
+    storage.drop()
+
+
+def logged_runs(storage, session_id):
+    with storage.engine.connect() as conn:
+        stmt = select(func.count()).select_from(storage.runs).where(storage.runs.c.session_id == session_id)
+        return conn.execute(stmt).scalar()
+
+
+def loaded_runs(storage, session_id):
+    session = storage.read(session_id)
+    assert session is not None and session.memory is not None
+    return session.memory["runs"]
+
+
+def test_each_turn_appends_one_run_and_compaction_keeps_the_history(storage, engine):
+    agent = Agent(model=FakeModel(), storage=storage, session_id="s1", user_id="u1", add_history_to_messages=True)
+    for turn in range(4):
+        agent.run(f"turn {turn}")
+        assert logged_runs(storage, "s1") == turn + 1
+
+    assert storage.compact(min_runs=3, idle_seconds=60) == 0
+    assert storage.compact(min_runs=3, idle_seconds=-60) == 1 and logged_runs(storage, "s1") == 0
+
+    # a reader that only loads the last two runs still appends after them
+    windowed = RunLogStorage(table_name="test_run_log", mode="agent", db_engine=engine, history_runs=2)
+    agent = Agent(model=FakeModel(), storage=windowed, session_id="s1", user_id="u1", add_history_to_messages=True)
+    agent.run("turn 4")
+    assert len(loaded_runs(windowed, "s1")) == 2
+
+    runs = loaded_runs(storage, "s1")
+    assert [run["messages"][-2]["content"] for run in runs] == [f"turn {turn}" for turn in range(5)]
+    assert [session.session_id for session in storage.get_all_sessions(user_id="u1")] == ["s1"]
+
+
+def test_workflow_runs_align_on_the_run_id_of_their_response(engine):
+    storage = RunLogStorage(table_name="test_run_log_workflow", mode="workflow", db_engine=engine)
+    storage.create()
+    try:
+        runs = [{"input": {"topic": str(i)}, "response": {"run_id": f"r{i}", "content": str(i)}} for i in range(3)]
+        for count in (1, 3, 3):
+            session = WorkflowSession(session_id="w1", workflow_id="wf", memory={"runs": runs[:count]}, session_data={})
+            storage.upsert(session)
+        assert logged_runs(storage, "w1") == 3
+        assert loaded_runs(storage, "w1") == runs
+    finally:
+        storage.drop()
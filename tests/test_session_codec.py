@@ -0,0 +1,108 @@
+import json
+from datetime import datetime
+
+import pytest
+from agno.storage.postgres import PostgresStorage
+from agno.storage.session.workflow import WorkflowSession
+from sqlalchemy import create_engine, select
+
+from db.codec import CODEC_KEY, CompressedPostgresStorage, SessionCodec, json_serializer
+from db.run_log import RunLogStorage
+from db.storage import get_engine
+
+ARTICLE = " ".join(f"paragraph {i} of a scraped article about storage engines" for i in range(400))
+
+
+def blog_session(session_id: str) -> WorkflowSession:
+    state = {"scraped_articles": {"storage": {"url": "https://example.com", "content": ARTICLE}}}
+    return WorkflowSession(
+        session_id=session_id,
+        workflow_id="generate-blog-post-on",
+        user_id="u1",
+        memory={"runs": []},
+        session_data={"session_state": state},
+    )
+
+
+def test_only_large_payloads_are_compressed():
+    codec = SessionCodec(threshold=1024)
+    small = {"session_state": {"topic": "rust"}}
+    assert codec.encode(small) is small
+
+    encoded = codec.encode({"content": ARTICLE})
+    assert encoded[CODEC_KEY] == "zlib" and len(encoded["data"]) < len(ARTICLE) / 4
+    assert codec.decode(encoded) == {"content": ARTICLE}
+    # compressed values are not compressed twice, and decoding never depends on the threshold
+    assert codec.encode(encoded) is encoded
+    assert SessionCodec(threshold=None).decode(encoded) == {"content": ARTICLE}
+
+    with pytest.raises(ValueError, match="codec"):
+        codec.decode({CODEC_KEY: "brotli", "data": ""})
+
+
+def test_values_are_serialized_like_plain_jsonb_whatever_their_size():
+    codec = SessionCodec(threshold=1024)
+    # plain JSONB rejects a datetime, so a large field must not quietly turn it into a string
+    for content in ("short", ARTICLE):
+        with pytest.raises(TypeError, match="datetime"):
+            codec.encode({"content": content, "created_at": datetime(2025, 1, 1)})
+
+    engine = create_engine("postgresql+psycopg://", json_serializer=lambda value: json.dumps(value, default=str))
+    encoded = SessionCodec(threshold=1024, serializer=json_serializer(engine)).encode(
+        {"content": ARTICLE, "created_at": datetime(2025, 1, 1)}
+    )
+    assert codec.decode(encoded)["created_at"] == "2025-01-01 00:00:00"
+
+
+@pytest.fixture()
+def engine():
+    engine = get_engine()
+    try:
+        engine.connect().close()
+    except Exception:
+        pytest.skip("database not available")
+    return engine
+
+
+def test_compressed_and_plain_rows_load_from_the_same_table(engine):
+    plain = PostgresStorage(table_name="test_session_codec", db_engine=engine, mode="workflow")
+    compressed = CompressedPostgresStorage(
+        table_name="test_session_codec", db_engine=engine, mode="workflow", codec=SessionCodec(threshold=1024)
+    )
+    compressed.create()
+    try:
+        plain.upsert(blog_session("written-before"))
+        session = blog_session("written-after")
+        saved = compressed.upsert(session)
+        assert saved is not None and saved.session_data == session.session_data
+
+        with engine.connect() as conn:
+            stored = conn.execute(
+                select(compressed.table.c.session_data).where(compressed.table.c.session_id == "written-after")
+            ).scalar()
+        assert stored[CODEC_KEY] == "zlib"
+
+        for session_id in ("written-before", "written-after"):
+            loaded = compressed.read(session_id)
+            assert loaded is not None and loaded.session_data == blog_session(session_id).session_data
+        assert len(compressed.get_all_sessions(user_id="u1")) == 2
+    finally:
+        compressed.drop()
+
+
+def test_run_log_compresses_large_runs(engine):
+    storage = RunLogStorage(
+        table_name="test_session_codec", mode="workflow", db_engine=engine, codec=SessionCodec(1024)
+    )
+    storage.create()
+    try:
+        session = blog_session("w1")
+        session.memory = {"runs": [{"input": {"topic": "storage"}, "response": {"run_id": "r1", "content": ARTICLE}}]}
+        storage.upsert(session)
+        with engine.connect() as conn:
+            assert conn.execute(select(storage.runs.c.run)).scalar()[CODEC_KEY] == "zlib"
+        loaded = storage.read("w1")
+        assert loaded is not None
+        assert loaded.memory == session.memory and loaded.session_data == session.session_data
+    finally:
+        storage.drop()
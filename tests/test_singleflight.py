@@ -0,0 +1,51 @@
+import asyncio
+
+from utils.singleflight import SingleFlight, flight_key
+
+
+def test_concurrent_duplicates_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def run():
+        runs.append(1)
+        for chunk in ("a", "b", "c"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        key = flight_key("workflow", "blog", "  Rust   async ", "gemini-2.5-pro")
+        return [c async for c in flights.stream(key, run)]
+
+    async def main():
+        # the late subscriber joins mid-stream and still gets the replayed prefix
+        return await asyncio.gather(*(consume(d) for d in (0, 0, 0, 0.015)))
+
+    results = asyncio.run(main())
+    assert results == [["a", "b", "c"]] * 4
+    assert len(runs) == 1
+    assert (flights.started, flights.coalesced, flights.in_flight()) == (1, 3, 0)
+
+
+def test_run_is_cancelled_when_every_subscriber_leaves():
+    flights = SingleFlight()
+
+    async def main():
+        stopped = asyncio.Event()
+
+        async def run():
+            try:
+                while True:
+                    yield "tick"
+                    await asyncio.sleep(0.01)
+            finally:
+                stopped.set()
+
+        stream = flights.stream("key", run)
+        assert await stream.__anext__() == "tick"
+        await stream.aclose()
+        await asyncio.wait_for(stopped.wait(), 1)
+        return flights.in_flight()
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from typing import Dict, List
+
+from agno.models.response import ToolExecution
+from agno.run.response import RunEvent, RunResponse
+
+from utils.sse import format_event, sse_stream
+
+
+def collect(chunks, delay: float = 0.0, **options):
+    async def source():
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    async def main():
+        return [frame async for frame in sse_stream(source(), **options)]
+
+    return asyncio.run(main())
+
+
+def parse(frame: str):
+    fields: Dict[str, List[str]] = {}
+    for line in frame.strip("\n").split("\n"):
+        name, _, value = line.partition(": ")
+        fields.setdefault(name, []).append(value)
+    return fields.get("event", [None])[0], "\n".join(fields.get("data", []))
+
+
+def test_format_event_splits_multiline_data():
+    assert format_event("a\nb", "message", 3) == "event: message\nid: 3\ndata: a\ndata: b\n\n"
+
+
+def test_fragments_coalesce_by_size_and_end_with_done():
+    frames = collect([RunResponse(content="ab")] * 10, flush_interval=10, flush_bytes=8)
+    events = [parse(frame) for frame in frames]
+    assert [data for name, data in events if name == "message"] == ["abababab", "abababab", "abab"]
+    assert events[-1] == ("done", "[DONE]")
+    assert [frame.split("\n")[1] for frame in frames] == [f"id: {i}" for i in range(1, 5)]
+
+
+def test_time_window_flushes_and_idle_stream_gets_heartbeats():
+    frames = collect(["a", "b"], delay=0.05, flush_interval=0.01, flush_bytes=1024, heartbeat=0.02)
+    assert ": ping\n\n" in frames
+    assert [parse(f)[1] for f in frames if f.startswith("event: message")] == ["a", "b"]
+
+
+def test_structured_events_and_errors():
+    tool = ToolExecution(tool_name="search", tool_args={"q": "x"}, result="found")
+    chunks = [
+        RunResponse(content="hi", event=RunEvent.run_response),
+        RunResponse(event=RunEvent.tool_call_completed, tools=[tool]),
+        RunResponse(content="hi", event=RunEvent.run_completed, metrics={"time": [1.0]}),
+    ]
+    events = [parse(frame) for frame in collect(chunks, structured=True)]
+    assert [name for name, _ in events] == ["message", "tool_call", "metrics", "done"]
+    assert json.loads(events[1][1])["tool_name"] == "search" and json.loads(events[2][1]) == {"time": [1.0]}
+
+    # without structured events, tool calls and the repeated final content are dropped
+    assert [parse(f)[0] for f in collect(chunks)] == ["message", "done"]
+
+    events = [parse(frame) for frame in collect(["partial", ValueError("boom")])]
+    assert events == [("message", "partial"), ("error", json.dumps({"error": "boom"}))]
@@ -0,0 +1,28 @@
+import pytest
+from agno.storage.session.agent import AgentSession
+
+from db.bootstrap import bootstrap_storage, record_schema_queries
+from db.storage import get_engine, get_storage
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = get_engine()
+    try:
+        engine.connect().close()
+    except Exception:
+        pytest.skip("database not available")
+    return engine
+
+
+def test_hot_path_runs_no_schema_queries(engine):
+    bootstrap_storage()
+    storage = get_storage("scholar_sessions", mode="agent")
+
+    with record_schema_queries(engine) as queries:
+        session = AgentSession(session_id="bootstrap-test", agent_id="scholar_agent", user_id="test-user")
+        assert storage.upsert(session) is not None
+        assert storage.read("bootstrap-test") is not None
+        storage.delete_session("bootstrap-test")
+
+    assert queries == []
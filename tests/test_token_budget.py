@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from utils.token_budget import (
+    GeminiApproxEncoder,
+    count_messages,
+    count_tokens,
+    get_encoder,
+    model_family,
+    trim_messages,
+    truncate_text,
+)
+
+
+def test_gemini_models_are_counted_locally():
+    assert model_family("gemini-2.5-flash") == "gemini"
+    assert model_family("gemini:gemma-3n-e2b-it") == "gemini"
+    assert get_encoder("gemini") is get_encoder("gemini")
+    assert count_tokens("x" * 400, "gemini-2.5-pro") == 100
+
+
+def test_count_messages_adds_per_message_overhead():
+    messages = [{"role": "system", "content": "a" * 40}, {"role": "user", "content": "b" * 40}]
+    assert count_messages(messages, "gemini-2.5-flash") == 10 + 10 + 2 * 4
+
+
+def test_calibrate_uses_count_tokens_results():
+    client = SimpleNamespace(
+        models=SimpleNamespace(count_tokens=lambda model, contents: SimpleNamespace(total_tokens=len(contents) // 2))
+    )
+    encoder = GeminiApproxEncoder()
+    assert encoder.calibrate(["abcd" * 10, "efgh" * 5], client, "gemini-2.5-flash") == 2.0
+    assert encoder.count("abcd") == 2
+
+
+def test_trim_and_truncate_to_budget():
+    messages = [
+        {"role": "system", "content": "s" * 40},
+        {"role": "user", "content": "old" * 100},
+        {"role": "assistant", "content": "reply" * 40},
+        {"role": "user", "content": "latest question"},
+    ]
+    trimmed = trim_messages(messages, max_tokens=80, model="gemini-2.5-flash")
+    assert [m["role"] for m in trimmed] == ["system", "assistant", "user"]
+
+    text = truncate_text("word " * 1000, 50, "gemini-2.5-flash")
+    assert count_tokens(text, "gemini-2.5-flash") <= 60
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from agno.run.response import RunResponse
+from agno.storage.base import Storage
+from agno.storage.session import Session
+from agno.workflow import Workflow
+
+from workflows.operator import astream_workflow
+
+
+class MemoryStorage(Storage):
+    """Workflow sessions in a dict, recording the thread of every read and write."""
+
+    def __init__(self):
+        super().__init__(mode="workflow")
+        self.sessions: Dict[str, Session] = {}
+        self.calls: List[tuple] = []
+
+    def read(self, session_id: str, user_id: Optional[str] = None) -> Optional[Session]:
+        self.calls.append(("read", threading.get_ident()))
+        return self.sessions.get(session_id)
+
+    def upsert(self, session: Session) -> Optional[Session]:
+        self.calls.append(("upsert", threading.get_ident()))
+        self.sessions[session.session_id] = session
+        return session
+
+    def create(self) -> None:
+        pass
+
+    def get_all_session_ids(self, user_id=None, agent_id=None) -> List[str]:
+        return list(self.sessions)
+
+    def get_all_sessions(self, user_id=None, entity_id=None) -> List[Session]:
+        return list(self.sessions.values())
+
+    def get_recent_sessions(self, user_id=None, entity_id=None, limit=2) -> List[Session]:
+        return list(self.sessions.values())[:limit]
+
+    def delete_session(self, session_id=None):
+        self.sessions.pop(session_id, None)
+
+    def drop(self) -> None:
+        self.sessions.clear()
+
+    def upgrade_schema(self) -> None:
+        pass
+
+
+class Greeter(Workflow):
+    def run(self, name: str) -> Iterator[RunResponse]:  # type: ignore
+        raise AssertionError("the async path must not call run")
+
+    async def arun(self, name: str) -> AsyncIterator[RunResponse]:
+        for part in ("Hello, ", name):
+            await asyncio.sleep(0)
+            yield RunResponse(content=part)
+
+
+def test_native_arun_reads_and_writes_the_session_off_the_loop():
+    storage = MemoryStorage()
+    workflow = Greeter(workflow_id="greeter", session_id="s1", storage=storage)
+
+    async def run():
+        items = [item async for item in astream_workflow(workflow, "Ada")]
+        return items, threading.get_ident()
+
+    items, loop_thread = asyncio.run(run())
+    assert [item.content for item in items] == ["Hello, ", "Ada"]
+    assert {item.run_id for item in items} == {workflow.run_id}
+    assert all(item.session_id == "s1" and item.workflow_id == "greeter" for item in items)
+
+    assert [call for call, _ in storage.calls][:1] == ["read"]
+    assert [call for call, _ in storage.calls][-1] == "upsert"
+    assert loop_thread not in {thread for _, thread in storage.calls}
+
+    session = storage.sessions["s1"]
+    assert session.memory is not None
+    runs = session.memory["runs"]
+    assert [(run["run_id"], run["content"]) for run in runs] == [(workflow.run_id, "Hello, Ada")]
@@ -0,0 +1,266 @@
+"""Admission control for the run endpoints.
+
+Every run (`POST /v1/{agents,teams,workflows}/{id}/runs`, and the playground's) must
+hold two slots for as long as it executes, streaming included:
+
+- one of its runnable's slots (`admission_limits["agents/sage"]`, ..., else
+  `admission_runnable_limit`), so one busy agent cannot take the whole service;
+- one of its model lane's slots: runs are split by model tier into the `lite`
+  (flash-lite, gemma), `flash` and `pro` lanes, each with its own capacity
+  (`admission_lane_limits`), so cheap flash-lite runs are never stuck behind
+  long pro-model workflows.
+
+When a slot is taken, the request waits in a bounded FIFO queue for at most
+`admission_queue_timeout_seconds`. A full queue or an expired wait is answered
+with 429 and a `Retry-After` estimated from the lane's recent run durations.
+
+`admission_metrics()` reports the active, queued and rejected runs of every lane.
+"""
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from utils.log import logger
+
+_RUN_PATH = re.compile(r"^/v1/(?:playground/)?(agents|teams|workflows)/([^/]+)/runs/?$")
+
+LANES = {
+    "gemini-2.5-flash-lite": "lite",
+    "gemma-3n-e2b-it": "lite",
+    "gemini-2.5-flash": "flash",
+    "gemini-2.5-pro": "pro",
+}
+DEFAULT_MODEL = "gemini-2.5-pro"
+
+
+def lane_for(model_id: Optional[str]) -> str:
+    return LANES.get(model_id or DEFAULT_MODEL, "pro")
+
+
+class Rejected(Exception):
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"{lane}: {reason}")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Lane:
+    """A concurrency limit with a bounded FIFO queue, on one event loop."""
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # recent run duration (EWMA), for Retry-After
+        self.avg_seconds = 1.0
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def retry_after(self) -> int:
+        # roughly when the runs ahead of a new request have drained
+        backlog = len(self._waiters) + 1
+        return max(1, min(60, math.ceil(self.avg_seconds * backlog / max(self.limit, 1))))
+
+    async def acquire(self, timeout: float) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Rejected(self.name, "queue full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait ended: give it back
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                self.rejected += 1
+                raise Rejected(self.name, "queue timeout", self.retry_after()) from None
+            raise
+        self.admitted += 1
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        if held_seconds is not None:
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # hand the slot straight to the next waiter: `active` is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "lane": self.name,
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_seconds": round(self.avg_seconds, 3),
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        runnable_limit: int = 16,
+        limits: Optional[Dict[str, int]] = None,
+        lane_limits: Optional[Dict[str, int]] = None,
+        queue_size: int = 32,
+        queue_timeout: float = 10.0,
+    ):
+        self.runnable_limit = runnable_limit
+        self.limits = limits or {}
+        self.lane_limits = lane_limits or {}
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._lanes: Dict[str, Lane] = {}
+
+    def _lane(self, name: str, limit: int) -> Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = Lane(name, limit, self.queue_size)
+        return lane
+
+    def lanes_for(self, kind: str, runnable_id: str, model_id: Optional[str]) -> Tuple[Lane, Lane]:
+        runnable = f"{kind}/{runnable_id}"
+        model_lane = lane_for(model_id)
+        return (
+            self._lane(runnable, self.limits.get(runnable, self.runnable_limit)),
+            self._lane(model_lane, self.lane_limits.get(model_lane, self.runnable_limit)),
+        )
+
+    async def acquire(self, lanes: Tuple[Lane, ...]) -> None:
+        """Take a slot of every lane, in order, within one queue timeout. Raises Rejected."""
+        deadline = time.monotonic() + self.queue_timeout
+        held: List[Lane] = []
+        try:
+            for lane in lanes:
+                await lane.acquire(max(deadline - time.monotonic(), 0.0))
+                held.append(lane)
+        except BaseException:
+            for lane in reversed(held):
+                lane.release()
+            raise
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        return [lane.metrics() for lane in list(self._lanes.values())]
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding admission slots for the whole of each run request."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send) -> None:
+        match = _RUN_PATH.match(scope.get("path", "")) if scope["type"] == "http" else None
+        if match is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        # read the body for the model id, then replay it to the endpoint
+        body, more = b"", True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        kind, runnable_id = match.groups()
+        lanes = self.controller.lanes_for(kind, runnable_id, _model_of(scope, body))
+        try:
+            await self.controller.acquire(lanes)
+        except Rejected as e:
+            logger.warning(f"Rejected {kind}/{runnable_id}: {e}")
+            await _too_many_requests(send, e)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            held = time.monotonic() - start
+            for lane in reversed(lanes):
+                lane.release(held)
+
+
+def _model_of(scope, body: bytes) -> Optional[str]:
+    headers = dict(scope.get("headers") or [])
+    if b"json" not in headers.get(b"content-type", b""):
+        return None
+    try:
+        model = json.loads(body or b"{}").get("model")
+    except (ValueError, AttributeError):
+        return None
+    return model if isinstance(model, str) else None
+
+
+async def _too_many_requests(send, error: Rejected) -> None:
+    payload = json.dumps({"detail": f"Too many concurrent runs ({error.reason}), retry later"}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                (b"retry-after", str(error.retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """The process-wide controller, configured from ApiSettings."""
+    global _controller
+    if _controller is None:
+        from api.settings import api_settings
+
+        _controller = AdmissionController(
+            runnable_limit=api_settings.admission_runnable_limit,
+            limits=api_settings.admission_limits,
+            lane_limits=api_settings.admission_lane_limits,
+            queue_size=api_settings.admission_queue_size,
+            queue_timeout=api_settings.admission_queue_timeout_seconds,
+        )
+    return _controller
+
+
+def admission_metrics() -> List[Dict[str, Any]]:
+    return _controller.metrics() if _controller is not None else []
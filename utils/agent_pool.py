@@ -0,0 +1,90 @@
+"""Pools of pre-built agents, checked out per request and returned after the run.
+
+A pool holds idle agents of one kind (agent type and model). `checkout` takes an
+idle agent, or builds one when the pool is empty, and rebinds it to the request
+through `factory(reuse=agent, **request)`. That is the same path that builds a
+fresh agent, so a pooled agent starts every run exactly like a new one: state
+from earlier runs (session, memory, context, run messages) is reset on checkout.
+
+Agents go back to the pool on `checkin`, up to the pool size; extra agents built
+under load are dropped.
+"""
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from agno.agent import Agent
+
+from utils.log import logger
+
+
+class AgentPool:
+    def __init__(self, factory: Callable[..., Agent], size: int, name: str = "agent"):
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self._idle: Deque[Agent] = deque()
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.reused = 0
+
+    def warm(self) -> None:
+        """Fill the pool up to its size."""
+        while len(self._idle) < self.size:
+            agent = self.factory(reuse=None)
+            with self._lock:
+                self.created += 1
+                self._idle.append(agent)
+
+    def checkout(self, **request: Any) -> Agent:
+        """An agent bound to `request` (user_id, session_id, ...), with no state from earlier runs."""
+        with self._lock:
+            idle: Optional[Agent] = self._idle.popleft() if self._idle else None
+        try:
+            agent = self.factory(reuse=idle, **request)
+        except BaseException:
+            # rebinding failed: the idle agent is still reusable, a new one was never built
+            if idle is not None:
+                self.checkin(idle)
+            raise
+        with self._lock:
+            if idle is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        return agent
+
+    def checkin(self, agent: Agent) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(agent)
+
+    @contextmanager
+    def lease(self, **request: Any) -> Iterator[Agent]:
+        """Check out an agent for the duration of a run."""
+        agent = self.checkout(**request)
+        try:
+            yield agent
+        finally:
+            self.checkin(agent)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pool": self.name,
+            "size": self.size,
+            "idle": len(self._idle),
+            "created": self.created,
+            "reused": self.reused,
+        }
+
+
+def warm_pools(pools: Dict[Any, AgentPool]) -> None:
+    """Warm every pool, logging (not raising) failures so startup can proceed."""
+    for pool in pools.values():
+        try:
+            pool.warm()
+        except Exception as e:
+            logger.warning(f"Could not warm the {pool.name} pool: {e}")
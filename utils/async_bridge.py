@@ -0,0 +1,112 @@
+"""Consume blocking iterators from async code without blocking the event loop.
+
+`iterate_in_thread` runs a synchronous iterator (e.g. a workflow's `run` generator,
+whose model and tool calls block) on a worker thread and hands its items to the
+event loop through a bounded asyncio queue:
+
+- backpressure: when the consumer falls `maxsize` items behind, the worker blocks
+  instead of buffering the whole run;
+- cancellation: when the consumer stops early (client disconnect, task cancelled,
+  `aclose()`), the iterator's `CancelToken` (utils/cancellation.py) is cancelled, so
+  code that checks it between steps stops at once; the worker stops at its next item
+  either way and closes the iterator, so generator `finally` blocks run;
+- errors raised by the iterator are re-raised in the consumer.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, AsyncGenerator, Callable, Iterator, Optional, TypeVar
+
+from utils.cancellation import CancelToken, set_token
+
+T = TypeVar("T")
+
+_POLL_SECONDS = 0.1
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The thread pool that runs blocking iterators, sized by WORKFLOW_THREADS."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from agents.settings import agent_settings
+
+                _executor = ThreadPoolExecutor(
+                    max_workers=agent_settings.workflow_threads, thread_name_prefix="workflow"
+                )
+    return _executor
+
+
+class _Done:
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+def _produce(
+    make_iterator: Callable[[], Iterator[Any]],
+    queue: "asyncio.Queue[Any]",
+    loop: asyncio.AbstractEventLoop,
+    token: CancelToken,
+) -> None:
+    def put(item: Any) -> bool:
+        # block while the queue is full, but give up once the consumer is gone
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=_POLL_SECONDS)
+                return True
+            except FutureTimeoutError:
+                if token.cancelled:
+                    future.cancel()
+                    return False
+
+    iterator = None
+    try:
+        iterator = make_iterator()
+        for item in iterator:
+            if token.cancelled or not put(item):
+                break
+        else:
+            put(_Done())
+    except BaseException as e:
+        # RunCancelled and the like, after the consumer is gone, go nowhere
+        if not token.cancelled:
+            put(_Done(e))
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+async def iterate_in_thread(
+    make_iterator: Callable[[], Iterator[T]], maxsize: int = 64, executor: Optional[Executor] = None
+) -> AsyncGenerator[T, None]:
+    """Yield the items of `make_iterator()`, which is called and iterated on a worker thread."""
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=maxsize)
+    token = CancelToken()
+    context = contextvars.copy_context()
+    context.run(set_token, token)
+    worker = loop.run_in_executor(executor or get_executor(), context.run, _produce, make_iterator, queue, loop, token)
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, _Done):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+    finally:
+        token.cancel()
+        # the worker may be parked on a full queue; it notices the cancel within _POLL_SECONDS
+        while not queue.empty():
+            queue.get_nowait()
+        if worker.done() and not worker.cancelled():
+            worker.exception()
@@ -1,15 +1,37 @@
 import logging
-from textwrap import dedent
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from copy import copy
+from dataclasses import dataclass
 from os import getenv
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 from agno.agent import Agent, AgentKnowledge
-from agno.models.google import Gemini
-from utils.model_factory import create_model
-from agno.storage.agent.postgres import PostgresAgentStorage
-from agents.settings import agent_settings
 
-from utils.prompt_loader import render_prompt, PromptKey
+from db.storage import StorageBackend, get_storage
+from utils.model_factory import create_model
+from utils.prompt_loader import CompiledPrompt, PromptKey, prompt_registry, render_prompt
+
+# Agent attributes holding per-session or per-run state. They are reset on every
+# clone so nothing leaks between requests built from the same blueprint.
+_PER_REQUEST_FIELDS = (
+    "memory",
+    "session_name",
+    "session_state",
+    "agent_session",
+    "session_metrics",
+    "run_id",
+    "run_input",
+    "run_messages",
+    "run_response",
+    "images",
+    "audio",
+    "videos",
+    "team_data",
+    "team_session_id",
+    "_tool_instructions",
+    "_tools_for_model",
+    "_functions_for_model",
+)
 
 
 def _create_identity(name: str) -> Tuple[str, str]:
@@ -18,29 +40,101 @@ def _create_identity(name: str) -> Tuple[str, str]:
     return agent_name, agent_id
 
 
-def _build_storage(table_name: str, db_url: str, auto_upgrade_schema: bool = True):
-    return PostgresAgentStorage(
-        table_name=table_name, db_url=db_url, auto_upgrade_schema=auto_upgrade_schema
+def _build_storage(
+    table_name: str, db_url: str, auto_upgrade_schema: bool = False, backend: Optional[StorageBackend] = None
+):
+    return get_storage(
+        table_name=table_name,
+        mode="agent",
+        url=db_url,
+        auto_upgrade_schema=auto_upgrade_schema,
+        backend=backend,
     )
 
 
-def create_agent(
+@dataclass(frozen=True)
+class AgentBlueprint:
+    """Immutable parts of an Agent, computed once and cloned for every request.
+
+    The prototype carries the rendered static prompts, the model config, the tool
+    list (whose schemas agno processes once) and the storage handle. `build` makes
+    a shallow copy, resets per-request state and only re-renders prompts that
+    depend on the request context. Passing `reuse` (an agent previously built from
+    this blueprint, e.g. from an AgentPool) restores it to the prototype instead
+    of copying, keeping its model object.
+    """
+
+    prototype: Agent
+    prompt: Optional[CompiledPrompt] = None
+
+    def build(
+        self,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        reuse: Optional[Agent] = None,
+        **prompt_ctx: Any,
+    ) -> Agent:
+        if reuse is None:
+            agent = copy(self.prototype)
+            model = copy(agent.model) if agent.model is not None else None
+        else:
+            # anything the previous run changed (context, tools, flags) goes back to the prototype
+            agent, model = reuse, reuse.model
+            agent.__dict__.clear()
+            agent.__dict__.update(self.prototype.__dict__)
+        for field in _PER_REQUEST_FIELDS:
+            setattr(agent, field, None)
+        if model is not None:
+            model.clear()
+        agent.model = model
+
+        agent.user_id = user_id
+        agent.session_id = session_id
+
+        if self.prompt is not None and self.prompt.templates:
+            rendered = self.prompt.render(user_id=user_id, **prompt_ctx)
+            for key in self.prompt.templates:
+                setattr(agent, key, rendered[key])
+        return agent
+
+
+_blueprints: Dict[Hashable, AgentBlueprint] = {}
+_blueprints_lock = threading.Lock()
+
+
+def get_blueprint(key: Hashable, builder: Callable[[], AgentBlueprint]) -> AgentBlueprint:
+    """Return the cached blueprint for `key`, building it on first use."""
+    blueprint = _blueprints.get(key)
+    if blueprint is None:
+        with _blueprints_lock:
+            blueprint = _blueprints.get(key)
+            if blueprint is None:
+                blueprint = builder()
+                _blueprints[key] = blueprint
+    return blueprint
+
+
+def clear_blueprints() -> None:
+    with _blueprints_lock:
+        _blueprints.clear()
+
+
+def build_agent_blueprint(
     name: str,
     prompt_path: str,
     model_id: Optional[str],
     db_url: Optional[str] = None,
-    user_id: Optional[str] = None,
-    session_id: Optional[str] = None,
     tools: Optional[List[Any]] = None,
     storage_table: Optional[str] = None,
     knowledge: Optional[AgentKnowledge] = None,
     defaults: Optional[Dict[str, Any]] = None,
     model_kwargs: Optional[Dict[str, Any]] = None,
-    user_query: Optional[str] = None
-) -> Agent:
-    """Create a standardized Agent instance.
+    storage_backend: Optional[StorageBackend] = None,
+) -> AgentBlueprint:
+    """Build the request-independent part of a standardized Agent.
 
-    Minimal opinionated factory to reduce duplication across agent modules.
+    `storage_backend` selects the session storage ("session" or "run_log", see
+    db.storage.get_storage); it defaults to STORAGE_BACKEND.
     """
     tools = tools or []
     defaults = defaults or {}
@@ -57,12 +151,7 @@ def create_agent(
         except Exception:
             model_id = "gemini-2.5-flash"
 
-    prompts, metadata = render_prompt(
-        path=prompt_path,
-        model=model_id,
-        user_id=user_id,
-        user_query=user_query,
-    )
+    prompts, metadata = render_prompt(path=prompt_path, model=model_id)
 
     logging.debug(f"Prompts loaded for agent {agent_name}: {prompts}")
 
@@ -72,26 +161,20 @@ def create_agent(
     agent_instructions = prompts.get(PromptKey.INSTRUCTIONS)
     agent_expected_output = prompts.get(PromptKey.EXPECTED_OUTPUT)
 
-    model = create_model(
-        model_id,
-        **(model_kwargs or {}),
-        #max_output_tokens=agent_settings.default_max_completion_tokens,
-        #temperature=agent_settings.default_temperature,
-    )
+    model = create_model(model_id, **(model_kwargs or {}))
 
     storage = None
     if storage_table:
         storage = _build_storage(
             table_name=storage_table,
             db_url=db_url,
-            auto_upgrade_schema=defaults.get("auto_upgrade_schema", True),
+            auto_upgrade_schema=defaults.get("auto_upgrade_schema", False),
+            backend=storage_backend,
         )
 
-    return Agent(
+    prototype = Agent(
         name=agent_name,
         agent_id=agent_id,
-        user_id=user_id,
-        session_id=session_id,
         model=model,
         tools=tools,
         storage=storage,
@@ -108,3 +191,39 @@ def create_agent(
         read_chat_history=True,
         debug_mode=debug_mode,
     )
+    return AgentBlueprint(prototype=prototype, prompt=prompt_registry.get(prompt_path))
+
+
+def create_agent(
+    name: str,
+    prompt_path: str,
+    model_id: Optional[str],
+    db_url: Optional[str] = None,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    tools: Optional[List[Any]] = None,
+    storage_table: Optional[str] = None,
+    knowledge: Optional[AgentKnowledge] = None,
+    defaults: Optional[Dict[str, Any]] = None,
+    model_kwargs: Optional[Dict[str, Any]] = None,
+    user_query: Optional[str] = None,
+    storage_backend: Optional[StorageBackend] = None,
+) -> Agent:
+    """Create a standardized Agent instance.
+
+    Minimal opinionated factory to reduce duplication across agent modules.
+    Builds a one-off blueprint; hot paths should cache one with `get_blueprint`.
+    """
+    blueprint = build_agent_blueprint(
+        name=name,
+        prompt_path=prompt_path,
+        model_id=model_id,
+        db_url=db_url,
+        tools=tools,
+        storage_table=storage_table,
+        knowledge=knowledge,
+        defaults=defaults,
+        model_kwargs=model_kwargs,
+        storage_backend=storage_backend,
+    )
+    return blueprint.build(user_id=user_id, session_id=session_id, user_query=user_query)
@@ -0,0 +1,60 @@
+"""Cooperative cancellation for blocking runs.
+
+Async runs stop when their task is cancelled: when a streaming client disconnects,
+Starlette cancels the response, the last subscriber of the run's flight cancels the run
+(utils/singleflight.py) and the CancelledError unwinds `arun`. Code running on a worker
+thread cannot be interrupted that way, so blocking workflows (see
+utils.async_bridge.iterate_in_thread) run with a `CancelToken` set in their context and
+check it between steps:
+
+    for attempt in range(num_attempts):
+        check_cancelled()  # raises RunCancelled once the client is gone
+        ...
+
+Outside such a run `current_token()` is a token that is never cancelled.
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RunCancelled(Exception):
+    """The run was cancelled, usually because its client disconnected."""
+
+
+class CancelToken:
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise RunCancelled()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`, waking early on cancellation. True if cancelled."""
+        return self._event.wait(seconds)
+
+
+_NEVER = CancelToken()
+_current: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_token() -> CancelToken:
+    return _current.get() or _NEVER
+
+
+def set_token(token: CancelToken) -> None:
+    _current.set(token)
+
+
+def check_cancelled() -> None:
+    """Raise RunCancelled if the run executing on this thread has been cancelled."""
+    current_token().raise_if_cancelled()
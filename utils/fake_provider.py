@@ -0,0 +1,269 @@
+"""Offline model provider for load tests and local development.
+
+`FakeModel` never touches the network. It answers with, in order of preference:
+
+1. a recorded transcript (`transcript=path.jsonl`): the turn whose last user message
+   and position in the tool loop match the request, else the next recorded turn;
+2. scripted `responses`, cycled in order. Each is a string or a dict with
+   `content` and/or `tool_calls` (`[{"name": ..., "arguments": {...}}]`);
+3. an echo of the last user message padded to `response_chars`.
+
+Latency is injected with `ttft` (seconds before the first chunk) and `inter_chunk`
+(seconds between chunks of `chunk_chars` characters).
+
+Models are available through the provider registry as `fake:<model id>` and
+`replay:<transcript path>`, or for every model at once by setting
+`MODEL_PROVIDER_OVERRIDE=fake` (see AgentSettings). The override also swaps the
+knowledge embedder for `FakeEmbedder`, which hashes words into a vector locally.
+
+Record transcripts from real sessions stored in Postgres with:
+
+    python -m utils.fake_provider export --table scholar_sessions --output scholar.jsonl
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from uuid import uuid4
+
+from agno.embedder.base import Embedder
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+ScriptedResponse = Union[str, Dict[str, Any]]
+
+
+def _role(message: Any) -> Optional[str]:
+    return message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+
+
+def _content(message: Any) -> str:
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    return content if isinstance(content, str) else json.dumps(content, default=str) if content else ""
+
+
+def turn_key(messages: Sequence[Any]) -> Tuple[str, int]:
+    """(last user message, number of assistant turns after it): stable across tool outputs."""
+    last_user = ""
+    assistant_turns = 0
+    for message in messages:
+        if _role(message) == "user":
+            last_user = " ".join(_content(message).split())
+            assistant_turns = 0
+        elif _role(message) == "assistant":
+            assistant_turns += 1
+    return last_user, assistant_turns
+
+
+def load_transcript(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Read a JSONL transcript of {"messages": [...], "response": {...}} turns."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@dataclass
+class FakeModel(Model):
+    id: str = "fake"
+    name: str = "Fake"
+    provider: str = "Fake"
+
+    responses: Optional[List[ScriptedResponse]] = None
+    transcript: Optional[str] = None
+    response_chars: int = 256
+    chunk_chars: int = 16
+    ttft: float = 0.0
+    inter_chunk: float = 0.0
+
+    # accepted for parity with real providers; they only affect caching
+    temperature: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._cursor = itertools.count()
+        self._lock = threading.Lock()
+        self._turns: List[Dict[str, Any]] = load_transcript(self.transcript) if self.transcript else []
+        self._by_key: Dict[Tuple[str, int], Dict[str, Any]] = {
+            turn_key(turn["messages"]): turn["response"] for turn in self._turns
+        }
+
+    # -- choosing a response ---------------------------------------------
+
+    def _next_index(self) -> int:
+        with self._lock:
+            return next(self._cursor)
+
+    def _respond(self, messages: Sequence[Union[Message, Dict[str, Any]]]) -> Dict[str, Any]:
+        if self._turns:
+            response = self._by_key.get(turn_key(messages))
+            if response is None:
+                response = self._turns[self._next_index() % len(self._turns)]["response"]
+            return response
+        if self.responses:
+            scripted = self.responses[self._next_index() % len(self.responses)]
+            return {"content": scripted} if isinstance(scripted, str) else scripted
+        last_user, _ = turn_key(messages)
+        text = f"Fake response to: {last_user} "
+        return {"content": (text * (self.response_chars // len(text) + 1))[: self.response_chars]}
+
+    def _chunks(self, response: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        content = response.get("content") or ""
+        for start in range(0, len(content), self.chunk_chars):
+            yield {"content": content[start : start + self.chunk_chars]}
+        if response.get("tool_calls"):
+            yield {"tool_calls": response["tool_calls"]}
+
+    # -- provider interface ----------------------------------------------
+
+    def invoke(self, messages: List[Message], **kwargs: Any) -> Dict[str, Any]:
+        response = self._respond(messages)
+        chunks = sum(1 for _ in self._chunks(response))
+        time.sleep(self.ttft + self.inter_chunk * max(chunks - 1, 0))
+        return response
+
+    async def ainvoke(self, messages: List[Message], **kwargs: Any) -> Dict[str, Any]:
+        response = self._respond(messages)
+        chunks = sum(1 for _ in self._chunks(response))
+        await asyncio.sleep(self.ttft + self.inter_chunk * max(chunks - 1, 0))
+        return response
+
+    def invoke_stream(self, messages: List[Message], **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        time.sleep(self.ttft)
+        for i, chunk in enumerate(self._chunks(self._respond(messages))):
+            if i and self.inter_chunk:
+                time.sleep(self.inter_chunk)
+            yield chunk
+
+    # agno declares ainvoke_stream as a coroutine but iterates it as an async generator
+    async def ainvoke_stream(  # type: ignore[override]
+        self, messages: List[Message], **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        await asyncio.sleep(self.ttft)
+        for i, chunk in enumerate(self._chunks(self._respond(messages))):
+            if i and self.inter_chunk:
+                await asyncio.sleep(self.inter_chunk)
+            yield chunk
+
+    def _tool_calls(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        tool_calls = []
+        for call in response.get("tool_calls") or []:
+            arguments = call.get("arguments") or {}
+            tool_calls.append(
+                {
+                    "id": call.get("id") or f"call_{uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": arguments if isinstance(arguments, str) else json.dumps(arguments),
+                    },
+                }
+            )
+        return tool_calls
+
+    def parse_provider_response(self, response: Dict[str, Any], **kwargs: Any) -> ModelResponse:
+        model_response = ModelResponse(role="assistant", content=response.get("content"))
+        model_response.tool_calls = self._tool_calls(response)
+        return model_response
+
+    def parse_provider_response_delta(self, response: Dict[str, Any]) -> ModelResponse:
+        model_response = ModelResponse(role="assistant", content=response.get("content"))
+        if response.get("tool_calls"):
+            model_response.tool_calls = self._tool_calls(response)
+        return model_response
+
+
+@dataclass
+class FakeEmbedder(Embedder):
+    """Offline embedder: words are hashed into a normalized bag-of-words vector.
+
+    Identical texts get identical vectors and texts sharing words score as similar,
+    which is enough for hybrid knowledge search in load tests.
+    """
+
+    id: str = "fake-embedding"
+
+    def get_embedding(self, text: str) -> List[float]:
+        dimensions = self.dimensions or 1536
+        vector = [0.0] * dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+# -- recording -------------------------------------------------------------
+
+
+def _tool_call_entry(call: Dict[str, Any]) -> Dict[str, Any]:
+    function = call.get("function") or {}
+    arguments = function.get("arguments") or "{}"
+    try:
+        arguments = json.loads(arguments)
+    except (TypeError, ValueError):
+        pass
+    return {"id": call.get("id"), "name": function.get("name"), "arguments": arguments}
+
+
+def transcript_from_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split one run's message list into replayable (request, response) turns."""
+    turns = []
+    for i, message in enumerate(messages):
+        if message.get("role") != "assistant":
+            continue
+        response: Dict[str, Any] = {"content": message.get("content")}
+        if message.get("tool_calls"):
+            response["tool_calls"] = [_tool_call_entry(call) for call in message["tool_calls"]]
+        request = [{"role": m.get("role"), "content": m.get("content")} for m in messages[:i]]
+        turns.append({"messages": request, "response": response})
+    return turns
+
+
+def export_transcript(table_name: str, output: Path, mode: str = "agent", session_id: Optional[str] = None) -> int:
+    """Write the model turns of stored sessions to `output`. Returns the number of turns."""
+    from db.storage import get_storage
+
+    storage = get_storage(table_name=table_name, mode=mode)  # type: ignore[arg-type]
+    sessions = [storage.read(session_id)] if session_id else storage.get_all_sessions()
+    count = 0
+    with open(output, "w", encoding="utf-8") as f:
+        for session in sessions:
+            runs = ((session.memory or {}).get("runs") or []) if session else []
+            for run in runs:
+                messages = (run.get("response") or {}).get("messages") or run.get("messages") or []
+                for turn in transcript_from_messages(messages):
+                    f.write(json.dumps(turn, default=str) + "\n")
+                    count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record model turns from stored sessions for replay.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export")
+    export.add_argument("--table", required=True)
+    export.add_argument("--mode", default="agent", choices=["agent", "team", "workflow"])
+    export.add_argument("--session-id")
+    export.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    count = export_transcript(args.table, args.output, args.mode, args.session_id)
+    print(f"Wrote {count} turns to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
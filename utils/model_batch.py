@@ -0,0 +1,357 @@
+"""Batch inference for offline workflow runs.
+
+Models wrapped with `enable_batching` do not call the interactive endpoint: each
+`invoke*` call is turned into a Gemini `InlinedRequest` and queued on a
+`BatchCollector`. The collector groups queued calls per model id and submits them
+as one batch job when
+
+- every registered run is blocked on a model call (nothing else can arrive),
+- `batch_max_size` calls are queued, or
+- the oldest queued call has waited `batch_max_wait_seconds`,
+
+then polls the job and resumes each caller with its own response. Since a workflow
+is a chain of model calls, N runs started together proceed in lock-step: one batch
+per step instead of N sequential calls.
+
+Backends:
+
+- `GeminiBatchBackend` submits through `client.batches` (google-genai);
+- `LocalBatchBackend` is a file-based stand-in with the same request/response
+  JSONL layout as Gemini batch files. It answers with a responder (by default the
+  offline `FakeModel`) or waits for another process to write the responses file.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from agno.exceptions import ModelProviderError
+from google.genai import types
+
+from agents.settings import agent_settings
+from utils.log import logger
+
+BatchResult = Union[types.GenerateContentResponse, Exception]
+Responder = Callable[[str, Dict[str, Any]], Dict[str, Any]]
+
+_RUNNING_STATES = {
+    types.JobState.JOB_STATE_UNSPECIFIED,
+    types.JobState.JOB_STATE_QUEUED,
+    types.JobState.JOB_STATE_PENDING,
+    types.JobState.JOB_STATE_RUNNING,
+    types.JobState.JOB_STATE_UPDATING,
+    types.JobState.JOB_STATE_CANCELLING,
+    types.JobState.JOB_STATE_PAUSED,
+}
+
+
+class BatchBackend:
+    """Submits a list of requests for one model and reports their results when done."""
+
+    def submit(self, model_id: str, requests: List[types.InlinedRequest]) -> str:
+        raise NotImplementedError
+
+    def poll(self, job_name: str) -> Optional[List[BatchResult]]:
+        """None while the job runs, else one response or error per request, in order."""
+        raise NotImplementedError
+
+
+class GeminiBatchBackend(BatchBackend):
+    def __init__(self, client: Any):
+        self.client = client
+
+    def submit(self, model_id: str, requests: List[types.InlinedRequest]) -> str:
+        job = self.client.batches.create(
+            model=model_id, src=requests, config={"display_name": f"agent-app-{uuid.uuid4().hex[:8]}"}
+        )
+        return job.name
+
+    def poll(self, job_name: str) -> Optional[List[BatchResult]]:
+        job = self.client.batches.get(name=job_name)
+        if job.state in _RUNNING_STATES:
+            return None
+        responses = (job.dest.inlined_responses if job.dest else None) or []
+        if not responses:
+            raise RuntimeError(f"Batch job {job_name} ended in {job.state} without responses: {job.error}")
+        return [item.response if item.response is not None else RuntimeError(str(item.error)) for item in responses]
+
+
+def _gemini_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a FakeModel response ({"content", "tool_calls"}) to a GenerateContentResponse dict."""
+    parts: List[Dict[str, Any]] = []
+    if response.get("content"):
+        parts.append({"text": response["content"]})
+    for call in response.get("tool_calls") or []:
+        arguments = call.get("arguments") or {}
+        args = json.loads(arguments) if isinstance(arguments, str) else arguments
+        parts.append({"function_call": {"name": call["name"], "args": args}})
+    return {"candidates": [{"content": {"role": "model", "parts": parts}, "finish_reason": "STOP"}]}
+
+
+def fake_responder(model: Optional[Any] = None) -> Responder:
+    """Answer batch requests with a `FakeModel` (scripted, replayed or echoed)."""
+    from utils.fake_provider import FakeModel
+
+    fake = model or FakeModel()
+
+    def respond(model_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        messages: List[Dict[str, Any]] = [
+            {
+                "role": "assistant" if content.get("role") == "model" else content.get("role"),
+                "content": " ".join(part["text"] for part in content.get("parts") or [] if part.get("text")),
+            }
+            for content in request.get("contents") or []
+        ]
+        return _gemini_response(fake._respond(messages))
+
+    return respond
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for the Gemini Batch API.
+
+    `submit` writes `<job>.requests.jsonl` (`{"key", "model", "request"}` lines). Once
+    `latency_seconds` have passed, `poll` runs the responder over it and writes
+    `<job>.responses.jsonl` (`{"key", "response"}` or `{"key", "error"}` lines). With
+    `responder=None` the responses file is expected from another process.
+    """
+
+    def __init__(
+        self, directory: Union[str, Path], responder: Optional[Responder] = None, latency_seconds: float = 0.0
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.responder = responder
+        self.latency_seconds = latency_seconds
+
+    def _path(self, job_name: str, kind: str) -> Path:
+        return self.directory / f"{job_name.rsplit('/', 1)[-1]}.{kind}.jsonl"
+
+    def submit(self, model_id: str, requests: List[types.InlinedRequest]) -> str:
+        job_name = f"batches/local-{uuid.uuid4().hex}"
+        with open(self._path(job_name, "requests"), "w", encoding="utf-8") as f:
+            for i, request in enumerate(requests):
+                line = {"key": str(i), "model": model_id, "request": request.model_dump(mode="json", exclude_none=True)}
+                f.write(json.dumps(line) + "\n")
+        return job_name
+
+    def _respond(self, job_name: str) -> None:
+        requests_path = self._path(job_name, "requests")
+        if self.responder is None or time.time() - requests_path.stat().st_mtime < self.latency_seconds:
+            return
+        tmp = self._path(job_name, "responses.tmp")
+        with open(requests_path, encoding="utf-8") as src, open(tmp, "w", encoding="utf-8") as dst:
+            for line in src:
+                item = json.loads(line)
+                try:
+                    result = {"key": item["key"], "response": self.responder(item["model"], item["request"])}
+                except Exception as e:
+                    result = {"key": item["key"], "error": {"message": str(e)}}
+                dst.write(json.dumps(result) + "\n")
+        tmp.replace(self._path(job_name, "responses"))
+
+    def poll(self, job_name: str) -> Optional[List[BatchResult]]:
+        responses_path = self._path(job_name, "responses")
+        if not responses_path.exists():
+            self._respond(job_name)
+            if not responses_path.exists():
+                return None
+        with open(responses_path, encoding="utf-8") as f:
+            items = sorted((json.loads(line) for line in f if line.strip()), key=lambda item: int(item["key"]))
+        return [
+            types.GenerateContentResponse.model_validate(item["response"])
+            if "response" in item
+            else RuntimeError(item.get("error", {}).get("message", "batch request failed"))
+            for item in items
+        ]
+
+
+class BatchCollector:
+    """Groups model calls from concurrent runs into batch jobs and hands back the results."""
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        max_batch_size: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None,
+        poll_interval_seconds: Optional[float] = None,
+    ):
+        self.backend = backend
+        self.max_batch_size = max_batch_size or agent_settings.batch_max_size
+        self.max_wait_seconds = agent_settings.batch_max_wait_seconds if max_wait_seconds is None else max_wait_seconds
+        self.poll_interval_seconds = (
+            agent_settings.batch_poll_interval_seconds if poll_interval_seconds is None else poll_interval_seconds
+        )
+
+        self._pending: Dict[str, List[Tuple[types.InlinedRequest, Future]]] = {}
+        self._oldest: Dict[str, float] = {}
+        self._jobs: Dict[str, Tuple[List[Future], float]] = {}
+        self._runs = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.jobs_submitted = 0
+        self.requests_submitted = 0
+
+    # -- callers ---------------------------------------------------------
+
+    def start_runs(self, count: int = 1) -> None:
+        """Register runs whose model calls go through this collector.
+
+        Once every registered run is waiting on a model call, queued calls are
+        submitted without waiting for `max_wait_seconds`.
+        """
+        with self._cond:
+            self._runs += count
+
+    def finish_runs(self, count: int = 1) -> None:
+        with self._cond:
+            self._runs -= count
+            self._cond.notify()
+
+    def submit(self, model_id: str, request: types.InlinedRequest) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._pending.setdefault(model_id, []).append((request, future))
+            self._oldest.setdefault(model_id, time.monotonic())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="model-batch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    # -- background loop -------------------------------------------------
+
+    def _waiting(self) -> int:
+        return sum(len(items) for items in self._pending.values()) + sum(len(f) for f, _ in self._jobs.values())
+
+    def _due(self, now: float) -> List[str]:
+        all_waiting = self._runs > 0 and self._waiting() >= self._runs
+        return [
+            model_id
+            for model_id, items in self._pending.items()
+            if all_waiting or len(items) >= self.max_batch_size or now - self._oldest[model_id] >= self.max_wait_seconds
+        ]
+
+    def _take(self, model_id: str) -> List[Tuple[types.InlinedRequest, Future]]:
+        items = self._pending[model_id]
+        batch, rest = items[: self.max_batch_size], items[self.max_batch_size :]
+        if rest:
+            self._pending[model_id] = rest
+            self._oldest[model_id] = time.monotonic()
+        else:
+            del self._pending[model_id], self._oldest[model_id]
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    batches = [(model_id, self._take(model_id)) for model_id in self._due(now)]
+                    polls = [job for job, (_, poll_at) in self._jobs.items() if poll_at <= now]
+                    if batches or polls:
+                        break
+                    if not self._pending and not self._jobs:
+                        self._thread = None
+                        return
+                    deadlines = [oldest + self.max_wait_seconds for oldest in self._oldest.values()]
+                    deadlines += [poll_at for _, poll_at in self._jobs.values()]
+                    self._cond.wait(max(min(deadlines) - now, 0.001))
+
+            for model_id, batch in batches:
+                self._submit(model_id, batch)
+            for job in polls:
+                self._poll(job)
+
+    def _submit(self, model_id: str, batch: List[Tuple[types.InlinedRequest, Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            job = self.backend.submit(model_id, [request for request, _ in batch])
+        except Exception as e:
+            logger.error(f"Batch submission for {model_id} failed: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+        logger.info(f"Submitted batch {job}: {len(batch)} {model_id} requests")
+        with self._cond:
+            self._jobs[job] = (futures, time.monotonic() + self.poll_interval_seconds)
+            self.jobs_submitted += 1
+            self.requests_submitted += len(batch)
+
+    def _poll(self, job: str) -> None:
+        futures, _ = self._jobs[job]
+        try:
+            results = self.backend.poll(job)
+            if results is not None and len(results) != len(futures):
+                raise RuntimeError(f"Batch job {job} returned {len(results)} results for {len(futures)} requests")
+        except Exception as e:
+            logger.error(f"Batch job {job} failed: {e}")
+            results = [e] * len(futures)
+        with self._cond:
+            if results is None:
+                self._jobs[job] = (futures, time.monotonic() + self.poll_interval_seconds)
+                return
+            del self._jobs[job]
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class BatchedModelMixin:
+    """Send `invoke*` calls of a Gemini model to `self.batch_collector` instead of the API."""
+
+    batch_collector: Optional[BatchCollector] = None
+
+    def _batch_request(self, kwargs: Dict[str, Any]) -> types.InlinedRequest:
+        contents, system_message = self._format_messages(kwargs["messages"])  # type: ignore[attr-defined]
+        request_kwargs = self._get_request_kwargs(  # type: ignore[attr-defined]
+            system_message, response_format=kwargs.get("response_format"), tools=kwargs.get("tools")
+        )
+        return types.InlinedRequest(contents=contents, config=request_kwargs.get("config"))
+
+    def _batch_error(self, error: Exception) -> ModelProviderError:
+        if isinstance(error, ModelProviderError):
+            return error
+        return ModelProviderError(message=str(error), model_name=self.name, model_id=self.id)  # type: ignore[attr-defined]
+
+    def invoke(self, **kwargs: Any) -> Any:
+        future = self.batch_collector.submit(self.id, self._batch_request(kwargs))  # type: ignore[union-attr,attr-defined]
+        try:
+            return future.result()
+        except Exception as e:
+            raise self._batch_error(e) from e
+
+    async def ainvoke(self, **kwargs: Any) -> Any:
+        future = self.batch_collector.submit(self.id, self._batch_request(kwargs))  # type: ignore[union-attr,attr-defined]
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            raise self._batch_error(e) from e
+
+    # batch jobs return whole responses: a "stream" is a single chunk
+    def invoke_stream(self, **kwargs: Any) -> Iterator[Any]:
+        yield self.invoke(**kwargs)
+
+    async def ainvoke_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        yield await self.ainvoke(**kwargs)
+
+
+def enable_batching(model: Any, collector: BatchCollector) -> Any:
+    """Return a copy of a Gemini `model` whose calls are submitted through `collector`."""
+    from agno.models.google import Gemini
+
+    from utils.model_factory import wrap_model
+
+    if not isinstance(model, Gemini):
+        raise ValueError(f"Batch inference requires a Gemini model, got {type(model).__name__}")
+    model = wrap_model(model, BatchedModelMixin)
+    model.batch_collector = collector
+    return model
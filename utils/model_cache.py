@@ -0,0 +1,298 @@
+"""Exact-match response cache for deterministic model calls.
+
+Models built by `create_model` with `temperature=0` are wrapped so that `invoke`,
+`ainvoke`, `invoke_stream` and `ainvoke_stream` first look up a canonical hash of
+(model class, model config, messages, tools, response format). Hits are served from an
+in-process LRU, then from a Postgres table with a TTL. Streaming hits replay the
+recorded provider chunks, so agno parses them exactly like a live stream and
+`chat_response_streamer` needs no changes.
+
+Only completed calls are stored: an error or an abandoned stream records nothing.
+The async calls reach the Postgres tier on a worker thread, never on the event loop.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from agno.utils.log import logger
+from pydantic import BaseModel
+
+from agents.settings import agent_settings
+
+# Message fields that determine what the provider sees
+_MESSAGE_FIELDS = {"role", "content", "name", "tool_call_id", "tool_calls", "audio", "images", "videos", "files"}
+# Model fields that carry credentials, clients or per-run state rather than generation config
+_SKIP_MODEL_FIELDS = {"api_key", "client", "async_client", "http_client", "client_params"}
+
+
+def _model_config(model: Any) -> Dict[str, Any]:
+    if not dataclasses.is_dataclass(model):
+        return {"id": getattr(model, "id", None)}
+    return {
+        f.name: getattr(model, f.name, None)
+        for f in dataclasses.fields(model)
+        if not f.name.startswith("_") and f.name not in _SKIP_MODEL_FIELDS
+    }
+
+
+def _schema_of(response_format: Any) -> Any:
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        return response_format.model_json_schema()
+    return response_format
+
+
+def cache_key(
+    model: Any,
+    messages: List[Any],
+    response_format: Any = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Any = None,
+    stream: bool = False,
+) -> str:
+    """Canonical sha256 of everything that determines a deterministic model response."""
+    payload = {
+        "model": f"{type(model).__module__}.{type(model).__qualname__}",
+        "config": _model_config(model),
+        "messages": [
+            m.model_dump(include=_MESSAGE_FIELDS, exclude_none=True) if isinstance(m, BaseModel) else m
+            for m in messages
+        ],
+        "response_format": _schema_of(response_format),
+        "tools": tools,
+        "tool_choice": tool_choice,
+        "stream": stream,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    """Bounded LRU of cached responses with a per-entry expiry."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 3600):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class PostgresTier:
+    """Shared cache tier in Postgres. Values are pickled provider responses.
+
+    The table is created by `python -m db.bootstrap`; any database error is logged and
+    treated as a miss so the cache can never fail a model call.
+    """
+
+    def __init__(self, table_name: str, ttl_seconds: float = 86400, url: Optional[str] = None):
+        from sqlalchemy import Column, DateTime, LargeBinary, MetaData, String, Table
+
+        self.ttl_seconds = ttl_seconds
+        self.url = url
+        self.table = Table(
+            table_name,
+            MetaData(schema="ai"),
+            Column("key", String(64), primary_key=True),
+            Column("model_id", String),
+            Column("value", LargeBinary, nullable=False),
+            Column("expires_at", DateTime(timezone=True), nullable=False, index=True),
+        )
+
+    @property
+    def engine(self):
+        from db.storage import get_engine
+
+        return get_engine(self.url)
+
+    def create(self, engine=None) -> None:
+        from sqlalchemy import schema
+
+        with (engine or self.engine).begin() as conn:
+            conn.execute(schema.CreateSchema("ai", if_not_exists=True))
+            self.table.create(conn, checkfirst=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        from sqlalchemy import func, select
+
+        stmt = select(self.table.c.value).where(self.table.c.key == key, self.table.c.expires_at > func.now())
+        try:
+            with self.engine.connect() as conn:
+                blob = conn.execute(stmt).scalar()
+            return pickle.loads(blob) if blob is not None else None
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: Any, model_id: Optional[str] = None) -> None:
+        from datetime import datetime, timedelta, timezone
+
+        from sqlalchemy.dialects.postgresql import insert
+
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        try:
+            row = {"key": key, "model_id": model_id, "value": pickle.dumps(value), "expires_at": expires_at}
+            stmt = insert(self.table).values(**row)
+            stmt = stmt.on_conflict_do_update(index_elements=["key"], set_={k: stmt.excluded[k] for k in row})
+            with self.engine.begin() as conn:
+                conn.execute(stmt)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def purge_expired(self) -> int:
+        from sqlalchemy import delete, func
+
+        with self.engine.begin() as conn:
+            return conn.execute(delete(self.table).where(self.table.c.expires_at <= func.now())).rowcount
+
+
+class ResponseCache:
+    def __init__(self, memory: MemoryTier, postgres: Optional[PostgresTier] = None):
+        self.memory = memory
+        self.postgres = postgres
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, value: Optional[Any]) -> Optional[Any]:
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _get_shared(self, key: str) -> Optional[Any]:
+        value = self.postgres.get(key) if self.postgres is not None else None
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self._get_shared(key)
+        return self._count(value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.postgres is not None:
+            value = await asyncio.to_thread(self._get_shared, key)
+        return self._count(value)
+
+    def set(self, key: str, value: Any, model_id: Optional[str] = None) -> None:
+        self.memory.set(key, value)
+        if self.postgres is not None:
+            self.postgres.set(key, value, model_id)
+
+    async def aset(self, key: str, value: Any, model_id: Optional[str] = None) -> None:
+        self.memory.set(key, value)
+        if self.postgres is not None:
+            await asyncio.to_thread(self.postgres.set, key, value, model_id)
+
+
+response_cache = ResponseCache(
+    MemoryTier(agent_settings.response_cache_size, agent_settings.response_cache_ttl_seconds),
+    PostgresTier(agent_settings.response_cache_table, agent_settings.response_cache_ttl_seconds)
+    if agent_settings.response_cache_table
+    else None,
+)
+
+
+class CachedModelMixin:
+    """Serve `invoke*` calls from `self.response_cache` when the exact request was seen before."""
+
+    response_cache: ResponseCache = response_cache
+
+    def _cache_key(self, kwargs: Dict[str, Any], stream: bool) -> str:
+        return cache_key(
+            self,
+            kwargs.get("messages") or [],
+            kwargs.get("response_format"),
+            kwargs.get("tools"),
+            kwargs.get("tool_choice"),
+            stream=stream,
+        )
+
+    def invoke(self, **kwargs: Any) -> Any:
+        key = self._cache_key(kwargs, stream=False)
+        response = self.response_cache.get(key)
+        if response is None:
+            response = super().invoke(**kwargs)  # type: ignore[misc]
+            self.response_cache.set(key, response, getattr(self, "id", None))
+        return response
+
+    async def ainvoke(self, **kwargs: Any) -> Any:
+        key = self._cache_key(kwargs, stream=False)
+        response = await self.response_cache.aget(key)
+        if response is None:
+            response = await super().ainvoke(**kwargs)  # type: ignore[misc]
+            await self.response_cache.aset(key, response, getattr(self, "id", None))
+        return response
+
+    def invoke_stream(self, **kwargs: Any) -> Iterator[Any]:
+        key = self._cache_key(kwargs, stream=True)
+        chunks = self.response_cache.get(key)
+        if chunks is not None:
+            yield from chunks
+            return
+        recorded = []
+        for chunk in super().invoke_stream(**kwargs):  # type: ignore[misc]
+            recorded.append(chunk)
+            yield chunk
+        self.response_cache.set(key, recorded, getattr(self, "id", None))
+
+    async def ainvoke_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        key = self._cache_key(kwargs, stream=True)
+        chunks = await self.response_cache.aget(key)
+        if chunks is not None:
+            for chunk in chunks:
+                yield chunk
+            return
+        recorded = []
+        async for chunk in super().ainvoke_stream(**kwargs):  # type: ignore[misc]
+            recorded.append(chunk)
+            yield chunk
+        await self.response_cache.aset(key, recorded, getattr(self, "id", None))
+
+
+def is_deterministic(model: Any) -> bool:
+    return getattr(model, "temperature", None) == 0
+
+
+def enable_response_cache(model: Any, cache: Optional[ResponseCache] = None) -> Any:
+    """Return a copy of `model` whose calls go through the response cache."""
+    from utils.model_factory import wrap_model
+
+    model = wrap_model(model, CachedModelMixin)
+    if cache is not None:
+        model.response_cache = cache
+    return model
@@ -1,5 +1,8 @@
-from typing import Any, Dict, Optional, Tuple, Callable
-
+import json
+import threading
+from functools import lru_cache
+from os import getenv
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 def _parse_model_string(model_str: Optional[str], default: str) -> Tuple[str, str]:
@@ -31,19 +34,154 @@ def register_provider(name: str):
     return _decorator
 
 
+@lru_cache(maxsize=None)
+def resolve_class(*paths: str) -> Tuple[Optional[type], Tuple[str, ...]]:
+    """Import the first of `paths` ("module.Class") that resolves.
+
+    Returns (class or None, failed attempts). Memoized, failures included, so a
+    missing optional SDK costs its import attempts once per process rather than
+    once per model.
+    """
+    import importlib
+
+    tried: List[str] = []
+    for path in paths:
+        modname, clsname = path.rsplit(".", 1)
+        try:
+            return getattr(importlib.import_module(modname), clsname), tuple(tried)
+        except Exception as exc:
+            tried.append(f"{path}: {type(exc).__name__}")
+    return None, tuple(tried)
+
+
 def create_model(model_str: Optional[str], **kwargs) -> Any:
     """Create a provider-specific model object using the provider registry.
 
     To add support for a new provider, register a factory function with
     `register_provider("myprovider")` that accepts (model_id, kwargs) and
     returns a provider-specific model object.
+
+    Every model goes through the per-model concurrency limiter; deterministic
+    models (`temperature=0`) are also served from the exact-match response cache
+    unless `response_cache=False` is passed. `fallback_models` opts the model into
+    hedging and failover to those tiers, in order (default: AgentSettings.model_fallbacks
+    for the model id, empty unless configured).
     """
+    from agents.settings import agent_settings
+    from utils.model_cache import enable_response_cache, is_deterministic
+    from utils.model_limiter import enable_limiter
+    from utils.model_router import enable_routing
+
     default_model = "gemini:gemini-2.5-flash"
     provider, mid = _parse_model_string(model_str, default_model)
+    if agent_settings.model_provider_override and provider not in ("fake", "replay"):
+        provider = agent_settings.model_provider_override.lower()
     factory = _PROVIDERS.get(provider)
     if not factory:
         raise NotImplementedError(f"Model provider not supported: {provider}")
-    return factory(mid, kwargs)
+    use_cache = kwargs.pop("response_cache", None)
+    fallbacks = kwargs.pop("fallback_models", None)
+    model = factory(mid, kwargs)
+
+    # Wrapping order, outermost first: router -> cache -> limiter -> provider.
+    # Cache hits never wait for a slot, and each tier keeps its own cache and limiter.
+    if agent_settings.model_limiter_enabled:
+        model = enable_limiter(model)
+    if use_cache is None:
+        use_cache = agent_settings.response_cache_enabled and is_deterministic(model)
+    if use_cache:
+        model = enable_response_cache(model)
+
+    if fallbacks is None:
+        fallbacks = agent_settings.model_fallbacks.get(mid, [])
+    if fallbacks and agent_settings.model_routing_enabled:
+        tiers = [
+            create_model(
+                fallback if ":" in fallback else f"{provider}:{fallback}",
+                response_cache=use_cache,
+                fallback_models=[],
+                **kwargs,
+            )
+            for fallback in fallbacks
+        ]
+        model = enable_routing(model, tiers)
+    return model
+
+
+# (mixin, provider class) -> the class inheriting both, built once per pair
+_wrapped_classes: Dict[Tuple[type, type], type] = {}
+
+
+def _wrapped_class(mixin: type, cls: type) -> type:
+    wrapped = _wrapped_classes.get((mixin, cls))
+    if wrapped is None:
+        wrapped = type(cls.__name__, (mixin, cls), {"__module__": cls.__module__})
+        wrapped = _wrapped_classes.setdefault((mixin, cls), wrapped)
+    return wrapped
+
+
+def wrap_model(model: Any, mixin: type) -> Any:
+    """Return a copy of `model` whose class also inherits `mixin`.
+
+    The mixin comes first in the MRO so it can intercept `invoke*` and delegate to the
+    provider with `super()`. Wrapping twice with the same mixin is a no-op.
+    """
+    if isinstance(model, mixin):
+        return model
+    wrapped: Any = object.__new__(_wrapped_class(mixin, type(model)))
+    wrapped.__dict__.update(model.__dict__)
+    return wrapped
+
+
+# Client pool: SDK clients (and the HTTP connection pools they own) shared by every
+# model object built for the same provider, credentials and transport options.
+_clients: Dict[Tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_key(provider: str, params: Dict[str, Any]) -> Tuple[str, str]:
+    return provider, json.dumps(params, sort_keys=True, default=repr)
+
+
+def get_client(provider: str, params: Dict[str, Any], builder: Callable[..., Any]) -> Any:
+    """Return the pooled client for `provider` and `params`, building it with
+    `builder(**params)` on first use."""
+    key = _client_key(provider, params)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = builder(**params)
+                _clients[key] = client
+    return client
+
+
+def clear_clients() -> None:
+    with _clients_lock:
+        _clients.clear()
+
+
+def _gemini_client_params(opts: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve `google.genai.Client` arguments the same way agno's Gemini wrapper does."""
+    params: Dict[str, Any] = {}
+    vertexai = opts.get("vertexai") or getenv("GOOGLE_GENAI_USE_VERTEXAI", "false").lower() == "true"
+    if vertexai:
+        params["vertexai"] = True
+        params["project"] = opts.get("project_id") or getenv("GOOGLE_CLOUD_PROJECT")
+        params["location"] = opts.get("location") or getenv("GOOGLE_CLOUD_LOCATION")
+    else:
+        params["api_key"] = opts.get("api_key") or getenv("GOOGLE_API_KEY")
+    # transport options, e.g. {"base_url": ..., "timeout": ...}
+    params["http_options"] = opts.get("http_options")
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def gemini_client(**opts: Any):
+    """The pooled `google.genai.Client` for these options (api_key, vertexai, http_options...)."""
+    from google import genai
+
+    return get_client("gemini", _gemini_client_params(opts), genai.Client)
 
 
 # Built-in providers
@@ -53,7 +191,12 @@ def _gemini_factory(mid: str, opts: Dict[str, Any]):
         from agno.models.google import Gemini
 
         allowed = {k: v for k, v in opts.items() if k in ("max_output_tokens", "temperature")}
-        return Gemini(id=mid, **allowed)
+        try:
+            client = gemini_client(**opts)
+        except ValueError:
+            # missing credentials: let the wrapper resolve (and report) them lazily
+            client = None
+        return Gemini(id=mid, client=client, **allowed)
     except Exception as exc:
         raise RuntimeError("Gemini model builder error: " + str(exc))
 
@@ -66,25 +209,43 @@ def _openai_factory(mid: str, opts: Dict[str, Any]):
     present so the user knows to install the appropriate `agno` extras or
     add an adapter.
     """
-    tried = []
-    candidates = [
+    cls, tried = resolve_class(
         "agno.models.openai.OpenAI",
         "agno.models.openai.OpenAIModel",
         "agno.models.openai_api.OpenAI",
         "agno.models.openai_api.OpenAIModel",
-    ]
-    for path in candidates:
-        modname, clsname = path.rsplit(".", 1)
-        try:
-            mod = __import__(modname, fromlist=[clsname])
-            cls = getattr(mod, clsname)
-            # pass only known kwargs; let the wrapper handle extras
-            return cls(id=mid, **opts)
-        except Exception as exc:
-            tried.append(f"{path}: {type(exc).__name__}")
-
-    raise NotImplementedError(
-        "OpenAI provider via agno not available. Tried: " + ", ".join(tried)
-        + ".\nIf you want OpenAI support, install the agno OpenAI adapter or provide a custom provider using register_provider('openai')."
     )
-
+    if cls is None:
+        raise NotImplementedError(
+            f"OpenAI provider via agno not available. Tried: {', '.join(tried)}.\n"
+            "If you want OpenAI support, install the agno OpenAI adapter "
+            "or provide a custom provider using register_provider('openai')."
+        )
+    # pass only known kwargs; let the wrapper handle extras
+    return cls(id=mid, **opts)
+
+
+@register_provider("fake")
+def _fake_factory(mid: str, opts: Dict[str, Any]):
+    """Offline provider with scripted responses and injected latency."""
+    from dataclasses import fields
+
+    from agents.settings import agent_settings
+    from utils.fake_provider import FakeModel
+
+    params: Dict[str, Any] = {
+        "ttft": agent_settings.fake_model_ttft_seconds,
+        "inter_chunk": agent_settings.fake_model_inter_chunk_seconds,
+        "transcript": agent_settings.fake_model_transcript,
+    }
+    known = {f.name for f in fields(FakeModel)}
+    params.update({k: v for k, v in opts.items() if k in known})
+    return FakeModel(id=mid, **params)
+
+
+@register_provider("replay")
+def _replay_factory(mid: str, opts: Dict[str, Any]):
+    """`replay:<transcript.jsonl>` replays turns recorded from real sessions."""
+    from pathlib import Path
+
+    return _fake_factory(Path(mid).stem, {**opts, "transcript": mid})
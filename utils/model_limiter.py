@@ -0,0 +1,334 @@
+"""Adaptive per-model concurrency limiter.
+
+Every model built by `create_model` acquires a slot from the limiter of its model id
+before calling the provider and holds it until the call (or stream) finishes:
+
+- the concurrency window grows additively on success and is cut multiplicatively
+  when the provider answers 429 / RESOURCE_EXHAUSTED (AIMD). Like TCP, it is cut
+  once per congestion epoch: throttles from calls admitted before the last cut
+  are not counted again;
+- an optional tokens-per-minute budget holds requests until the estimated prompt
+  tokens fit in the last minute's usage;
+- waiters are served strictly in arrival order, from threads and event loops alike;
+- throttled calls are retried with exponential backoff, re-entering the queue.
+
+`limiter_metrics()` reports the window, queue depth and wait times of every model.
+"""
+
+import asyncio
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from agents.settings import agent_settings
+from utils.token_budget import count_messages
+
+_THROTTLE_MARKERS = ("RESOURCE_EXHAUSTED", "Too Many Requests", "rate limit")
+
+
+def is_throttled(error: BaseException) -> bool:
+    """True for provider errors that mean "slow down" (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    message = str(error)
+    return any(marker.lower() in message.lower() for marker in _THROTTLE_MARKERS)
+
+
+class _Waiter:
+    __slots__ = ("tokens", "enqueued_at", "granted", "epoch", "_event", "_loop", "_future")
+
+    def __init__(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.epoch = 0
+        self._loop = loop
+        self._future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self._event: Optional[threading.Event] = None if loop else threading.Event()
+
+    def wake(self) -> None:
+        if self._loop is not None and self._future is not None:
+            self._loop.call_soon_threadsafe(_resolve, self._future)
+        elif self._event is not None:
+            self._event.set()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelLimiter:
+    def __init__(
+        self,
+        model_id: str,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        tokens_per_minute: Optional[int] = None,
+        decrease_factor: float = 0.5,
+    ):
+        self.model_id = model_id
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.decrease_factor = decrease_factor
+
+        self.window = float(max_concurrency)
+        self.min_window = self.window
+        self.in_flight = 0
+        self._queue: Deque[_Waiter] = deque()
+        self._usage: Deque[Tuple[float, int]] = deque()
+        self._usage_total = 0
+        self._epoch = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+        self.max_queue_depth = 0
+        self.throttled = 0
+        self.completed = 0
+        self._waits: Deque[float] = deque(maxlen=1024)
+
+    # -- admission -------------------------------------------------------
+
+    def _expire_usage(self, now: float) -> None:
+        while self._usage and self._usage[0][0] <= now - 60:
+            self._usage_total -= self._usage.popleft()[1]
+
+    def _fits(self, tokens: int, now: float) -> bool:
+        if self.in_flight >= max(int(self.window), self.min_concurrency):
+            return False
+        if self.tokens_per_minute:
+            self._expire_usage(now)
+            if self._usage_total + tokens > self.tokens_per_minute:
+                return False
+        return True
+
+    def _admit(self, tokens: int, now: float) -> int:
+        self.in_flight += 1
+        if self.tokens_per_minute and tokens:
+            self._usage.append((now, tokens))
+            self._usage_total += tokens
+        return self._epoch
+
+    def _dispatch(self) -> None:
+        """Grant slots to the head of the queue while they fit. Caller holds the lock."""
+        now = time.monotonic()
+        while self._queue and self._fits(self._queue[0].tokens, now):
+            waiter = self._queue.popleft()
+            waiter.epoch = self._admit(waiter.tokens, now)
+            waiter.granted = True
+            self._waits.append(now - waiter.enqueued_at)
+            waiter.wake()
+        # blocked on the token budget rather than on concurrency: re-check when usage expires
+        if self._queue and self._usage and self._timer is None and self.in_flight < int(self.window):
+            delay = max(self._usage[0][0] + 60 - now, 0.01)
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _enqueue(self, tokens: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> _Waiter:
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        waiter = _Waiter(tokens, loop)
+        with self._lock:
+            now = time.monotonic()
+            if not self._queue and self._fits(tokens, now):
+                waiter.epoch = self._admit(tokens, now)
+                waiter.granted = True
+                self._waits.append(0.0)
+            else:
+                self._queue.append(waiter)
+                self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                self.in_flight -= 1
+            else:
+                self._queue.remove(waiter)
+            self._dispatch()
+
+    def acquire(self, tokens: int = 0) -> int:
+        """Block until a slot is granted. Returns the congestion epoch to pass to `release`."""
+        waiter = self._enqueue(tokens)
+        if not waiter.granted:
+            waiter._event.wait()  # type: ignore[union-attr]
+        return waiter.epoch
+
+    async def aacquire(self, tokens: int = 0) -> int:
+        waiter = self._enqueue(tokens, asyncio.get_running_loop())
+        if not waiter.granted:
+            try:
+                await waiter._future  # type: ignore[misc]
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+        return waiter.epoch
+
+    def release(self, throttled: bool = False, epoch: Optional[int] = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if epoch is None or epoch == self._epoch:
+                    self.window = max(float(self.min_concurrency), self.window * self.decrease_factor)
+                    self.min_window = min(self.min_window, self.window)
+                    self._epoch += 1
+            else:
+                self.completed += 1
+                self.window = min(float(self.max_concurrency), self.window + 1 / self.window)
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, tokens: int = 0) -> Iterator[None]:
+        epoch = self.acquire(tokens)
+        throttled = False
+        try:
+            yield
+        except BaseException as e:
+            throttled = is_throttled(e)
+            raise
+        finally:
+            self.release(throttled, epoch)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0) -> AsyncIterator[None]:
+        epoch = await self.aacquire(tokens)
+        throttled = False
+        try:
+            yield
+        except BaseException as e:
+            throttled = is_throttled(e)
+            raise
+        finally:
+            self.release(throttled, epoch)
+
+    # -- metrics ---------------------------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            self._expire_usage(time.monotonic())
+            return {
+                "model": self.model_id,
+                "window": round(self.window, 2),
+                "min_window": round(self.min_window, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "wait_p50_ms": round(statistics.median(waits) * 1e3, 2) if waits else 0.0,
+                "wait_p99_ms": round(waits[int(0.99 * (len(waits) - 1))] * 1e3, 2) if waits else 0.0,
+                "tokens_last_minute": self._usage_total,
+                "throttled": self.throttled,
+                "completed": self.completed,
+            }
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model_id: str) -> ModelLimiter:
+    """Return the process-wide limiter for `model_id`, sized from AgentSettings."""
+    limiter = _limiters.get(model_id)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model_id)
+            if limiter is None:
+                limiter = ModelLimiter(
+                    model_id,
+                    max_concurrency=agent_settings.model_max_concurrency.get(
+                        model_id, agent_settings.default_model_concurrency
+                    ),
+                    tokens_per_minute=agent_settings.model_tokens_per_minute.get(model_id),
+                )
+                _limiters[model_id] = limiter
+    return limiter
+
+
+def limiter_metrics() -> List[Dict[str, Any]]:
+    return [limiter.metrics() for limiter in list(_limiters.values())]
+
+
+def _backoff(attempt: int) -> float:
+    base = agent_settings.model_throttle_backoff_seconds * 2**attempt
+    return base + random.uniform(0, base)
+
+
+class LimitedModelMixin:
+    """Run `invoke*` calls through the limiter of the model id, retrying throttled calls."""
+
+    def _limit(self, kwargs: Dict[str, Any]) -> Tuple[ModelLimiter, int]:
+        model_id = getattr(self, "id", None) or type(self).__name__
+        return get_limiter(model_id), count_messages(kwargs.get("messages") or [], model_id)
+
+    def invoke(self, **kwargs: Any) -> Any:
+        limiter, tokens = self._limit(kwargs)
+        for attempt in range(agent_settings.model_throttle_retries + 1):
+            try:
+                with limiter.slot(tokens):
+                    return super().invoke(**kwargs)  # type: ignore[misc]
+            except Exception as e:
+                if not is_throttled(e) or attempt == agent_settings.model_throttle_retries:
+                    raise
+            time.sleep(_backoff(attempt))
+
+    async def ainvoke(self, **kwargs: Any) -> Any:
+        limiter, tokens = self._limit(kwargs)
+        for attempt in range(agent_settings.model_throttle_retries + 1):
+            try:
+                async with limiter.aslot(tokens):
+                    return await super().ainvoke(**kwargs)  # type: ignore[misc]
+            except Exception as e:
+                if not is_throttled(e) or attempt == agent_settings.model_throttle_retries:
+                    raise
+            await asyncio.sleep(_backoff(attempt))
+
+    def invoke_stream(self, **kwargs: Any) -> Iterator[Any]:
+        limiter, tokens = self._limit(kwargs)
+        for attempt in range(agent_settings.model_throttle_retries + 1):
+            started = False
+            try:
+                with limiter.slot(tokens):
+                    for chunk in super().invoke_stream(**kwargs):  # type: ignore[misc]
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                # a stream that already produced output cannot be replayed transparently
+                if started or not is_throttled(e) or attempt == agent_settings.model_throttle_retries:
+                    raise
+            time.sleep(_backoff(attempt))
+
+    async def ainvoke_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        limiter, tokens = self._limit(kwargs)
+        for attempt in range(agent_settings.model_throttle_retries + 1):
+            started = False
+            try:
+                async with limiter.aslot(tokens):
+                    async for chunk in super().ainvoke_stream(**kwargs):  # type: ignore[misc]
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                if started or not is_throttled(e) or attempt == agent_settings.model_throttle_retries:
+                    raise
+            await asyncio.sleep(_backoff(attempt))
+
+
+def enable_limiter(model: Any) -> Any:
+    """Return a copy of `model` whose calls go through its model id's limiter."""
+    from utils.model_factory import wrap_model
+
+    return wrap_model(model, LimitedModelMixin)
@@ -0,0 +1,309 @@
+"""Hedged and fallback model calls across model tiers.
+
+A routed model has an ordered list of fallback models (e.g. gemini-2.5-flash ->
+gemini-2.5-flash-lite). Routing is opt-in per model: pass `fallback_models` to
+`create_model` for the agents that may answer from a cheaper tier. For every call:
+
+- if the primary has not produced its first chunk within the hedge deadline (a
+  percentile of its recent time-to-first-token), the same request is sent to the
+  next tier; whichever streams first wins and the other is cancelled;
+- if the running call fails, the request fails over to the next tier.
+
+Fallbacks must use the same provider as the primary, because the primary parses
+the chunks the winner produces.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from agents.settings import agent_settings
+from utils.log import logger
+
+
+class LatencyTracker:
+    """Rolling time-to-first-chunk samples for one model id and call kind."""
+
+    def __init__(self, maxlen: int = 256):
+        self._samples: Deque[float] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+_trackers: Dict[Tuple[str, bool], LatencyTracker] = {}
+_stats: Dict[str, int] = {"calls": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+_lock = threading.Lock()
+
+
+def _tracker(model: Any, stream: bool) -> LatencyTracker:
+    key = (getattr(model, "id", type(model).__name__), stream)
+    with _lock:
+        return _trackers.setdefault(key, LatencyTracker())
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _stats[name] += 1
+
+
+def hedge_deadline(model: Any, stream: bool) -> Optional[float]:
+    """Seconds to wait for the primary's first chunk before hedging, or None to never hedge."""
+    if agent_settings.hedge_percentile is None:
+        return None
+    tracker = _tracker(model, stream)
+    if len(tracker) < agent_settings.hedge_min_samples:
+        return agent_settings.hedge_initial_delay_seconds
+    return tracker.percentile(agent_settings.hedge_percentile)
+
+
+def routing_metrics() -> Dict[str, Any]:
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        trackers = dict(_trackers)
+    q = agent_settings.hedge_percentile or 0.95
+    stats["ttft"] = [
+        {
+            "model": model_id,
+            "stream": stream,
+            "samples": len(tracker),
+            "p50_ms": round((tracker.percentile(0.5) or 0) * 1e3, 2),
+            f"p{int(q * 100)}_ms": round((tracker.percentile(q) or 0) * 1e3, 2),
+        }
+        for (model_id, stream), tracker in trackers.items()
+    ]
+    return stats
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="model-hedge")
+
+
+def _close_when_done(future: Future, iterator: Iterator[Any]) -> None:
+    # a generator cannot be closed while another thread is still running it
+    future.add_done_callback(lambda _: getattr(iterator, "close", lambda: None)())
+
+
+class RoutedModelMixin:
+    """Race `invoke*` calls across `self.fallback_models` (hedging and failover)."""
+
+    fallback_models: Sequence[Any] = ()
+
+    def _tiers(self, primary: Callable[..., Any], method: str) -> List[Tuple[Any, Callable[..., Any]]]:
+        return [(self, primary)] + [(model, getattr(model, method)) for model in self.fallback_models]
+
+    # -- sync ------------------------------------------------------------
+
+    def _race(
+        self, tiers: Sequence[Tuple[Any, Callable[[], Iterator[Any]]]], stream: bool
+    ) -> Generator[Any, None, None]:
+        _count("calls")
+        deadline = hedge_deadline(self, stream)
+        running: Dict[Future, Tuple[int, Iterator[Any], float]] = {}
+        next_tier = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        def start() -> None:
+            nonlocal next_tier
+            iterator = tiers[next_tier][1]()
+            running[_hedge_pool.submit(next, iterator, _Exhausted)] = (next_tier, iterator, time.monotonic())
+            next_tier += 1
+
+        def abandon_running() -> None:
+            for future, (index, iterator, started) in running.items():
+                # censored sample: the loser took at least this long
+                _tracker(tiers[index][0], stream).record(time.monotonic() - started)
+                _close_when_done(future, iterator)
+            running.clear()
+
+        start()
+        try:
+            while running:
+                can_hedge = deadline is not None and len(running) == 1 and next_tier == 1 < len(tiers)
+                done, _ = wait(running, timeout=deadline if can_hedge else None, return_when=FIRST_COMPLETED)
+                if not done:
+                    _count("hedged")
+                    hedged = True
+                    start()
+                    continue
+                for future in done:
+                    index, iterator, started = running.pop(future)
+                    if future.exception() is not None:
+                        last_error = future.exception()
+                        logger.warning(f"{tiers[index][0].id} failed, trying the next tier: {last_error}")
+                        continue
+                    _tracker(tiers[index][0], stream).record(time.monotonic() - started)
+                    if index > 0 and hedged:
+                        _count("hedge_wins")
+                    abandon_running()
+                    first = future.result()
+                    if first is _Exhausted:
+                        return
+                    yield first
+                    yield from iterator
+                    return
+                if not running and next_tier < len(tiers):
+                    _count("failovers")
+                    start()
+            raise last_error  # type: ignore[misc]
+        finally:
+            abandon_running()
+
+    def invoke(self, **kwargs: Any) -> Any:
+        primary = super().invoke  # type: ignore[misc]
+
+        def single(fn: Callable[..., Any]) -> Callable[[], Iterator[Any]]:
+            def _once() -> Iterator[Any]:
+                yield fn(**kwargs)
+
+            return _once
+
+        tiers = [(model, single(fn)) for model, fn in self._tiers(primary, "invoke")]
+        results = self._race(tiers, stream=False)
+        try:
+            return next(results)
+        finally:
+            results.close()
+
+    def invoke_stream(self, **kwargs: Any) -> Iterator[Any]:
+        primary = super().invoke_stream  # type: ignore[misc]
+        tiers = [(model, partial(fn, **kwargs)) for model, fn in self._tiers(primary, "invoke_stream")]
+        yield from self._race(tiers, stream=True)
+
+    # -- async -----------------------------------------------------------
+
+    async def _arace(
+        self, tiers: Sequence[Tuple[Any, Callable[[], AsyncGenerator[Any, None]]]], stream: bool
+    ) -> AsyncGenerator[Any, None]:
+        _count("calls")
+        deadline = hedge_deadline(self, stream)
+        running: Dict["asyncio.Future[Any]", Tuple[int, AsyncGenerator[Any, None], float]] = {}
+        next_tier = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        def start() -> None:
+            nonlocal next_tier
+            iterator = tiers[next_tier][1]()
+            running[asyncio.ensure_future(iterator.__anext__())] = (next_tier, iterator, time.monotonic())
+            next_tier += 1
+
+        async def cancel_running() -> None:
+            for task, (index, iterator, started) in list(running.items()):
+                _tracker(tiers[index][0], stream).record(time.monotonic() - started)
+                task.cancel()
+                try:
+                    await task
+                except BaseException:
+                    pass
+                await iterator.aclose()
+            running.clear()
+
+        start()
+        try:
+            while running:
+                can_hedge = deadline is not None and len(running) == 1 and next_tier == 1 < len(tiers)
+                done, _ = await asyncio.wait(
+                    running, timeout=deadline if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    _count("hedged")
+                    hedged = True
+                    start()
+                    continue
+                for task in done:
+                    index, iterator, started = running.pop(task)
+                    error = task.exception()
+                    if error is not None and not isinstance(error, StopAsyncIteration):
+                        last_error = error
+                        logger.warning(f"{tiers[index][0].id} failed, trying the next tier: {error}")
+                        continue
+                    _tracker(tiers[index][0], stream).record(time.monotonic() - started)
+                    if index > 0 and hedged:
+                        _count("hedge_wins")
+                    await cancel_running()
+                    if error is not None:
+                        return
+                    yield task.result()
+                    async for chunk in iterator:
+                        yield chunk
+                    return
+                if not running and next_tier < len(tiers):
+                    _count("failovers")
+                    start()
+            raise last_error  # type: ignore[misc]
+        finally:
+            await cancel_running()
+
+    async def ainvoke(self, **kwargs: Any) -> Any:
+        primary = super().ainvoke  # type: ignore[misc]
+
+        def single(fn: Callable[..., Any]) -> Callable[[], AsyncGenerator[Any, None]]:
+            async def _once() -> AsyncGenerator[Any, None]:
+                yield await fn(**kwargs)
+
+            return _once
+
+        tiers = [(model, single(fn)) for model, fn in self._tiers(primary, "ainvoke")]
+        results = self._arace(tiers, stream=False)
+        try:
+            return await results.__anext__()
+        finally:
+            await results.aclose()
+
+    async def ainvoke_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        primary = super().ainvoke_stream  # type: ignore[misc]
+        tiers = [(model, partial(fn, **kwargs)) for model, fn in self._tiers(primary, "ainvoke_stream")]
+        async for chunk in self._arace(tiers, stream=True):
+            yield chunk
+
+
+class _ExhaustedType:
+    pass
+
+
+_Exhausted = _ExhaustedType()
+
+
+def enable_routing(model: Any, fallback_models: Sequence[Any]) -> Any:
+    """Return a copy of `model` that hedges and fails over to `fallback_models`, in order."""
+    from utils.model_factory import wrap_model
+
+    for fallback in fallback_models:
+        if getattr(fallback, "provider", None) != getattr(model, "provider", None):
+            raise ValueError(
+                f"Fallback model {fallback.id} must use the same provider as {model.id}: "
+                "the primary parses the winning stream"
+            )
+    model = wrap_model(model, RoutedModelMixin)
+    model.fallback_models = list(fallback_models)
+    return model
@@ -0,0 +1,92 @@
+"""Build-time prompt bundle.
+
+Compiles every YAML file under `prompts/` into a single pickle holding the parsed
+prompts, their metadata and the Jinja-compiled template code. Workers load it once
+at boot (set `PROMPT_BUNDLE=/path/to/prompts.bundle`), so rendering a prompt never
+touches the filesystem and malformed prompts fail the build instead of a request.
+
+Usage:
+    python -m utils.prompt_bundle [--root prompts] [--output prompts.bundle]
+"""
+
+import argparse
+import marshal
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jinja2 import Environment
+
+from utils.prompt_loader import (
+    BUNDLE_FORMAT,
+    PROMPTS_DIR,
+    PromptKey,
+    PromptRegistry,
+    _bundle_runtime,
+    _read_yaml,
+    load_bundle,  # noqa: F401  (loading lives with the registry)
+    prompt_registry,
+    validate_prompt,
+)
+
+DEFAULT_BUNDLE_PATH = PROMPTS_DIR.parent / "prompts.bundle"
+
+
+def build_bundle(
+    root: Path = PROMPTS_DIR,
+    output: Path = DEFAULT_BUNDLE_PATH,
+    registry: Optional[PromptRegistry] = None,
+) -> Path:
+    """Validate and compile every prompt under `root` into `output`.
+
+    Raises ValueError listing every malformed file.
+    """
+    registry = registry or prompt_registry
+    environment: Environment = registry.environment
+
+    files: Dict[str, Dict[str, Any]] = {}
+    errors: List[str] = []
+    for path in sorted(Path(root).rglob("*.yaml")):
+        key = registry.bundle_key(path.resolve())
+        try:
+            data = _read_yaml(path) or {}
+            validate_prompt(data, key)
+            code = {
+                name: marshal.dumps(environment.compile(source, name=f"{key}:{name}", filename=key))
+                for name, source in data["prompt"].items()
+            }
+        except Exception as e:
+            errors.append(f"{key}: {e}")
+            continue
+        files[key] = {
+            "prompts": data["prompt"],
+            "metadata": data.get(PromptKey.METADATA) or {},
+            "code": code,
+        }
+
+    if errors:
+        raise ValueError("Invalid prompt files:\n" + "\n".join(errors))
+
+    payload = {"format": BUNDLE_FORMAT, "runtime": _bundle_runtime(), "files": files}
+    output = Path(output)
+    output.write_bytes(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    return output
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compile prompts/ into a single validated bundle.")
+    parser.add_argument("--root", type=Path, default=PROMPTS_DIR)
+    parser.add_argument("--output", type=Path, default=DEFAULT_BUNDLE_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        output = build_bundle(args.root, args.output)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote prompt bundle to {output}")
+
+
+if __name__ == "__main__":
+    main()
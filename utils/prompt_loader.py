@@ -1,31 +1,66 @@
+import marshal
+import pickle
+import sys
+import threading
+from dataclasses import dataclass
 from enum import Enum
+from os import getenv
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+import jinja2
 import yaml
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, Template
 
-try:
-    import tiktoken
-except Exception:
-    tiktoken = None
+from utils.log import logger
+from utils.token_budget import count_messages
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+# Shared Jinja environment for all prompt templates. Sources are registered in
+# `_template_sources` under "<path>:<key>" names so compiled bytecode can be reused
+# across processes through the bytecode cache.
+_template_sources: Dict[str, str] = {}
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    # Jinja refuses a shared temp cache dir owned by another user; compile in memory then
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+prompt_environment = Environment(
+    loader=DictLoader(_template_sources),
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=True,
+)
+
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
 
 
 def _read_yaml(path: Path) -> Dict[str, Any]:
     return yaml.safe_load(path.read_text())
 
 
-def _render_template(template: str, ctx: Dict[str, Any]) -> str:
-    return Template(template).render(**ctx)
+def _is_static(source: str) -> bool:
+    return not any(marker in source for marker in _TEMPLATE_MARKERS)
+
+
+def _count_tokens(prompts: Mapping[str, Any], model: str | None = None) -> int:
+    return count_messages([v for v in prompts.values() if isinstance(v, str)], model)
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
-def _count_tokens(prompts: List[Dict[str, str]], model: str | None = None) -> int:
-    if model and tiktoken is not None:
-        try:
-            enc = tiktoken.encoding_for_model(model)
-            return sum(len(enc.encode(m["content"])) for m in prompts)
-        except Exception:
-            pass
-    return 0
 
 class PromptKey(str, Enum):
     SYSTEM_MESSAGE = "system_message"
@@ -36,24 +71,251 @@ class PromptKey(str, Enum):
     METADATA = "metadata"
 
 
-def render_prompt(path: str, model: str | None = None, **ctx) -> Tuple[Dict[str, str], Dict[str, Any]]:
-    """
-    Load a prompt YAML, render prompts with the provided context and return (prompts, metadata).
+_FILE_KEYS = {"id", "prompt", PromptKey.METADATA.value}
+_PROMPT_KEYS = {k.value for k in PromptKey if k is not PromptKey.METADATA}
 
-    prompts: list of dicts with keys: role, content
-    metadata: dict from YAML
-    """
-    p = Path(path)
-    if not p.exists():
-        p = Path.cwd() / path
-        if not p.exists():
-            raise FileNotFoundError(f"Prompt file not found: {path}")
 
-    data = _read_yaml(p)
-    metadata: Dict[str, Any] = data.get(PromptKey.METADATA, {})
+def validate_prompt(data: Any, path: str | Path) -> None:
+    """Check a parsed prompt file against the `PromptKey` schema, raising ValueError on problems."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Prompt file must contain a mapping: {path}")
+
+    unknown = set(data) - _FILE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown top-level keys {sorted(unknown)} in prompt file: {path}")
 
     raw = data.get("prompt")
     if not isinstance(raw, dict):
         raise ValueError(f"Prompt file must contain a structured 'prompt' mapping: {path}")
 
-    return raw, metadata
+    unknown = set(raw) - _PROMPT_KEYS
+    if unknown:
+        raise ValueError(f"Unknown prompt keys {sorted(unknown)} in prompt file: {path}")
+    for key, value in raw.items():
+        if not isinstance(value, str):
+            raise ValueError(f"Prompt '{key}' must be a string in prompt file: {path}")
+
+    metadata = data.get(PromptKey.METADATA)
+    if metadata is not None and not isinstance(metadata, dict):
+        raise ValueError(f"'metadata' must be a mapping in prompt file: {path}")
+    if metadata and "max_tokens" in metadata and not isinstance(metadata["max_tokens"], int):
+        raise ValueError(f"'metadata.max_tokens' must be an integer in prompt file: {path}")
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A parsed prompt file together with its precompiled Jinja templates.
+
+    `static` holds prompts without template syntax, rendered once at compile time;
+    `templates` holds compiled templates for the prompts that depend on context.
+    """
+
+    path: Path
+    mtime_ns: int
+    prompts: Mapping[str, str]
+    metadata: Mapping[str, Any]
+    templates: Mapping[str, Template]
+    static: Mapping[str, Any]
+
+    def render(self, **ctx) -> Mapping[str, Any]:
+        if not self.templates:
+            return self.static
+        rendered = dict(self.static)
+        for key, template in self.templates.items():
+            rendered[key] = template.render(**ctx)
+        return MappingProxyType(rendered)
+
+
+class PromptRegistry:
+    """Process-wide cache of parsed prompt files.
+
+    Each file is parsed once and its templates compiled once. Entries are keyed by
+    resolved path and invalidated when the file's mtime changes, so edits are picked
+    up without a restart while unchanged prompts never touch YAML again.
+
+    When a prompt bundle is loaded (see `utils.prompt_bundle`), lookups for bundled
+    prompts are served from memory without touching the filesystem at all.
+    """
+
+    def __init__(self, root: Optional[Path] = None, environment: Optional[Environment] = None):
+        self.root: Path = root or PROMPTS_DIR
+        self.environment: Environment = environment or prompt_environment
+        self._entries: Dict[Path, CompiledPrompt] = {}
+        self._bundled: Dict[str, CompiledPrompt] = {}
+        self._lock = threading.Lock()
+
+    def bundle_key(self, path: str | Path) -> str:
+        """Stable, filesystem-independent key for a prompt path (relative to the repo root)."""
+        p = Path(path)
+        if p.is_absolute():
+            try:
+                p = p.relative_to(self.root.parent)
+            except ValueError:
+                pass
+        return p.as_posix()
+
+    def resolve(self, path: str | Path) -> Path:
+        p = Path(path)
+        if not p.exists():
+            p = Path.cwd() / path
+            if not p.exists():
+                raise FileNotFoundError(f"Prompt file not found: {path}")
+        return p.resolve()
+
+    def get(self, path: str | Path) -> CompiledPrompt:
+        if self._bundled:
+            entry = self._bundled.get(self.bundle_key(path))
+            if entry is not None:
+                return entry
+
+        p = self.resolve(path)
+        mtime_ns = p.stat().st_mtime_ns
+        entry = self._entries.get(p)
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(p)
+            if entry is None or entry.mtime_ns != mtime_ns:
+                entry = self._compile(p, mtime_ns)
+                self._entries[p] = entry
+        return entry
+
+    def preload(self) -> List[CompiledPrompt]:
+        """Parse every prompt file under `root` so later lookups are cache hits."""
+        return [self.get(p) for p in sorted(self.root.rglob("*.yaml"))]
+
+    def load_bundle(self, entries: Mapping[str, CompiledPrompt]) -> None:
+        with self._lock:
+            self._bundled = dict(entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bundled.clear()
+
+    def _compile(self, path: Path, mtime_ns: int) -> CompiledPrompt:
+        data = _read_yaml(path) or {}
+        validate_prompt(data, path)
+
+        templates = {
+            key: self._compile_template(f"{path}:{key}", source)
+            for key, source in data["prompt"].items()
+            if isinstance(source, str)
+        }
+        return self.make_entry(path, mtime_ns, data["prompt"], data.get(PromptKey.METADATA) or {}, templates)
+
+    def make_entry(
+        self,
+        path: Path,
+        mtime_ns: int,
+        prompts: Mapping[str, Any],
+        metadata: Mapping[str, Any],
+        templates: Mapping[str, Template],
+    ) -> CompiledPrompt:
+        dynamic: Dict[str, Template] = {}
+        static: Dict[str, Any] = {}
+        for key, source in prompts.items():
+            if key not in templates:
+                static[key] = source
+            elif _is_static(source):
+                static[key] = templates[key].render()
+            else:
+                dynamic[key] = templates[key]
+
+        return CompiledPrompt(
+            path=path,
+            mtime_ns=mtime_ns,
+            prompts=MappingProxyType(dict(prompts)),
+            metadata=_freeze(dict(metadata)),
+            templates=MappingProxyType(dynamic),
+            static=MappingProxyType(static),
+        )
+
+    def _compile_template(self, name: str, source: str) -> Template:
+        loader = self.environment.loader
+        if isinstance(loader, DictLoader) and isinstance(loader.mapping, dict):
+            loader.mapping[name] = source
+            return self.environment.get_template(name)
+        return self.environment.from_string(source)
+
+
+# Create a PromptRegistry object
+prompt_registry = PromptRegistry()
+
+
+def render_prompt(path: str, model: str | None = None, **ctx) -> Tuple[Mapping[str, str], Mapping[str, Any]]:
+    """
+    Load a prompt YAML, render prompts with the provided context and return (prompts, metadata).
+
+    prompts: read-only mapping of prompt key -> rendered content
+    metadata: read-only mapping from YAML
+    """
+    compiled = prompt_registry.get(path)
+    prompts = compiled.render(**ctx)
+
+    max_tokens = compiled.metadata.get("max_tokens")
+    if isinstance(max_tokens, int):
+        used = _count_tokens(prompts, model)
+        if used > max_tokens:
+            logger.warning(f"Prompt {path} uses ~{used} tokens, over its max_tokens budget of {max_tokens}")
+
+    return prompts, compiled.metadata
+
+
+# Prompt bundles are built by utils/prompt_bundle.py and loaded here, so that loading one
+# at import time does not import the build tool back.
+BUNDLE_FORMAT = 1
+
+
+def _bundle_runtime() -> Dict[str, Any]:
+    # Marshalled code objects are only valid for the interpreter/Jinja version that produced them
+    return {"python": tuple(sys.version_info[:2]), "jinja2": jinja2.__version__}
+
+
+def load_bundle(path: str | Path, registry: Optional[PromptRegistry] = None) -> int:
+    """Load a bundle into `registry` and return the number of prompt files it holds."""
+    registry = registry or prompt_registry
+    environment: Environment = registry.environment
+
+    payload = pickle.loads(Path(path).read_bytes())
+    if payload.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported prompt bundle format {payload.get('format')!r}: {path}")
+    # Fall back to compiling from source if the bundle was built by a different runtime
+    use_code = payload.get("runtime") == _bundle_runtime()
+
+    entries = {}
+    for key, item in payload["files"].items():
+        templates: Dict[str, Template] = {}
+        for name, source in item["prompts"].items():
+            if use_code:
+                code = marshal.loads(item["code"][name])
+                templates[name] = environment.template_class.from_code(
+                    environment, code, environment.make_globals(None)
+                )
+            else:
+                templates[name] = environment.from_string(source)
+        entries[key] = registry.make_entry(Path(key), 0, item["prompts"], item["metadata"], templates)
+
+    registry.load_bundle(entries)
+    return len(entries)
+
+
+def load_configured_bundle(registry: Optional[PromptRegistry] = None) -> int:
+    """Load the bundle named by PROMPT_BUNDLE, if any, and return the number of prompt files.
+
+    A configured bundle that does not exist is skipped with a warning and prompts are read
+    from prompts/ instead: dev containers mount the workspace over the image's /app, which
+    hides the bundle baked into it.
+    """
+    path = getenv("PROMPT_BUNDLE")
+    if not path:
+        return 0
+    if not Path(path).is_file():
+        logger.warning(f"Prompt bundle {path} not found, loading prompts from {PROMPTS_DIR}")
+        return 0
+    return load_bundle(path, registry)
+
+
+# Serve prompts from a prebuilt bundle when one is configured
+load_configured_bundle()
@@ -0,0 +1,113 @@
+"""Coalesce identical concurrent runs.
+
+The first request for a key starts the run in a background task; duplicates that
+arrive while it is in flight attach to it instead of starting their own. Every
+subscriber receives the full stream: chunks already produced are replayed, then
+new ones are fanned out as they arrive. The flight is forgotten as soon as it
+finishes, so later requests start a fresh run (and can hit the response cache).
+
+If every subscriber disconnects before the run finishes, the run is cancelled.
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def normalize_input(text: Any) -> str:
+    """Collapse whitespace so trivially different spellings of a request coalesce."""
+    return " ".join(str(text).split())
+
+
+def flight_key(kind: str, runnable_id: str, payload: Any, model: Optional[str] = None, *extra: Any) -> Tuple:
+    return (kind, runnable_id, normalize_input(payload), model, *extra)
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional["asyncio.Task[None]"] = None
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def _produce(self, key: Hashable, flight: _Flight, factory: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for chunk in factory():
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            flight.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncGenerator[Any, None]:
+        """Yield the chunks of the run for `key`, starting it with `factory()` if needed."""
+        if not self.enabled:
+            async for chunk in factory():
+                yield chunk
+            return
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(key, flight, factory))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: position < len(flight.chunks) or flight.done)
+                    pending = flight.chunks[position:]
+                for chunk in pending:
+                    yield chunk
+                position += len(pending)
+                if flight.done and position == len(flight.chunks):
+                    break
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                # nobody is listening any more: stop spending on this run
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await a single result for `key`, sharing it with concurrent duplicates."""
+
+        async def _once() -> AsyncIterator[Any]:
+            yield await fn()
+
+        result = None
+        async for result in self.stream(key, _once):
+            pass
+        return result
+
+
+run_flights = SingleFlight()
@@ -0,0 +1,178 @@
+"""Server-sent events for the streaming run endpoints.
+
+`sse_stream` turns the chunks of a run (agno RunResponse / TeamRunResponse objects
+or plain strings) into SSE frames:
+
+- text fragments are coalesced: they are buffered until `flush_bytes` characters
+  are pending or the oldest has waited `flush_interval` seconds, then written as one
+  `message` event, so a long generation costs a few writes instead of one per token;
+- a `: ping` comment goes out after `heartbeat` seconds without any event, which
+  keeps proxies and load balancers from closing idle streams;
+- with `structured=True`, tool calls and the final run metrics are sent as
+  `tool_call` and `metrics` events with JSON data;
+- the stream ends with a `done` event, or an `error` event if the run failed;
+- when the client disconnects, the response is cancelled and so is the run.
+
+Every event carries an increasing `id`. Multi-line text is split over several `data:`
+lines, which clients join back with newlines.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+from utils.log import logger
+
+# RunEvent values; teams use the same ones
+_TOOL_EVENTS = {"ToolCallStarted", "ToolCallCompleted"}
+_COMPLETED = "RunCompleted"
+# events carrying no new text (RunCompleted repeats the whole response)
+_SILENT_EVENTS = {"RunStarted", "ReasoningStarted", "ReasoningStep", "ReasoningCompleted", "UpdatingMemory"}
+
+
+def format_event(data: str, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+HEARTBEAT = ": ping\n\n"
+
+
+def _text(content: Any) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if hasattr(content, "model_dump_json"):
+        return content.model_dump_json()
+    return json.dumps(content, default=str)
+
+
+def _tool_call(chunk: Any) -> dict:
+    tool = (getattr(chunk, "tools", None) or [None])[-1]
+    return {
+        "status": "started" if chunk.event == "ToolCallStarted" else "completed",
+        "tool_name": getattr(tool, "tool_name", None),
+        "tool_args": getattr(tool, "tool_args", None),
+        "result": getattr(tool, "result", None) if chunk.event == "ToolCallCompleted" else None,
+        "error": getattr(tool, "tool_call_error", None),
+    }
+
+
+async def sse_stream(
+    chunks: AsyncIterator[Any],
+    flush_interval: float = 0.05,
+    flush_bytes: int = 1024,
+    heartbeat: float = 15.0,
+    structured: bool = False,
+    first_event_id: int = 1,
+) -> AsyncGenerator[str, None]:
+    """SSE frames for the run producing `chunks`, with ids counting up from `first_event_id`."""
+    source = chunks.__aiter__()
+    pending: Optional["asyncio.Future[Any]"] = None
+    buffer: List[str] = []
+    buffered = 0
+    first_buffered_at = 0.0
+    event_id = first_event_id - 1
+
+    def event(data: str, name: Optional[str] = None) -> str:
+        nonlocal event_id
+        event_id += 1
+        return format_event(data, name, event_id)
+
+    def flush() -> str:
+        nonlocal buffer, buffered
+        text = "".join(buffer)
+        buffer, buffered = [], 0
+        return event(text, "message")
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(source.__anext__())
+            if buffer:
+                timeout = max(first_buffered_at + flush_interval - time.monotonic(), 0.0)
+            else:
+                timeout = heartbeat
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield flush() if buffer else HEARTBEAT
+                continue
+
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+
+            name = getattr(chunk, "event", None)
+            if name in _TOOL_EVENTS or name == _COMPLETED:
+                if structured:
+                    if buffer:
+                        yield flush()
+                    if name == _COMPLETED:
+                        yield event(json.dumps(getattr(chunk, "metrics", None) or {}, default=str), "metrics")
+                    else:
+                        yield event(json.dumps(_tool_call(chunk), default=str), "tool_call")
+                continue
+            if name in _SILENT_EVENTS:
+                continue
+
+            text = chunk if isinstance(chunk, str) else _text(getattr(chunk, "content", None))
+            if not text:
+                continue
+            if not buffer:
+                first_buffered_at = time.monotonic()
+            buffer.append(text)
+            buffered += len(text)
+            if buffered >= flush_bytes or flush_interval <= 0:
+                yield flush()
+
+        if buffer:
+            yield flush()
+        yield event("[DONE]", "done")
+    except asyncio.CancelledError:
+        # the client went away; cancelling `chunks` below stops the run (see utils/cancellation.py)
+        logger.info("Stream cancelled, stopping the run")
+        raise
+    except Exception as e:
+        logger.error(f"Streaming run failed: {e}")
+        if buffer:
+            yield flush()
+        yield event(json.dumps({"error": str(e)}), "error")
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def sse_response(chunks: AsyncIterator[Any], structured: bool = False) -> StreamingResponse:
+    """A text/event-stream response for `chunks`, framed and coalesced per ApiSettings."""
+    from api.settings import api_settings
+
+    frames = sse_stream(
+        chunks,
+        flush_interval=api_settings.sse_flush_interval_seconds,
+        flush_bytes=api_settings.sse_flush_bytes,
+        heartbeat=api_settings.sse_heartbeat_seconds,
+        structured=structured,
+    )
+    return event_stream_response(frames)
+
+
+def event_stream_response(frames: AsyncIterator[str]) -> StreamingResponse:
+    """A text/event-stream response for already formatted SSE frames."""
+    # no-transform / X-Accel-Buffering keep proxies from re-buffering the coalesced frames
+    headers = {"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"}
+    return StreamingResponse(frames, media_type="text/event-stream", headers=headers)
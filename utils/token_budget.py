@@ -0,0 +1,216 @@
+"""Token counting and budgeting helpers.
+
+Gemini/Gemma models are not known to tiktoken, so they are counted with a local
+characters-per-token approximation that can be calibrated against the
+`count_tokens` API. Every other model goes through a tiktoken encoder, resolved
+once per model family.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+
+GEMINI_FAMILY = "gemini"
+DEFAULT_FAMILY = "cl100k_base"
+
+# Google documents roughly 4 characters per token for Gemini models.
+DEFAULT_GEMINI_CHARS_PER_TOKEN = 4.0
+# Approximate per-message framing overhead (role markers, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARKER = "\n[... truncated ...]"
+
+
+def model_family(model: Optional[str]) -> str:
+    """Map a model id (optionally provider-prefixed) to an encoder family."""
+    if not model:
+        return GEMINI_FAMILY
+    mid = model.split(":", 1)[-1].lower()
+    if mid.startswith(("gemini", "gemma", "models/gemini", "models/gemma")):
+        return GEMINI_FAMILY
+    if tiktoken is not None:
+        try:
+            return tiktoken.encoding_name_for_model(mid)
+        except Exception:
+            pass
+    return DEFAULT_FAMILY
+
+
+class GeminiApproxEncoder:
+    """Fast local token estimate for Gemini models based on a chars-per-token ratio."""
+
+    def __init__(self, chars_per_token: float = DEFAULT_GEMINI_CHARS_PER_TOKEN):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        return [self.count(t) for t in texts]
+
+    def calibrate(self, samples: Iterable[str], client: Any, model: str) -> float:
+        """Fit the ratio to `client.models.count_tokens` results for the given samples.
+
+        `client` is a `google.genai.Client` (or anything exposing the same method).
+        Returns the new chars-per-token ratio.
+        """
+        total_chars = 0
+        total_tokens = 0
+        for text in samples:
+            if not text:
+                continue
+            result = client.models.count_tokens(model=model, contents=text)
+            total_chars += len(text)
+            total_tokens += result.total_tokens or 0
+        if total_tokens:
+            self.chars_per_token = total_chars / total_tokens
+            _count_cache.clear()
+        return self.chars_per_token
+
+
+class TiktokenEncoder:
+    def __init__(self, encoding_name: str):
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=())) if text else 0
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        return [len(t) for t in self.encoding.encode_batch(list(texts), disallowed_special=())]
+
+
+@lru_cache(maxsize=None)
+def get_encoder(family: str):
+    """Return the (cached) encoder for a model family."""
+    if family == GEMINI_FAMILY or tiktoken is None:
+        return GeminiApproxEncoder()
+    try:
+        return TiktokenEncoder(family)
+    except Exception:
+        return GeminiApproxEncoder()
+
+
+class _CountCache:
+    """Bounded LRU of token counts keyed by (family, content hash)."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(family: str, text: str) -> Tuple[str, bytes]:
+        return family, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[int]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[str, bytes], value: int) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_count_cache = _CountCache()
+
+
+def _content_of(message: Any) -> str:
+    if isinstance(message, str):
+        return message
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    if content is None:
+        return ""
+    return content if isinstance(content, str) else str(content)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return count_texts([text], model)[0]
+
+
+def count_texts(texts: Sequence[str], model: Optional[str] = None) -> List[int]:
+    """Count tokens for many texts at once, encoding only the ones not seen before."""
+    family = model_family(model)
+    keys = [_count_cache.key(family, t) for t in texts]
+    counts: List[Optional[int]] = [_count_cache.get(k) for k in keys]
+
+    missing = [i for i, c in enumerate(counts) if c is None]
+    if missing:
+        encoded = get_encoder(family).count_batch([texts[i] for i in missing])
+        for i, n in zip(missing, encoded):
+            counts[i] = n
+            _count_cache.set(keys[i], n)
+    return counts  # type: ignore[return-value]
+
+
+def count_messages(messages: Sequence[Any], model: Optional[str] = None) -> int:
+    """Total tokens for a message list (dicts, agno Messages or plain strings)."""
+    if not messages:
+        return 0
+    counts = count_texts([_content_of(m) for m in messages], model)
+    return sum(counts) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def truncate_text(text: Any, max_tokens: int, model: Optional[str] = None) -> Any:
+    """Cut `text` down to roughly `max_tokens`, keeping the beginning."""
+    if not isinstance(text, str) or not text or max_tokens <= 0:
+        return text
+    tokens = count_tokens(text, model)
+    if tokens <= max_tokens:
+        return text
+    # Scale by the observed chars/token ratio of this text, then tighten if needed.
+    cut = int(len(text) * max_tokens / tokens)
+    truncated = text[:cut]
+    while cut > 0 and count_tokens(truncated, model) > max_tokens:
+        cut = int(cut * 0.9)
+        truncated = text[:cut]
+    return truncated + TRUNCATION_MARKER
+
+
+def trim_messages(
+    messages: Sequence[Any],
+    max_tokens: int,
+    model: Optional[str] = None,
+    keep_roles: Tuple[str, ...] = ("system",),
+) -> List[Any]:
+    """Drop the oldest messages until the list fits in `max_tokens`.
+
+    Messages whose role is in `keep_roles` and the most recent message are always kept.
+    """
+    messages = list(messages)
+    if not messages:
+        return messages
+    counts = count_texts([_content_of(m) for m in messages], model)
+    total = sum(counts) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+    def _role(m: Any) -> Optional[str]:
+        return m.get("role") if isinstance(m, dict) else getattr(m, "role", None)
+
+    keep = [True] * len(messages)
+    for i in range(len(messages) - 1):
+        if total <= max_tokens:
+            break
+        if _role(messages[i]) in keep_roles:
+            continue
+        keep[i] = False
+        total -= counts[i] + MESSAGE_OVERHEAD_TOKENS
+    return [m for m, k in zip(messages, keep) if k]
@@ -0,0 +1,98 @@
+"""Run a workflow over many inputs through batch inference.
+
+Every run gets its own copies of the workflow's agents whose models submit through a
+shared `BatchCollector`, so the N runs advance in lock-step: all first-step calls go
+out as one batch job, then all second-step calls, and so on.
+
+Usage:
+    python -m workflows.batch generate-investment-report watchlist.txt --output reports.jsonl
+    python -m workflows.batch generate-investment-report watchlist.txt --local /tmp/batches
+
+`watchlist.txt` has one input per line. `--local DIR` (or BATCH_LOCAL_DIR) uses the
+file-based stand-in answered by the offline fake provider instead of the Gemini Batch API.
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from agno.workflow import Workflow
+
+from agents.settings import agent_settings
+from utils.log import logger
+from utils.model_batch import (
+    BatchBackend,
+    BatchCollector,
+    GeminiBatchBackend,
+    LocalBatchBackend,
+    enable_batching,
+    fake_responder,
+)
+from workflows.operator import get_workflow, isolate_agents, run_with_input
+
+
+def batch_workflow(workflow: Workflow, collector: BatchCollector) -> Workflow:
+    """Give `workflow` private copies of its agents, with models that submit through `collector`."""
+    return isolate_agents(workflow, wrap_model=lambda model: enable_batching(model, collector))
+
+
+def run_batch(
+    workflow_id: str, inputs: List[str], collector: BatchCollector, max_runs: int = 100
+) -> List[Dict[str, Any]]:
+    """Run `workflow_id` once per input, `max_runs` at a time. Returns input/output/error records."""
+
+    def run_one(payload: str) -> Dict[str, Any]:
+        try:
+            workflow = batch_workflow(get_workflow(workflow_id=workflow_id, debug_mode=False), collector)
+            chunks = [getattr(r, "content", None) or "" for r in run_with_input(workflow, payload)]
+            return {"input": payload, "output": "\n".join(chunks), "error": None}
+        except Exception as e:
+            logger.error(f"Batch run of {workflow_id} for {payload!r} failed: {e}")
+            return {"input": payload, "output": None, "error": str(e)}
+        finally:
+            collector.finish_runs()
+
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(inputs), max_runs):
+        wave = inputs[start : start + max_runs]
+        # register the whole wave first, so no batch goes out before every run has queued its call
+        collector.start_runs(len(wave))
+        with ThreadPoolExecutor(max_workers=len(wave), thread_name_prefix="batch-run") as pool:
+            results.extend(pool.map(run_one, wave))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a workflow over many inputs with batch inference.")
+    parser.add_argument("workflow_id")
+    parser.add_argument("inputs", type=Path, help="file with one workflow input per line")
+    parser.add_argument("--output", type=Path, default=None, help="JSONL results (default: stdout)")
+    parser.add_argument("--local", default=agent_settings.batch_local_dir, help="use the file-based stand-in")
+    parser.add_argument("--max-runs", type=int, default=agent_settings.batch_max_size)
+    args = parser.parse_args(argv)
+
+    backend: BatchBackend
+    if args.local:
+        backend = LocalBatchBackend(args.local, responder=fake_responder())
+    else:
+        from utils.model_factory import gemini_client
+
+        backend = GeminiBatchBackend(gemini_client())
+    collector = BatchCollector(backend)
+
+    inputs = [line.strip() for line in args.inputs.read_text(encoding="utf-8").splitlines() if line.strip()]
+    results = run_batch(args.workflow_id, inputs, collector, max_runs=args.max_runs)
+    lines = "".join(json.dumps(result) + "\n" for result in results)
+    if args.output:
+        args.output.write_text(lines, encoding="utf-8")
+    else:
+        print(lines, end="")
+    logger.info(
+        f"{len(inputs)} runs, {collector.requests_submitted} model calls in {collector.jobs_submitted} batch jobs"
+    )
+
+
+if __name__ == "__main__":
+    main()
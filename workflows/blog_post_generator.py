@@ -4,15 +4,17 @@ from typing import Dict, Iterator, Optional
 
 from agno.agent import Agent
 from agno.models.google import Gemini
-from agno.storage.postgres import PostgresStorage
 from agno.tools.duckduckgo import DuckDuckGoTools
 from agno.utils.log import logger
 from agno.workflow import RunEvent, RunResponse, Workflow
 from pydantic import BaseModel, Field
 
 from agents.operator import AgentType, get_agent
+from app_settings.settings import app_settings
 from models import SearchResults, ScrapedArticle
-from db.session import db_url
+from db.storage import StorageBackend, get_storage
+from utils.cancellation import check_cancelled
+from utils.token_budget import truncate_text
 
 
 class BlogPostGenerator(Workflow):
@@ -61,22 +63,31 @@ class BlogPostGenerator(Workflow):
             )
             return
 
+        # Stop here if the client has gone away (see utils/cancellation.py)
+        check_cancelled()
+
         # Scrape the search results
         scraped_articles: Dict[str, ScrapedArticle] = self.scrape_articles(topic, search_results, use_scrape_cache)
 
-        # Prepare the input for the writer
-        writer_input = {
-            "topic": topic,
-            "articles": [v.model_dump() for v in scraped_articles.values()],
-        }
+        check_cancelled()
 
         # Run the writer and yield the response
-        yield from self.writer.run(json.dumps(writer_input, indent=4), stream=True)
+        yield from self.writer.run(self.prepare_writer_input(topic, scraped_articles), stream=True)
 
         # Save the blog post in the cache
         if self.writer.run_response:
             self.add_blog_post_to_cache(topic, str(self.writer.run_response.content))
 
+    def prepare_writer_input(self, topic: str, scraped_articles: Dict[str, ScrapedArticle]) -> str:
+        # Keep each scraped article within the tool output budget before it reaches the writer
+        articles = []
+        model_id = self.writer.model.id if self.writer.model else None
+        for article in scraped_articles.values():
+            data = article.model_dump()
+            data["content"] = truncate_text(data.get("content"), app_settings.tool_output_token_budget, model_id)
+            articles.append(data)
+        return json.dumps({"topic": topic, "articles": articles}, indent=4)
+
     def get_cached_blog_post(self, topic: str) -> Optional[str]:
         logger.info("Checking if cached blog post exists")
 
@@ -129,6 +140,8 @@ class BlogPostGenerator(Workflow):
 
         # If there are no cached search_results, use the searcher to find the latest articles
         for attempt in range(num_attempts):
+            # no more attempts once the run is cancelled
+            check_cancelled()
             try:
                 searcher_response: RunResponse = self.searcher.run(topic)
                 if (
@@ -170,6 +183,7 @@ class BlogPostGenerator(Workflow):
             if article.url in scraped_articles:
                 logger.info(f"Found scraped article in cache: {article.url}")
                 continue
+            check_cancelled()
 
             article_scraper_response: RunResponse = self.article_scraper.run(article.url)
             if (
@@ -188,25 +202,17 @@ class BlogPostGenerator(Workflow):
 # Run the workflow if the script is executed directly
 def write_blog_post(self, topic: str, scraped_articles: Dict[str, ScrapedArticle]) -> Iterator[RunResponse]:
     logger.info("Writing blog post")
-    # Prepare the input for the writer
-    writer_input = {
-        "topic": topic,
-        "articles": [v.model_dump() for v in scraped_articles.values()],
-    }
     # Run the writer and yield the response
-    yield from self.writer.run(json.dumps(writer_input, indent=4), stream=True)
+    yield from self.writer.run(self.prepare_writer_input(topic, scraped_articles), stream=True)
     # Save the blog post in the cache
     self.add_blog_post_to_cache(topic, self.writer.run_response.content)
 
 
-def get_blog_post_generator(debug_mode: bool = False) -> BlogPostGenerator:
+def get_blog_post_generator(
+    debug_mode: bool = False, storage_backend: Optional[StorageBackend] = None
+) -> BlogPostGenerator:
     return BlogPostGenerator(
         workflow_id="generate-blog-post-on",
-        storage=PostgresStorage(
-            table_name="blog_post_generator_workflows",
-            db_url=db_url,
-            auto_upgrade_schema=True,
-            mode="workflow",
-        ),
+        storage=get_storage(table_name="blog_post_generator_workflows", mode="workflow", backend=storage_backend),
         debug_mode=debug_mode,
     )
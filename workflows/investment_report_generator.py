@@ -1,14 +1,14 @@
 from textwrap import dedent
-from typing import Iterator
+from typing import AsyncIterator, Iterator, Optional
 
 from agno.agent import Agent, RunResponse
-from agno.models.google import Gemini
-from agno.storage.postgres import PostgresStorage
 from agno.utils.log import logger
 from agno.workflow import Workflow
 
-from db.session import db_url
+from db.storage import StorageBackend, get_storage
 from app_settings.settings import app_settings
+from utils.model_factory import create_model
+from utils.token_budget import truncate_text
 
 
 class InvestmentReportGenerator(Workflow):
@@ -24,7 +24,7 @@ class InvestmentReportGenerator(Workflow):
 
     stock_analyst: Agent = Agent(
         name="Stock Analyst",
-        model=Gemini(id=app_settings.gemini_2_5_pro),
+        model=create_model(app_settings.gemini_2_5_pro, temperature=app_settings.default_temperature),
         tools=[],
         description=dedent("""\
         You are MarketMaster-X, an elite Senior Investment Analyst at Goldman Sachs with expertise in:
@@ -59,7 +59,7 @@ class InvestmentReportGenerator(Workflow):
 
     research_analyst: Agent = Agent(
         name="Research Analyst",
-        model=Gemini(id=app_settings.gemini_2_5_pro),
+        model=create_model(app_settings.gemini_2_5_pro, temperature=app_settings.default_temperature),
         description=dedent("""\
         You are ValuePro-X, an elite Senior Research Analyst at Goldman Sachs specializing in:
 
@@ -91,7 +91,7 @@ class InvestmentReportGenerator(Workflow):
 
     investment_lead: Agent = Agent(
         name="Investment Lead",
-        model=Gemini(id=app_settings.gemini_2_5_pro),
+        model=create_model(app_settings.gemini_2_5_pro, temperature=app_settings.default_temperature),
         description=dedent("""\
         You are PortfolioSage-X, a distinguished Senior Investment Lead at Goldman Sachs expert in:
 
@@ -120,34 +120,63 @@ class InvestmentReportGenerator(Workflow):
         """),
     )
 
+    # The analysis steps before the investment lead: (agent, log message, reply when it
+    # returns nothing). `run` and `arun` both walk these, so the two stay in step.
+    analysis_steps = (
+        (
+            "stock_analyst",
+            "Getting investment reports for the companies.",
+            "Sorry, could not get the stock analyst report.",
+        ),
+        (
+            "research_analyst",
+            "Ranking companies based on investment potential.",
+            "Sorry, could not get the ranked companies.",
+        ),
+    )
+
+    def _handoff(self, content: str) -> str:
+        """The output of one step, trimmed to the budget of the next one's input."""
+        return truncate_text(content, app_settings.tool_output_token_budget, app_settings.gemini_2_5_pro)
+
     def run(self, companies: str) -> Iterator[RunResponse]:  # type: ignore
-        logger.info(f"Getting investment reports for companies: {companies}")
-        initial_report: RunResponse = self.stock_analyst.run(companies)
-        if initial_report is None or not initial_report.content:
-            yield RunResponse(
-                run_id=self.run_id,
-                content="Sorry, could not get the stock analyst report.",
-            )
-            return
-
-        logger.info("Ranking companies based on investment potential.")
-        ranked_companies: RunResponse = self.research_analyst.run(initial_report.content)
-        if ranked_companies is None or not ranked_companies.content:
-            yield RunResponse(run_id=self.run_id, content="Sorry, could not get the ranked companies.")
-            return
+        logger.info(f"Investment report for companies: {companies}")
+        text = companies
+        for agent_name, message, failure in self.analysis_steps:
+            logger.info(message)
+            response: RunResponse = getattr(self, agent_name).run(text)
+            if response is None or not response.content:
+                yield RunResponse(run_id=self.run_id, content=failure)
+                return
+            text = self._handoff(response.content)
+
+        logger.info("Reviewing the research report and producing an investment proposal.")
+        yield from self.investment_lead.run(text, stream=True)
+
+    async def arun(self, companies: str) -> AsyncIterator[RunResponse]:
+        """`run` with async agent calls, for callers on an event loop (see workflows.operator)."""
+        logger.info(f"Investment report for companies: {companies}")
+        text = companies
+        for agent_name, message, failure in self.analysis_steps:
+            logger.info(message)
+            response: RunResponse = await getattr(self, agent_name).arun(text)
+            if response is None or not response.content:
+                yield RunResponse(run_id=self.run_id, content=failure)
+                return
+            text = self._handoff(response.content)
 
         logger.info("Reviewing the research report and producing an investment proposal.")
-        yield from self.investment_lead.run(ranked_companies.content, stream=True)
+        async for chunk in await self.investment_lead.arun(text, stream=True):
+            yield chunk
 
 
-def get_investment_report_generator(debug_mode: bool = False) -> InvestmentReportGenerator:
+def get_investment_report_generator(
+    debug_mode: bool = False, storage_backend: Optional[StorageBackend] = None
+) -> InvestmentReportGenerator:
     return InvestmentReportGenerator(
         workflow_id="generate-investment-report",
-        storage=PostgresStorage(
-            table_name="investment_report_generator_workflows",
-            db_url=db_url,
-            auto_upgrade_schema=True,
-            mode="workflow",
+        storage=get_storage(
+            table_name="investment_report_generator_workflows", mode="workflow", backend=storage_backend
         ),
         debug_mode=debug_mode,
     )
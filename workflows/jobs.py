@@ -0,0 +1,196 @@
+"""Postgres-backed queue of workflow jobs.
+
+The API enqueues a job and returns at once; worker processes (`python -m workflows.worker`)
+claim jobs with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number of workers can poll the
+same table without handing a job out twice. While a job runs, its worker appends the
+run's server-sent event frames (see utils/sse.py) to an events table, numbered from 1;
+clients replay them from any point with `Last-Event-ID`.
+
+A running job whose worker stops heartbeating for `job_stale_seconds` (the task was
+killed) is claimed again, up to `job_max_attempts` times. Its run starts over: the old
+attempt's frames are replaced by a `reset` event, and the numbering carries on after
+them, so a client resuming from an old position gets the reset and then the new run.
+
+The tables are created by `python -m db.bootstrap`.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, Text, delete, func, insert, select, update
+
+from agents.settings import agent_settings
+from utils.sse import format_event
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueue:
+    def __init__(self, table_name: str = "workflow_jobs", url: Optional[str] = None):
+        self.url = url
+        metadata = MetaData(schema="ai")
+        self.jobs = Table(
+            table_name,
+            metadata,
+            Column("id", String(32), primary_key=True),
+            Column("workflow_id", String, nullable=False),
+            Column("input", Text, nullable=False),
+            Column("user_id", String),
+            Column("session_id", String),
+            Column("status", String(16), nullable=False, index=True),
+            Column("attempts", Integer, nullable=False, default=0),
+            Column("worker", String),
+            Column("result", Text),
+            Column("error", Text),
+            Column("created_at", DateTime(timezone=True), nullable=False, server_default=func.now(), index=True),
+            Column("started_at", DateTime(timezone=True)),
+            Column("heartbeat_at", DateTime(timezone=True)),
+            Column("finished_at", DateTime(timezone=True)),
+        )
+        self.events = Table(
+            f"{table_name}_events",
+            metadata,
+            Column("job_id", String(32), primary_key=True),
+            Column("seq", Integer, primary_key=True),
+            Column("frame", Text, nullable=False),
+        )
+
+    @property
+    def engine(self):
+        from db.storage import get_engine
+
+        return get_engine(self.url)
+
+    def create(self, engine=None) -> None:
+        from sqlalchemy import schema
+
+        with (engine or self.engine).begin() as conn:
+            conn.execute(schema.CreateSchema("ai", if_not_exists=True))
+            self.jobs.create(conn, checkfirst=True)
+            self.events.create(conn, checkfirst=True)
+
+    # -- API side ----------------------------------------------------------
+
+    def enqueue(
+        self,
+        workflow_id: str,
+        payload: str,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        row = {
+            "id": uuid4().hex,
+            "workflow_id": workflow_id,
+            "input": payload,
+            "user_id": user_id,
+            "session_id": session_id,
+            "status": QUEUED,
+            "attempts": 0,
+        }
+        with self.engine.begin() as conn:
+            return dict(conn.execute(insert(self.jobs).values(**row).returning(self.jobs)).mappings().one())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.jobs).where(self.jobs.c.id == job_id)).mappings().first()
+        return dict(row) if row is not None else None
+
+    def read_events(self, job_id: str, after: int = 0, limit: int = 500) -> List[Tuple[int, str]]:
+        """Frames of `job_id` numbered above `after`, in order."""
+        stmt = (
+            select(self.events.c.seq, self.events.c.frame)
+            .where(self.events.c.job_id == job_id, self.events.c.seq > after)
+            .order_by(self.events.c.seq)
+            .limit(limit)
+        )
+        with self.engine.connect() as conn:
+            return [(seq, frame) for seq, frame in conn.execute(stmt)]
+
+    # -- worker side -------------------------------------------------------
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued (or abandoned) job, or None if there is nothing to do.
+        The job's `events_from` is the number of the first frame this attempt writes.
+        """
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=agent_settings.job_stale_seconds)
+        candidate = (
+            select(self.jobs)
+            .where(
+                (self.jobs.c.status == QUEUED)
+                | ((self.jobs.c.status == RUNNING) & (self.jobs.c.heartbeat_at < stale_before))
+            )
+            .order_by(self.jobs.c.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        with self.engine.begin() as conn:
+            job = conn.execute(candidate).mappings().first()
+            if job is None:
+                return None
+            if job["attempts"] >= agent_settings.job_max_attempts:
+                error = f"Abandoned after {job['attempts']} attempts"
+                stmt = update(self.jobs).where(self.jobs.c.id == job["id"])
+                conn.execute(stmt.values(status=FAILED, error=error, finished_at=func.now()))
+                return None
+            last_seq = conn.execute(
+                select(func.coalesce(func.max(self.events.c.seq), 0)).where(self.events.c.job_id == job["id"])
+            ).scalar_one()
+            conn.execute(delete(self.events).where(self.events.c.job_id == job["id"]))
+            stmt = (
+                update(self.jobs)
+                .where(self.jobs.c.id == job["id"])
+                .values(
+                    status=RUNNING,
+                    worker=worker,
+                    attempts=self.jobs.c.attempts + 1,
+                    started_at=func.now(),
+                    heartbeat_at=func.now(),
+                )
+                .returning(self.jobs)
+            )
+            claimed = dict(conn.execute(stmt).mappings().one())
+            if last_seq:
+                # readers past some of the old frames must drop them before the new run's
+                reset = format_event(json.dumps({"attempt": claimed["attempts"]}), "reset", last_seq + 1)
+                conn.execute(insert(self.events).values(job_id=job["id"], seq=last_seq + 1, frame=reset))
+                last_seq += 1
+            claimed["events_from"] = last_seq + 1
+            return claimed
+
+    def _owned(self, job: Dict[str, Any]):
+        # a job reclaimed from a stale worker has a new attempt number: the old worker's writes no-op
+        return (self.jobs.c.id == job["id"]) & (self.jobs.c.attempts == job["attempts"])
+
+    def append_event(self, job: Dict[str, Any], seq: int, frame: str) -> bool:
+        """Store frame `seq` of a claimed job. False if the job was taken over by another worker."""
+        with self.engine.begin() as conn:
+            owned = conn.execute(update(self.jobs).where(self._owned(job)).values(heartbeat_at=func.now())).rowcount
+            if owned:
+                conn.execute(insert(self.events).values(job_id=job["id"], seq=seq, frame=frame))
+        return bool(owned)
+
+    def heartbeat(self, job: Dict[str, Any]) -> bool:
+        with self.engine.begin() as conn:
+            return bool(
+                conn.execute(update(self.jobs).where(self._owned(job)).values(heartbeat_at=func.now())).rowcount
+            )
+
+    def finish(self, job: Dict[str, Any], result: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Mark a claimed job succeeded with `result`, or failed with `error`."""
+        status = FAILED if error is not None else SUCCEEDED
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(self.jobs)
+                .where(self._owned(job))
+                .values(status=status, result=result, error=error, finished_at=func.now(), heartbeat_at=func.now())
+            )
+
+
+job_queue = JobQueue()
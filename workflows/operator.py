@@ -1,8 +1,13 @@
+import asyncio
+import inspect
+from collections import deque
+from copy import copy
+from dataclasses import fields
 from enum import Enum
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
 
-from workflows.blog_post_generator import get_blog_post_generator
-from workflows.investment_report_generator import get_investment_report_generator
+if TYPE_CHECKING:
+    from db.storage import StorageBackend
 
 
 class WorkflowType(Enum):
@@ -18,8 +23,105 @@ def get_workflow(
     workflow_id: Optional[str] = None,
     wf_type: Optional[WorkflowType] = None,
     debug_mode: bool = True,
+    storage_backend: Optional["StorageBackend"] = None,
 ):
     if wf_type == WorkflowType.INVESTMENT_REPORT or workflow_id == WorkflowType.INVESTMENT_REPORT.value:
-        return get_investment_report_generator(debug_mode=debug_mode)
+        from workflows.investment_report_generator import get_investment_report_generator
+
+        return get_investment_report_generator(debug_mode=debug_mode, storage_backend=storage_backend)
     else:
-        return get_blog_post_generator(debug_mode=debug_mode)
+        from workflows.blog_post_generator import get_blog_post_generator
+
+        return get_blog_post_generator(debug_mode=debug_mode, storage_backend=storage_backend)
+
+
+def _run_arguments(workflow, payload: str) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """(args, kwargs) passing `payload` as the first parameter of the workflow's `run`."""
+    first_param = next(iter(workflow._run_parameters or {}), None)
+    return ((), {first_param: payload}) if first_param else ((payload,), {})
+
+
+def run_with_input(workflow, payload: str):
+    """Call `workflow.run`, passing `payload` as its first parameter (agno only accepts kwargs)."""
+    args, kwargs = _run_arguments(workflow, payload)
+    return workflow.run(*args, **kwargs)
+
+
+def isolate_agents(workflow, wrap_model: Optional[Callable[[Any], Any]] = None):
+    """Give `workflow` private copies of its class-level agents, so concurrent runs do not share them.
+
+    Like Agent.deep_copy, but only with constructor arguments: a workflow run sets
+    workflow_id on its class-level agents, which Agent.__init__ does not accept.
+    `wrap_model(model)` replaces each copy's model (e.g. to route it through a batch).
+    """
+    from agno.agent import Agent
+
+    for name, agent in vars(type(workflow)).items():
+        if not isinstance(agent, Agent):
+            continue
+        accepted = set(inspect.signature(type(agent).__init__).parameters) - {"model", "agent_session", "session_name"}
+        values = {
+            f.name: agent._deep_copy_field(f.name, getattr(agent, f.name))
+            for f in fields(agent)
+            if f.name in accepted and getattr(agent, f.name) is not None
+        }
+        model = wrap_model(agent.model) if wrap_model else copy(agent.model)
+        setattr(workflow, name, type(agent)(model=model, **values))
+    return workflow
+
+
+def has_native_arun(workflow) -> bool:
+    return inspect.isasyncgenfunction(getattr(type(workflow), "arun", None))
+
+
+async def _arun_workflow(workflow, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+    """The subclass's async generator `arun`, inside agno's own `Workflow.run_workflow`.
+
+    agno sets up the run (ids, memory, session read) when `run` is called and records it
+    (memory, session write) once the generator it returns is exhausted. Here that
+    generator is fed the items of `arun` one at a time: the model calls run on the event
+    loop and agno's session bookkeeping, which hits the database, on a worker thread.
+    """
+    pending: Deque[Any] = deque()
+
+    def feed(**_: Any) -> Iterator[Any]:
+        while pending:
+            yield pending.popleft()
+
+    subclass_run = workflow._subclass_run
+    workflow._subclass_run = feed
+    try:
+        recorded = await asyncio.to_thread(workflow.run, **kwargs)
+    finally:
+        workflow._subclass_run = subclass_run
+
+    try:
+        async for item in workflow.arun(*args, **kwargs):
+            pending.append(item)
+            # stamps the run's ids on the item and adds its content to the run response
+            yield next(recorded)
+        # the feed is empty: agno adds the run to memory and writes the session
+        await asyncio.to_thread(next, recorded, None)
+    finally:
+        recorded.close()
+
+
+async def astream_workflow(workflow, payload: str) -> AsyncIterator[Any]:
+    """The run of `workflow` on `payload`, without blocking the event loop.
+
+    Workflows with an async generator `arun` run natively on the loop; the others run
+    their blocking `run` generator on the workflow thread pool (see utils/async_bridge.py).
+    """
+    if has_native_arun(workflow):
+        args, kwargs = _run_arguments(workflow, payload)
+        async for item in _arun_workflow(workflow, *args, **kwargs):
+            yield item
+        return
+
+    from agents.settings import agent_settings
+    from utils.async_bridge import iterate_in_thread
+
+    async for item in iterate_in_thread(
+        lambda: iter(run_with_input(workflow, payload)), maxsize=agent_settings.workflow_stream_buffer
+    ):
+        yield item
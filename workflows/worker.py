@@ -0,0 +1,147 @@
+"""Worker processes for workflow jobs.
+
+Runs from the same image as the API, as its own ECS service, so workers scale with the
+job backlog independently of API concurrency:
+
+    python -m workflows.worker --processes 2 --concurrency 4
+
+Each process runs `concurrency` jobs at a time on one event loop (workflows without a
+native `arun` run on its thread pool, see workflows.operator.astream_workflow). On
+SIGTERM/SIGINT workers stop claiming jobs and finish the ones they have; a job cut
+short by a hard kill is picked up again once it goes stale (see workflows/jobs.py).
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from agents.settings import agent_settings
+from utils.log import logger
+from utils.sse import sse_stream
+from workflows.jobs import JobQueue, job_queue
+from workflows.operator import astream_workflow, get_workflow, isolate_agents
+
+
+class JobLost(Exception):
+    """The job was reclaimed by another worker while this one was running it."""
+
+
+async def run_job(queue: JobQueue, job: Dict[str, Any]) -> None:
+    """Run a claimed job, storing its SSE frames, then record its result or error."""
+    contents: List[str] = []
+    error: Optional[BaseException] = None
+
+    async def chunks() -> AsyncIterator[Any]:
+        nonlocal error
+        workflow = isolate_agents(get_workflow(workflow_id=job["workflow_id"], debug_mode=False))
+        workflow.user_id = job["user_id"]
+        if job["session_id"]:
+            workflow.session_id = job["session_id"]
+        try:
+            async for chunk in astream_workflow(workflow, job["input"]):
+                content = getattr(chunk, "content", None)
+                if isinstance(content, str):
+                    contents.append(content)
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+
+    # after a reclaim, numbering continues past the previous attempt's frames (see JobQueue.claim)
+    seq = job["events_from"] - 1
+    frames = sse_stream(
+        chunks(),
+        flush_interval=agent_settings.job_event_flush_seconds,
+        heartbeat=30.0,
+        first_event_id=job["events_from"],
+    )
+    try:
+        async for frame in frames:
+            if frame.startswith(":"):
+                owned = await asyncio.to_thread(queue.heartbeat, job)
+            else:
+                seq += 1
+                owned = await asyncio.to_thread(queue.append_event, job, seq, frame)
+            if not owned:
+                raise JobLost(job["id"])
+    finally:
+        await frames.aclose()
+
+    if error is not None:
+        await asyncio.to_thread(queue.finish, job, error=str(error) or type(error).__name__)
+        logger.warning(f"Job {job['id']} ({job['workflow_id']}) failed: {error}")
+    else:
+        await asyncio.to_thread(queue.finish, job, result="".join(contents))
+        logger.info(f"Job {job['id']} ({job['workflow_id']}) succeeded, {seq - job['events_from'] + 1} events")
+
+
+async def work(queue: JobQueue, name: str, stop: asyncio.Event) -> None:
+    """Claim and run jobs one at a time until `stop` is set."""
+    while not stop.is_set():
+        try:
+            job = await asyncio.to_thread(queue.claim, name)
+        except Exception as e:
+            logger.error(f"Could not claim a job: {e}")
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=agent_settings.job_poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            await run_job(queue, job)
+        except JobLost:
+            logger.warning(f"Job {job['id']} was taken over by another worker")
+        except Exception as e:
+            logger.error(f"Job {job['id']} crashed the worker loop: {e}")
+            await asyncio.to_thread(queue.finish, job, error=str(e))
+
+
+async def serve(concurrency: int, queue: JobQueue = job_queue) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {name} running {concurrency} jobs at a time")
+    await asyncio.gather(*(work(queue, f"{name}/{i}", stop) for i in range(concurrency)))
+    logger.info(f"Worker {name} stopped")
+
+
+def _serve_process(concurrency: int) -> None:
+    asyncio.run(serve(concurrency))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run workflow jobs from the Postgres job queue.")
+    parser.add_argument("--processes", type=int, default=agent_settings.worker_processes)
+    parser.add_argument("--concurrency", type=int, default=agent_settings.worker_concurrency)
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _serve_process(args.concurrency)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_serve_process, args=(args.concurrency,)) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame) -> None:
+        for process in processes:
+            if process.is_alive() and process.pid is not None:
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from os import getenv
 
+from agno.docker.app.base import DockerApp
 from agno.docker.app.fastapi import FastApi
 from agno.docker.app.postgres import PgVectorDb
 from agno.docker.app.streamlit import Streamlit
@@ -86,9 +87,23 @@ dev_fastapi = FastApi(
     depends_on=[dev_db],
 )
 
+# -*- Workflow job worker (see workflows/worker.py)
+dev_worker = DockerApp(
+    name=f"{ws_settings.ws_name}-worker",
+    image=dev_image,
+    command="python -m workflows.worker --processes 1",
+    debug_mode=True,
+    mount_workspace=True,
+    env_vars=container_env,
+    use_cache=True,
+    # Read secrets from secrets/dev_app_secrets.yml
+    secrets_file=ws_settings.ws_root.joinpath("workspace/secrets/dev_app_secrets.yml"),
+    depends_on=[dev_db],
+)
+
 # -*- Dev DockerResources
 dev_docker_resources = DockerResources(
     env=ws_settings.dev_env,
     network=ws_settings.ws_name,
-    apps=[dev_db, dev_streamlit, dev_fastapi],
+    apps=[dev_db, dev_streamlit, dev_fastapi, dev_worker],
 )
@@ -1,5 +1,6 @@
 from os import getenv
 
+from agno.aws.app.base import AwsApp
 from agno.aws.app.fastapi import FastApi
 from agno.aws.app.streamlit import Streamlit
 from agno.aws.resource.ec2 import InboundRule, SecurityGroup
@@ -243,6 +244,29 @@ prd_fastapi = FastApi(
     wait_for_delete=False,
 )
 
+# -*- Workflow job workers running on ECS (see workflows/worker.py)
+# Same image as the api, no load balancer: scale ecs_service_count with the job backlog.
+prd_worker = AwsApp(
+    name=f"{ws_settings.prd_key}-worker",
+    group="worker",
+    image=prd_image,
+    command="python -m workflows.worker",
+    ecs_task_cpu="1024",
+    ecs_task_memory="2048",
+    ecs_service_count=1,
+    ecs_cluster=prd_ecs_cluster,
+    aws_secrets=[prd_secret],
+    subnets=ws_settings.aws_subnet_ids,
+    security_groups=[prd_sg],
+    env_vars=container_env,
+    skip_delete=skip_delete,
+    save_output=save_output,
+    # Do not wait for the service to stabilize
+    wait_for_create=False,
+    # Do not wait for the service to be deleted
+    wait_for_delete=False,
+)
+
 # -*- Production DockerResources
 prd_docker_resources = DockerResources(
     env=ws_settings.prd_env,
@@ -253,7 +277,7 @@ prd_docker_resources = DockerResources(
 # -*- Production AwsResources
 prd_aws_config = AwsResources(
     env=ws_settings.prd_env,
-    apps=[prd_streamlit, prd_fastapi],
+    apps=[prd_streamlit, prd_fastapi, prd_worker],
     resources=(
         prd_lb_sg,
         prd_sg,